@@ -1,6 +1,7 @@
+import os
 from logging.config import fileConfig
 
-from sqlalchemy import engine_from_config
+from sqlalchemy import engine_from_config, make_url
 from sqlalchemy import pool
 
 from alembic import context
@@ -10,9 +11,20 @@ from alembic import context
 config = context.config
 
 # Interpret the config file for Python logging.
-# This line sets up loggers basically.
+# This line sets up loggers basically, leaving the service's loggers enabled
+# when migrations run in its process.
 if config.config_file_name is not None:
-    fileConfig(config.config_file_name)
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+# Migrate the database the service is configured to use, with a sync driver.
+if database_url := os.environ.get("METADATA_DATABASE_URL"):
+    url = make_url(database_url)
+    config.set_main_option(
+        "sqlalchemy.url",
+        url.set(drivername=url.get_backend_name()).render_as_string(
+            hide_password=False
+        ),
+    )
 
 # add your model's MetaData object here
 # for 'autogenerate' support
@@ -0,0 +1,41 @@
+"""add indexes.
+
+Revision ID: 3f9a1c7d2b64
+Revises: 8c28383d82be
+Create Date: 2026-10-18 09:12:41.508214
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "3f9a1c7d2b64"
+down_revision: Union[str, None] = "8c28383d82be"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_company_name", "company", ["name"])
+    op.create_index("ix_user_name", "user", ["name"])
+    op.create_index("ix_user_company_id", "user", ["company_id"])
+    op.create_index("ix_team_name", "team", ["name"])
+    op.create_index("ix_team_company_id", "team", ["company_id"])
+    op.create_index("ix_resource_name", "resource", ["name"])
+    op.create_index("ix_resource_owner", "resource", ["owner"])
+    # The primary key covers team -> users, this covers user -> teams.
+    op.create_index("ix_team_members_user_id", "team_members", ["user_id", "team_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_team_members_user_id", "team_members")
+    op.drop_index("ix_resource_owner", "resource")
+    op.drop_index("ix_resource_name", "resource")
+    op.drop_index("ix_team_company_id", "team")
+    op.drop_index("ix_team_name", "team")
+    op.drop_index("ix_user_company_id", "user")
+    op.drop_index("ix_user_name", "user")
+    op.drop_index("ix_company_name", "company")
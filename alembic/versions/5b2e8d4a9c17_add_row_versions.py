@@ -0,0 +1,35 @@
+"""add row versions.
+
+Revision ID: 5b2e8d4a9c17
+Revises: 3f9a1c7d2b64
+Create Date: 2026-10-18 14:03:27.190356
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "5b2e8d4a9c17"
+down_revision: Union[str, None] = "3f9a1c7d2b64"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("company", "team", "user", "resource")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in TABLES:
+        op.add_column(
+            table,
+            sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("version")
@@ -0,0 +1,61 @@
+"""add search indexes.
+
+Revision ID: 9d4f2b7e6a31
+Revises: 5b2e8d4a9c17
+Create Date: 2026-10-18 16:41:09.552803
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "9d4f2b7e6a31"
+down_revision: Union[str, None] = "5b2e8d4a9c17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_COLUMNS = {
+    "resource": ("name", "description"),
+    "team": ("name", "description"),
+    "user": ("name", "email"),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, columns in SEARCH_COLUMNS.items():
+        search = f"{table}_search"
+        names = ", ".join(columns)
+        new = ", ".join(f"new.{column}" for column in columns)
+        old = ", ".join(f"old.{column}" for column in columns)
+        insert = f"INSERT INTO {search}(rowid, {names}) VALUES (new.id, {new});"
+        delete = (
+            f"INSERT INTO {search}({search}, rowid, {names}) "
+            f"VALUES ('delete', old.id, {old});"
+        )
+        op.execute(
+            f"CREATE VIRTUAL TABLE {search} USING fts5("
+            f"{names}, content='{table}', content_rowid='id')"
+        )
+        op.execute(
+            f"CREATE TRIGGER {search}_insert AFTER INSERT ON {table} BEGIN {insert} END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {search}_delete AFTER DELETE ON {table} BEGIN {delete} END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {search}_update AFTER UPDATE OF {names} ON {table} "
+            f"BEGIN {delete} {insert} END"
+        )
+        # Index the rows that existed before the triggers.
+        op.execute(f"INSERT INTO {search}({search}) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in SEARCH_COLUMNS:
+        search = f"{table}_search"
+        for trigger in ("insert", "delete", "update"):
+            op.execute(f"DROP TRIGGER {search}_{trigger}")
+        op.execute(f"DROP TABLE {search}")
@@ -0,0 +1,305 @@
+"""use uuid7 ids.
+
+Revision ID: a3c8e51f7d09
+Revises: e4a7c3d91b52
+Create Date: 2026-10-18 21:03:27.618254
+"""
+
+from typing import Callable, Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from metadata_service import ids
+
+
+revision: str = "a3c8e51f7d09"
+down_revision: Union[str, None] = "e4a7c3d91b52"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ENTITY_TABLES = ("company", "team", "user", "resource")
+
+# The columns holding each entity's IDs, its own first.
+ID_COLUMNS = {
+    "company": (("company", "id"), ("team", "company_id"), ("user", "company_id")),
+    "team": (("team", "id"), ("resource", "owner"), ("team_members", "team_id")),
+    "user": (("user", "id"), ("team_members", "user_id")),
+    "resource": (("resource", "id"),),
+}
+
+SEARCH_COLUMNS = {
+    "resource": ("name", "description"),
+    "team": ("name", "description"),
+    "user": ("name", "email"),
+}
+
+# Lists page by (sort column, id). Integer IDs are the rowid, which every
+# index ends with implicitly. UUIDs are not, so the indexes name them.
+INDEXES = {
+    "ix_company_name": ("company", ("name", "id")),
+    "ix_user_name": ("user", ("name", "id")),
+    "ix_team_name": ("team", ("name", "id")),
+    "ix_resource_name": ("resource", ("name", "id")),
+    "ix_team_members_user_id": ("team_members", ("user_id", "team_id")),
+    "ix_resource_owner_type_status": (
+        "resource",
+        ("owner", "type", "lifecycle_status", "id"),
+    ),
+    "ix_resource_type_status": ("resource", ("type", "lifecycle_status", "id")),
+    "ix_user_company_id_name": ("user", ("company_id", "name", "id")),
+    "ix_team_company_id_name": ("team", ("company_id", "name", "id")),
+}
+
+LOG = "INSERT INTO change_log(entity, entity_id, operation, version)"
+
+MEMBERSHIP_LOG = (
+    "INSERT INTO change_log(entity, entity_id, operation, version) "
+    "SELECT 'team', id, 'update', version FROM team WHERE id = {row}.team_id;"
+)
+
+
+def version_column() -> sa.Column:
+    """Create the row version column."""
+    return sa.Column("version", sa.Integer, nullable=False, server_default="1")
+
+
+def create_tables(id_type: sa.types.TypeEngine):
+    """Create the entity tables and the change log with IDs of a type."""
+    op.create_table(
+        "company",
+        sa.Column("id", id_type, primary_key=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        version_column(),
+    )
+    op.create_table(
+        "team",
+        sa.Column("id", id_type, primary_key=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("company_id", id_type, sa.ForeignKey("company.id"), nullable=False),
+        sa.Column("description", sa.String(255), nullable=False),
+        version_column(),
+    )
+    op.create_table(
+        "user",
+        sa.Column("id", id_type, primary_key=True),
+        sa.Column("name", sa.String(50), nullable=False),
+        sa.Column("email", sa.String(100), nullable=False),
+        sa.Column("company_id", id_type, sa.ForeignKey("company.id"), nullable=False),
+        version_column(),
+    )
+    op.create_table(
+        "team_members",
+        sa.Column("team_id", id_type, sa.ForeignKey("team.id"), primary_key=True),
+        sa.Column("user_id", id_type, sa.ForeignKey("user.id"), primary_key=True),
+    )
+    op.create_table(
+        "resource",
+        sa.Column("id", id_type, primary_key=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("type", sa.String(50), nullable=False),
+        sa.Column("lifecycle_status", sa.String(50), nullable=False),
+        sa.Column("description", sa.String(255), nullable=False),
+        sa.Column("owner", id_type, sa.ForeignKey("team.id"), nullable=False),
+        version_column(),
+    )
+    op.create_table(
+        "change_log",
+        sa.Column("seq", sa.Integer, primary_key=True),
+        sa.Column("entity", sa.String(20), nullable=False),
+        sa.Column("entity_id", id_type, nullable=False),
+        sa.Column("operation", sa.String(10), nullable=False),
+        sa.Column("version", sa.Integer, nullable=True),
+        sa.Column(
+            "changed_at",
+            sa.DateTime,
+            nullable=True,
+            server_default=sa.func.current_timestamp(),
+        ),
+        sqlite_autoincrement=True,
+    )
+
+
+def drop_triggers_and_search():
+    """Drop the change log triggers and the full-text indexes."""
+    for table in ENTITY_TABLES:
+        for trigger in ("insert", "update", "delete"):
+            op.execute(f"DROP TRIGGER {table}_changes_{trigger}")
+    for trigger in ("insert", "delete"):
+        op.execute(f"DROP TRIGGER team_members_changes_{trigger}")
+    for table in SEARCH_COLUMNS:
+        search = f"{table}_search"
+        for trigger in ("insert", "delete", "update"):
+            op.execute(f"DROP TRIGGER {search}_{trigger}")
+        op.execute(f"DROP TABLE {search}")
+
+
+def create_change_triggers():
+    """Create the triggers recording entity changes in the change log."""
+    for table in ENTITY_TABLES:
+        op.execute(
+            f"CREATE TRIGGER {table}_changes_insert AFTER INSERT ON {table} "
+            f"BEGIN {LOG} VALUES ('{table}', new.id, 'create', new.version); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {table}_changes_update AFTER UPDATE ON {table} "
+            f"BEGIN {LOG} VALUES ('{table}', new.id, 'update', new.version); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {table}_changes_delete AFTER DELETE ON {table} "
+            f"BEGIN {LOG} VALUES ('{table}', old.id, 'delete', old.version); END"
+        )
+
+
+def create_membership_triggers():
+    """Create the triggers recording membership changes as team updates."""
+    op.execute(
+        "CREATE TRIGGER team_members_changes_insert AFTER INSERT ON team_members "
+        f"BEGIN {MEMBERSHIP_LOG.format(row='new')} END"
+    )
+    op.execute(
+        "CREATE TRIGGER team_members_changes_delete AFTER DELETE ON team_members "
+        f"BEGIN {MEMBERSHIP_LOG.format(row='old')} END"
+    )
+
+
+def create_search(rowid: str, content_rowid: str):
+    """Create the full-text indexes, keyed by a column, and index every row."""
+    for table, columns in SEARCH_COLUMNS.items():
+        search = f"{table}_search"
+        names = ", ".join(columns)
+        new = ", ".join(f"new.{column}" for column in columns)
+        old = ", ".join(f"old.{column}" for column in columns)
+        insert = f"INSERT INTO {search}(rowid, {names}) VALUES (new.{rowid}, {new});"
+        delete = (
+            f"INSERT INTO {search}({search}, rowid, {names}) "
+            f"VALUES ('delete', old.{rowid}, {old});"
+        )
+        op.execute(
+            f"CREATE VIRTUAL TABLE {search} USING fts5("
+            f"{names}, content='{table}'{content_rowid})"
+        )
+        op.execute(
+            f"CREATE TRIGGER {search}_insert AFTER INSERT ON {table} BEGIN {insert} END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {search}_delete AFTER DELETE ON {table} BEGIN {delete} END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {search}_update AFTER UPDATE OF {names} ON {table} "
+            f"BEGIN {delete} {insert} END"
+        )
+        op.execute(f"INSERT INTO {search}({search}) VALUES ('rebuild')")
+
+
+def copy_rows():
+    """Copy the renamed tables into the new ones, mapping every ID column.
+
+    Rows are copied in ID order, which both ID types sort by creation.
+    """
+    conn = op.get_bind()
+    references = {
+        (table, column): entity
+        for entity, columns in ID_COLUMNS.items()
+        for table, column in columns
+    }
+    for table in (*ENTITY_TABLES, "team_members"):
+        names = [
+            row[1] for row in conn.exec_driver_sql(f'PRAGMA table_info("{table}")')
+        ]
+        select, joins = [], []
+        for i, name in enumerate(names):
+            if entity := references.get((table, name)):
+                joins.append(f"JOIN _ids_{entity} m{i} ON m{i}.old = t.{name}")
+                select.append(f"m{i}.new")
+            else:
+                select.append(f"t.{name}")
+        order = "t.id" if table in ENTITY_TABLES else "t.team_id, t.user_id"
+        op.execute(
+            f'INSERT INTO "{table}" ({", ".join(names)}) '
+            f'SELECT {", ".join(select)} FROM "{table}_old" t {" ".join(joins)} '
+            f"ORDER BY {order}"
+        )
+
+
+def every_id(entity: str) -> str:
+    """Select every ID of an entity, including dangling references to it."""
+    return " UNION ".join(
+        f'SELECT {column} AS id FROM "{table}_old"'
+        for table, column in ID_COLUMNS[entity]
+    )
+
+
+def convert(id_type: sa.types.TypeEngine, map_ids: Callable[[str], None]):
+    """Rebuild every table with IDs of another type.
+
+    Args:
+        id_type (TypeEngine): The type of the new ID columns.
+        map_ids (Callable): Fills the ``_ids_<entity>`` table with the new ID
+            of every old ID of an entity.
+    """
+    conn = op.get_bind()
+    last_seq = conn.exec_driver_sql(
+        "SELECT seq FROM sqlite_sequence WHERE name = 'change_log'"
+    ).scalar()
+    drop_triggers_and_search()
+    for table in (*ENTITY_TABLES, "team_members"):
+        op.rename_table(table, f"{table}_old")
+    op.drop_table("change_log")
+    for entity in ENTITY_TABLES:
+        map_ids(entity)
+
+    create_tables(id_type)
+    # Skip a sequence number, so every consumer of the change feed gets 410
+    # and syncs again with the new IDs, from the creates logged by the copy.
+    if last_seq:
+        op.execute(
+            "INSERT INTO sqlite_sequence(name, seq) "
+            f"VALUES ('change_log', {last_seq + 1})"
+        )
+    create_change_triggers()
+    copy_rows()
+    create_membership_triggers()
+
+    for table in ("team_members", *reversed(ENTITY_TABLES)):
+        op.drop_table(f"{table}_old")
+    for entity in ENTITY_TABLES:
+        op.drop_table(f"_ids_{entity}")
+    for name, (table, columns) in INDEXES.items():
+        if isinstance(id_type, sa.Integer) and columns[-1] == "id":
+            columns = columns[:-1]
+        op.create_index(name, table, list(columns))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+
+    def map_ids(entity: str):
+        # UUIDv7s generated in ID order keep the rows in creation order.
+        op.execute(f"CREATE TABLE _ids_{entity} (old INTEGER PRIMARY KEY, new BLOB)")
+        old_ids = conn.exec_driver_sql(f"{every_id(entity)} ORDER BY id").scalars()
+        if rows := [{"old": old, "new": ids.uuid7().bytes} for old in old_ids]:
+            conn.execute(
+                sa.text(f"INSERT INTO _ids_{entity} (old, new) VALUES (:old, :new)"),
+                rows,
+            )
+
+    convert(sa.LargeBinary(16), map_ids)
+    # Without an integer primary key, the full-text indexes key the rows by
+    # their implicit rowid.
+    create_search(rowid="rowid", content_rowid="")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    def map_ids(entity: str):
+        op.execute(f"CREATE TABLE _ids_{entity} (old BLOB PRIMARY KEY, new INTEGER)")
+        op.execute(
+            f"INSERT INTO _ids_{entity} (old, new) "
+            f"SELECT id, row_number() OVER (ORDER BY id) FROM ({every_id(entity)})"
+        )
+
+    convert(sa.Integer(), map_ids)
+    create_search(rowid="id", content_rowid=", content_rowid='id'")
@@ -0,0 +1,43 @@
+"""add filter indexes.
+
+Revision ID: c71e5a0f3b28
+Revises: 9d4f2b7e6a31
+Create Date: 2026-10-18 18:22:54.310947
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "c71e5a0f3b28"
+down_revision: Union[str, None] = "9d4f2b7e6a31"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Each composite index leads with the column it replaces.
+    op.create_index(
+        "ix_resource_owner_type_status",
+        "resource",
+        ["owner", "type", "lifecycle_status"],
+    )
+    op.create_index("ix_resource_type_status", "resource", ["type", "lifecycle_status"])
+    op.create_index("ix_user_company_id_name", "user", ["company_id", "name"])
+    op.create_index("ix_team_company_id_name", "team", ["company_id", "name"])
+    op.drop_index("ix_resource_owner", "resource")
+    op.drop_index("ix_user_company_id", "user")
+    op.drop_index("ix_team_company_id", "team")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index("ix_team_company_id", "team", ["company_id"])
+    op.create_index("ix_user_company_id", "user", ["company_id"])
+    op.create_index("ix_resource_owner", "resource", ["owner"])
+    op.drop_index("ix_team_company_id_name", "team")
+    op.drop_index("ix_user_company_id_name", "user")
+    op.drop_index("ix_resource_type_status", "resource")
+    op.drop_index("ix_resource_owner_type_status", "resource")
@@ -0,0 +1,76 @@
+"""add change log.
+
+Revision ID: e4a7c3d91b52
+Revises: c71e5a0f3b28
+Create Date: 2026-10-18 19:12:44.308127
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "e4a7c3d91b52"
+down_revision: Union[str, None] = "c71e5a0f3b28"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("company", "team", "user", "resource")
+
+LOG = "INSERT INTO change_log(entity, entity_id, operation, version)"
+
+MEMBERSHIP_LOG = (
+    "INSERT INTO change_log(entity, entity_id, operation, version) "
+    "SELECT 'team', id, 'update', version FROM team WHERE id = {row}.team_id;"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "change_log",
+        sa.Column("seq", sa.Integer, primary_key=True),
+        sa.Column("entity", sa.String(20), nullable=False),
+        sa.Column("entity_id", sa.Integer, nullable=False),
+        sa.Column("operation", sa.String(10), nullable=False),
+        sa.Column("version", sa.Integer, nullable=True),
+        sa.Column(
+            "changed_at",
+            sa.DateTime,
+            nullable=True,
+            server_default=sa.func.current_timestamp(),
+        ),
+        sqlite_autoincrement=True,
+    )
+    for table in TABLES:
+        op.execute(
+            f"CREATE TRIGGER {table}_changes_insert AFTER INSERT ON {table} "
+            f"BEGIN {LOG} VALUES ('{table}', new.id, 'create', new.version); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {table}_changes_update AFTER UPDATE ON {table} "
+            f"BEGIN {LOG} VALUES ('{table}', new.id, 'update', new.version); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {table}_changes_delete AFTER DELETE ON {table} "
+            f"BEGIN {LOG} VALUES ('{table}', old.id, 'delete', old.version); END"
+        )
+    op.execute(
+        "CREATE TRIGGER team_members_changes_insert AFTER INSERT ON team_members "
+        f"BEGIN {MEMBERSHIP_LOG.format(row='new')} END"
+    )
+    op.execute(
+        "CREATE TRIGGER team_members_changes_delete AFTER DELETE ON team_members "
+        f"BEGIN {MEMBERSHIP_LOG.format(row='old')} END"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        for trigger in ("insert", "update", "delete"):
+            op.execute(f"DROP TRIGGER {table}_changes_{trigger}")
+    for trigger in ("insert", "delete"):
+        op.execute(f"DROP TRIGGER team_members_changes_{trigger}")
+    op.drop_table("change_log")
@@ -0,0 +1,89 @@
+"""Run the seeded load test and report or compare against a baseline.
+
+Examples:
+    uv run python -m benchmarks --duration 10 --out baseline.json
+    uv run python -m benchmarks --duration 10 --compare baseline.json
+
+With ``--compare`` the exit status is 1 when any endpoint regressed by more
+than ``--threshold``.
+"""
+
+import argparse
+import asyncio
+import sys
+from dataclasses import asdict
+from pathlib import Path
+
+from benchmarks import _support, load, report
+from benchmarks.seed import SeedSpec, seed
+
+
+async def run(args: argparse.Namespace, spec: SeedSpec, db_path: Path) -> dict:
+    """Drive the seeded database and summarise the run."""
+    async with load.target_client(db_path, args.target, args.workers) as client:
+        if args.warmup:
+            await load.run_load(
+                client, spec, concurrency=args.concurrency, duration=args.warmup
+            )
+        result = await load.run_load(
+            client,
+            spec,
+            concurrency=args.concurrency,
+            duration=args.duration,
+            random_seed=args.random_seed,
+        )
+    return report.summarise(
+        result,
+        {
+            "target": args.target,
+            "workers": args.workers,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "seed": asdict(spec),
+        },
+    )
+
+
+def main() -> int:
+    """Seed, run, report and optionally compare."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    for name, value in asdict(SeedSpec()).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=value)
+    parser.add_argument("--target", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--out", type=Path, help="save the report as JSON")
+    parser.add_argument("--compare", type=Path, help="baseline report to compare")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    spec = SeedSpec(**{name: getattr(args, name) for name in asdict(SeedSpec()).keys()})
+    with _support.temp_directory() as directory:
+        db_path = Path(directory) / "load.db"
+        seed(db_path, spec)
+        current = asyncio.run(run(args, spec, db_path))
+
+    print(report.render(current))
+    if args.out:
+        report.save(current, args.out)
+        print(f"saved {args.out}")
+    if args.compare:
+        regressions = report.compare(report.load(args.compare), current, args.threshold)
+        for regression in regressions:
+            print(
+                f"REGRESSION {regression.endpoint} {regression.metric}: "
+                f"{regression.baseline:.2f} -> {regression.current:.2f} "
+                f"({regression.change:+.0%})"
+            )
+        if regressions:
+            return 1
+        print(f"no regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""Shared helpers for the benchmark scripts."""
+
+import contextlib
+import statistics
+import tempfile
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from pathlib import Path
+
+import httpx
+from sqlalchemy import create_engine
+from sqlmodel import SQLModel
+
+from benchmarks import seed
+from metadata_service import db
+from metadata_service.config import Settings
+from metadata_service.main import app
+
+
+def create_database(directory: Path) -> Path:
+    """Create an empty database with every table in a directory."""
+    db_path = directory / "bench.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    SQLModel.metadata.create_all(engine)
+    engine.dispose()
+    return db_path
+
+
+SEEDED_TEAM = str(seed.entity_id("team", 1))
+"""The ID of the team ``seed_resources`` seeds."""
+
+
+def seed_resources(db_path: Path, count: int):
+    """Seed one company and team owning ``count`` resources."""
+    seed.seed(
+        db_path,
+        seed.SeedSpec(
+            companies=1,
+            users_per_company=0,
+            teams_per_company=1,
+            members_per_team=0,
+            resources_per_team=count,
+        ),
+    )
+
+
+@contextlib.asynccontextmanager
+async def app_client(
+    db_path: Path, settings: Settings | None = None
+) -> AsyncIterator[httpx.AsyncClient]:
+    """Yield an HTTP client that drives the app in-process against a database.
+
+    The service's engine is started from the settings, with the URL pointed at
+    the database, as the app's lifespan would, without its background tasks.
+    """
+    settings = (settings or Settings()).model_copy(
+        update={"database_url": f"sqlite+aiosqlite:///{db_path}"}
+    )
+    db.start_engine(settings)
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            yield client
+    finally:
+        await db.dispose_engine()
+
+
+async def time_calls(
+    call: Callable[[], Awaitable[object]], repeat: int
+) -> dict[str, float]:
+    """Time an async call and return its median and p95 latency in milliseconds."""
+    samples: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await call()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[max(0, int(len(samples) * 0.95) - 1)],
+    }
+
+
+def temp_directory() -> tempfile.TemporaryDirectory[str]:
+    """Create a temporary directory for a benchmark database."""
+    return tempfile.TemporaryDirectory(prefix="metadata-bench-")
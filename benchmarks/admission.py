@@ -0,0 +1,137 @@
+"""Benchmark read latency during a write burst, with and without admission control.
+
+Run with ``uv run python -m benchmarks.admission``. ``--writers`` clients
+create and update resources as fast as they can while ``--readers`` clients
+get resources by ID, with the entity cache off so every read queries SQLite.
+Runs with admission control off and then on, and reports the rate and p95
+latency of the reads and of the writes, and the writes rejected with 503.
+"""
+
+import argparse
+import asyncio
+import itertools
+import random
+import statistics
+import time
+from collections import Counter
+from collections.abc import Iterator
+from pathlib import Path
+
+import httpx
+
+from benchmarks import _support, seed
+from metadata_service import admission, cache, profiling
+
+
+async def read_loop(
+    client: httpx.AsyncClient, rows: int, deadline: float, latencies: list[float]
+):
+    """Get random resources by ID until the deadline."""
+    rng = random.Random()
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await client.get(
+            f"/resources/{seed.entity_id('resource', rng.randint(1, rows))}"
+        )
+        latencies.append(time.perf_counter() - start)
+
+
+async def write_loop(
+    client: httpx.AsyncClient,
+    rows: int,
+    deadline: float,
+    latencies: list[float],
+    statuses: Counter[int],
+    names: Iterator[int],
+):
+    """Alternate creating and updating resources until the deadline."""
+    rng = random.Random()
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        if rng.random() < 0.5:
+            response = await client.post(
+                "/resource",
+                json={
+                    "name": f"created-{next(names)}",
+                    "type": "postgres",
+                    "lifecycle_status": "active",
+                    "description": "created",
+                    "owner": _support.SEEDED_TEAM,
+                },
+            )
+        else:
+            response = await client.put(
+                f"/resource/{seed.entity_id('resource', rng.randint(1, rows))}",
+                json={"description": f"updated {rng.random()}"},
+            )
+        statuses[response.status_code] += 1
+        if response.status_code == 200:
+            latencies.append(time.perf_counter() - start)
+        elif response.status_code == 503:
+            await asyncio.sleep(float(response.headers["Retry-After"]))
+
+
+async def run(db_path: Path, args: argparse.Namespace) -> dict[str, float]:
+    """Run the readers alongside the writers and summarise the run."""
+    read_latencies: list[float] = []
+    write_latencies: list[float] = []
+    statuses: Counter[int] = Counter()
+    names = itertools.count()
+    async with _support.app_client(db_path) as client:
+        deadline = time.perf_counter() + args.seconds
+        await asyncio.gather(
+            *(
+                read_loop(client, args.rows, deadline, read_latencies)
+                for _ in range(args.readers)
+            ),
+            *(
+                write_loop(
+                    client, args.rows, deadline, write_latencies, statuses, names
+                )
+                for _ in range(args.writers)
+            ),
+        )
+    return {
+        "reads_per_second": len(read_latencies) / args.seconds,
+        "read_p95_ms": statistics.quantiles(read_latencies, n=20)[-1] * 1000,
+        "writes_per_second": statuses[200] / args.seconds,
+        "write_p95_ms": statistics.quantiles(write_latencies, n=20)[-1] * 1000,
+        "rejected": statuses[503],
+        "errors": statuses.total() - statuses[200] - statuses[503],
+    }
+
+
+def main():
+    """Print read and write rates and latency with admission control off and on."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--writers", type=int, default=200)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--limit", type=int, default=4)
+    parser.add_argument("--max-queue", type=int, default=64)
+    args = parser.parse_args()
+
+    cache.entities.enabled = False
+    profiling.profiler.slow_query_seconds = float("inf")
+    print(
+        f"{'admission':<11}{'reads/s':>9}{'read p95 ms':>13}{'writes/s':>10}"
+        f"{'write p95 ms':>14}{'rejected':>10}{'errors':>8}"
+    )
+    for enabled in (False, True):
+        admission.controller = admission.AdmissionController(
+            enabled=enabled, limit=args.limit, max_queue=args.max_queue
+        )
+        with _support.temp_directory() as directory:
+            db_path = _support.create_database(Path(directory))
+            _support.seed_resources(db_path, args.rows)
+            row = asyncio.run(run(db_path, args))
+        print(
+            f"{'on' if enabled else 'off':<11}{row['reads_per_second']:>9.0f}"
+            f"{row['read_p95_ms']:>13.1f}{row['writes_per_second']:>10.0f}"
+            f"{row['write_p95_ms']:>14.1f}{row['rejected']:>10}{row['errors']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
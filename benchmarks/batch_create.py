@@ -0,0 +1,63 @@
+"""Benchmark single-item versus batch resource creation in rows per second.
+
+Run with ``uv run python -m benchmarks.batch_create``.
+"""
+
+import argparse
+import asyncio
+import time
+from pathlib import Path
+
+from benchmarks import _support
+
+
+def resource(i: int) -> dict[str, str]:
+    """Build the body of a resource to create."""
+    return {
+        "name": f"resource-{i:08d}",
+        "type": "postgres",
+        "lifecycle_status": "active",
+        "description": "bench resource",
+        "owner": _support.SEEDED_TEAM,
+    }
+
+
+async def run(db_path: Path, rows: int, batch_size: int):
+    """Create the same number of resources one at a time and in batches."""
+    async with _support.app_client(db_path) as client:
+        start = time.perf_counter()
+        for i in range(rows):
+            response = await client.post("/resource", json=resource(i))
+            response.raise_for_status()
+        single = rows / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for offset in range(0, rows, batch_size):
+            response = await client.post(
+                "/resources:batch",
+                json=[resource(i) for i in range(offset, offset + batch_size)],
+            )
+            response.raise_for_status()
+        batched = rows / (time.perf_counter() - start)
+
+    print(f"{'path':<24}{'rows/s':>12}")
+    print(f"{'POST /resource':<24}{single:>12.0f}")
+    print(f"{'POST /resources:batch':<24}{batched:>12.0f}")
+    print(f"speedup: {batched / single:.1f}x")
+
+
+def main():
+    """Print resource creation throughput for both paths."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    with _support.temp_directory() as directory:
+        db_path = _support.create_database(Path(directory))
+        _support.seed_resources(db_path, 0)
+        asyncio.run(run(db_path, args.rows, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark the NDJSON import against per-row resource creation.
+
+Run with ``uv run python -m benchmarks.bulk_import``. The import body is
+generated as it is sent, and the time to load a 1M-resource catalog is
+extrapolated from each path's rows per second.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+from benchmarks import _support
+from benchmarks.batch_create import resource
+
+CATALOG_ROWS = 1_000_000
+
+
+async def ndjson_body(rows: int, chunk_rows: int = 1000) -> AsyncIterator[bytes]:
+    """Generate an NDJSON body of resources a chunk of lines at a time."""
+    for offset in range(0, rows, chunk_rows):
+        lines = (
+            json.dumps(resource(i))
+            for i in range(offset, min(offset + chunk_rows, rows))
+        )
+        yield ("\n".join(lines) + "\n").encode()
+
+
+async def run(db_path: Path, single_rows: int, import_rows: int, chunk_size: int):
+    """Create resources one at a time, then import many more."""
+    async with _support.app_client(db_path) as client:
+        start = time.perf_counter()
+        for i in range(single_rows):
+            response = await client.post("/resource", json=resource(i))
+            response.raise_for_status()
+        single = single_rows / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        response = await client.post(
+            "/import/resources",
+            params={"chunk_size": chunk_size},
+            content=ndjson_body(import_rows),
+            timeout=None,
+        )
+        response.raise_for_status()
+        imported = response.json()["accepted"] / (time.perf_counter() - start)
+
+    print(f"{'path':<24}{'rows/s':>12}{'1M rows':>14}")
+    for name, rate in (("POST /resource", single), ("POST /import", imported)):
+        print(f"{name:<24}{rate:>12.0f}{CATALOG_ROWS / rate:>13.0f}s")
+    print(f"speedup: {imported / single:.1f}x")
+
+
+def main():
+    """Print resource creation throughput for both paths."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--single-rows", type=int, default=1_000)
+    parser.add_argument("--import-rows", type=int, default=200_000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    with _support.temp_directory() as directory:
+        db_path = _support.create_database(Path(directory))
+        _support.seed_resources(db_path, 0)
+        asyncio.run(run(db_path, args.single_rows, args.import_rows, args.chunk_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Benchmark mirroring the resource table by paging versus the NDJSON export.
+
+Run with ``uv run python -m benchmarks.export``. Paging follows cursors through
+``/resources`` with the largest sensible page size, the export streams the
+table in one request. Peak traced memory of the export stays flat as the table
+grows because rows are read from a server side cursor a chunk at a time.
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks import _support
+from metadata_service.main import app
+from metadata_service.pagination import NEXT_CURSOR_HEADER
+
+SIZES = (10_000, 100_000)
+
+
+async def mirror_by_paging(client, limit: int) -> int:
+    """Read every resource by following page cursors."""
+    rows = 0
+    params: dict[str, str | int] = {"limit": limit}
+    while True:
+        response = await client.get("/resources", params=params)
+        response.raise_for_status()
+        rows += len(response.json())
+        if NEXT_CURSOR_HEADER not in response.headers:
+            return rows
+        params["cursor"] = response.headers[NEXT_CURSOR_HEADER]
+
+
+async def mirror_by_export() -> int:
+    """Read every resource from the export stream, discarding each chunk.
+
+    httpx's ASGI transport buffers the whole body, so the app is called
+    directly to measure the memory of the stream itself.
+    """
+    rows = 0
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/export/resources",
+        "raw_path": b"/export/resources",
+        "query_string": b"",
+        "headers": [],
+        "server": ("bench", 80),
+        "client": ("bench", 1),
+    }
+
+    requested = False
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal rows
+        if message["type"] == "http.response.body":
+            rows += message.get("body", b"").count(b"\n")
+            if not message.get("more_body", False):
+                finished.set()
+
+    await app(scope, receive, send)
+    return rows
+
+
+async def measure(call) -> tuple[int, float, float]:
+    """Return the rows read, rows/sec and peak traced MiB of a mirror."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = await call()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return rows, rows / seconds, peak / 1024 / 1024
+
+
+async def run(db_path: Path, limit: int):
+    """Mirror the table both ways."""
+    async with _support.app_client(db_path) as client:
+        for name, call in (
+            ("paging", lambda: mirror_by_paging(client, limit)),
+            ("export", mirror_by_export),
+        ):
+            rows, rate, peak = await measure(call)
+            print(f"{name:<8}{rows:>10}{rate:>12.0f}{peak:>10.1f}")
+
+
+def main():
+    """Seed resource tables of growing size and print mirror throughput."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--limit", type=int, default=1000, help="paging page size")
+    args = parser.parse_args()
+
+    print(f"{'method':<8}{'rows':>10}{'rows/s':>12}{'peak MiB':>10}")
+    for size in SIZES:
+        with _support.temp_directory() as directory:
+            db_path = _support.create_database(Path(directory))
+            _support.seed_resources(db_path, size)
+            asyncio.run(run(db_path, args.limit))
+
+
+if __name__ == "__main__":
+    main()
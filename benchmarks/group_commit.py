@@ -0,0 +1,107 @@
+"""Benchmark write throughput with and without group commit.
+
+Run with ``uv run python -m benchmarks.group_commit``. Concurrent clients create
+resources and update them as fast as they can, with write batching off and on,
+under ``synchronous=normal`` and ``synchronous=full``. Prints writes per second
+and the mean number of writes committed together.
+"""
+
+import argparse
+import asyncio
+import itertools
+import random
+import time
+from pathlib import Path
+
+from benchmarks import _support, seed
+from metadata_service import admission, cache, writes
+from metadata_service.config import Settings
+
+SYNCHRONOUS = ("normal", "full")
+
+
+async def client_loop(
+    client, rows: int, deadline: float, counts: dict[str, int], names
+):
+    """Alternate creating and updating resources until the deadline."""
+    rng = random.Random()
+    while time.perf_counter() < deadline:
+        if rng.random() < 0.5:
+            response = await client.post(
+                "/resource",
+                json={
+                    "name": f"created-{next(names)}",
+                    "type": "postgres",
+                    "lifecycle_status": "active",
+                    "description": "created",
+                    "owner": _support.SEEDED_TEAM,
+                },
+            )
+        else:
+            response = await client.put(
+                f"/resource/{seed.entity_id('resource', rng.randint(1, rows))}",
+                json={"description": f"updated {rng.random()}"},
+            )
+        counts["writes" if response.status_code == 200 else "errors"] += 1
+
+
+async def run(
+    db_path: Path, settings: Settings, rows: int, clients: int, seconds: float
+) -> dict[str, int]:
+    """Run the write workload with one configuration."""
+    counts = {"writes": 0, "errors": 0}
+    names = itertools.count()
+    async with _support.app_client(db_path, settings) as client:
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(
+            *(
+                client_loop(client, rows, deadline, counts, names)
+                for _ in range(clients)
+            )
+        )
+    return counts
+
+
+def main():
+    """Print writes per second for each client count, durability and batching."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--window-ms", type=float, default=0.0)
+    parser.add_argument("--max-size", type=int, default=100)
+    args = parser.parse_args()
+
+    cache.entities.enabled = False
+    # Measure batching alone, rather than the write routes' concurrency limit.
+    admission.controller.enabled = False
+    print(
+        f"{'synchronous':<13}{'clients':>8}{'batching':>10}"
+        f"{'writes/s':>10}{'errors':>8}{'per batch':>11}"
+    )
+    for synchronous, clients, batching in itertools.product(
+        SYNCHRONOUS, args.clients, (False, True)
+    ):
+        settings = Settings(sqlite_synchronous=synchronous)
+        writes.coordinator = writes.WriteCoordinator(
+            enabled=batching,
+            window_seconds=args.window_ms / 1000,
+            max_size=args.max_size,
+        )
+        with _support.temp_directory() as directory:
+            db_path = _support.create_database(Path(directory))
+            _support.seed_resources(db_path, args.rows)
+            counts = asyncio.run(
+                run(db_path, settings, args.rows, clients, args.seconds)
+            )
+        coordinator = writes.coordinator
+        per_batch = coordinator.writes / coordinator.batches if batching else 1.0
+        print(
+            f"{synchronous:<13}{clients:>8}{'on' if batching else 'off':>10}"
+            f"{counts['writes'] / args.seconds:>10.0f}{counts['errors']:>8}"
+            f"{per_batch:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Benchmark integer, text UUIDv4 and blob UUIDv7 primary keys in SQLite.
+
+Run with ``uv run python -m benchmarks.ids``. Fills a resource-like table
+keyed each way, in transactions of ``--batch`` rows, and reports the insert
+rate, the size of the table and its indexes, and the latency of looking rows
+up by a random ID. Time-ordered UUIDv7s land at the end of the primary key
+index like integers do, random UUIDv4s land on a random page of it, which
+shows up in the insert rate once the index outgrows the page cache.
+"""
+
+import argparse
+import random
+import sqlite3
+import statistics
+import time
+import uuid
+from collections.abc import Callable
+from pathlib import Path
+
+from benchmarks import _support
+from metadata_service import ids
+
+SCHEMES: dict[str, tuple[str, Callable[[int], object]]] = {
+    "integer": ("INTEGER", lambda n: n),
+    "text uuid4": ("TEXT", lambda n: str(uuid.uuid4())),
+    "blob uuid7": ("BLOB", lambda n: ids.uuid7().bytes),
+}
+"""The column type of each scheme and how it generates the nth ID."""
+
+
+def create_table(conn: sqlite3.Connection, id_type: str):
+    """Create a resource table, its owner and name indexes keyed by some type."""
+    conn.executescript(
+        f"CREATE TABLE resource (id {id_type} PRIMARY KEY NOT NULL, "
+        f"name TEXT NOT NULL, owner {id_type} NOT NULL, description TEXT NOT NULL);"
+        "CREATE INDEX ix_resource_owner ON resource (owner, id);"
+        "CREATE INDEX ix_resource_name ON resource (name, id);"
+    )
+
+
+def measure(
+    db_path: Path, id_type: str, new_id: Callable[[int], object], args
+) -> dict[str, float]:
+    """Fill a table keyed one way and time inserts and lookups."""
+    rng = random.Random(0)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(f"PRAGMA cache_size = -{args.cache_mib * 1024}")
+        create_table(conn, id_type)
+        owners = [new_id(n) for n in range(1, args.rows // 100 + 1)]
+        keys = []
+        start = time.perf_counter()
+        for offset in range(0, args.rows, args.batch):
+            rows = []
+            for n in range(offset + 1, min(offset + args.batch, args.rows) + 1):
+                keys.append(new_id(n))
+                rows.append(
+                    (keys[-1], f"resource-{rng.randrange(1 << 30)}", rng.choice(owners))
+                )
+            with conn:
+                conn.executemany(
+                    "INSERT INTO resource (id, name, owner, description) "
+                    "VALUES (?, ?, ?, 'synthetic resource')",
+                    rows,
+                )
+        insert_seconds = time.perf_counter() - start
+        sizes = dict(conn.execute("SELECT name, sum(pgsize) FROM dbstat GROUP BY name"))
+
+        latencies = []
+        for key in rng.sample(keys, args.lookups):
+            start = time.perf_counter()
+            conn.execute("SELECT * FROM resource WHERE id = ?", (key,)).fetchone()
+            latencies.append(time.perf_counter() - start)
+    # An integer primary key is the rowid of the table, with no index of its own.
+    primary_key = sum(
+        size for name, size in sizes.items() if name.startswith("sqlite_autoindex")
+    )
+    return {
+        "rows_per_second": args.rows / insert_seconds,
+        "table_mib": sizes["resource"] / 2**20,
+        "primary_key_mib": primary_key / 2**20,
+        "index_mib": (sizes["ix_resource_owner"] + sizes["ix_resource_name"]) / 2**20,
+        "file_mib": db_path.stat().st_size / 2**20,
+        "lookup_us": statistics.median(latencies) * 1_000_000,
+    }
+
+
+def main():
+    """Print the insert rate, sizes and lookup latency of every ID scheme."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=1_000)
+    parser.add_argument("--lookups", type=int, default=10_000)
+    parser.add_argument("--cache-mib", type=int, default=8)
+    args = parser.parse_args()
+
+    print(
+        f"{'scheme':<12}{'rows/s':>10}{'table MiB':>11}{'pk MiB':>8}"
+        f"{'index MiB':>11}{'file MiB':>10}{'lookup us':>11}"
+    )
+    with _support.temp_directory() as directory:
+        for name, (id_type, new_id) in SCHEMES.items():
+            db_path = Path(directory) / f"{name.replace(' ', '_')}.db"
+            row = measure(db_path, id_type, new_id, args)
+            print(
+                f"{name:<12}{row['rows_per_second']:>10.0f}{row['table_mib']:>11.1f}"
+                f"{row['primary_key_mib']:>8.1f}{row['index_mib']:>11.1f}"
+                f"{row['file_mib']:>10.1f}{row['lookup_us']:>11.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
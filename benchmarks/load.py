@@ -0,0 +1,224 @@
+"""Concurrent async load driver for the metadata service.
+
+Workers pick weighted operations and call the app either in-process through
+httpx's ASGI transport or over HTTP against a uvicorn server, recording the
+latency of every call per operation.
+"""
+
+import asyncio
+import contextlib
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from benchmarks import _support
+from benchmarks.seed import SeedSpec, entity_id
+
+
+@dataclass(frozen=True)
+class Operation:
+    """A kind of request the load driver sends."""
+
+    name: str
+    weight: int
+    build: Callable[[random.Random, SeedSpec], tuple[str, str, Any]]
+    """Build the method, URL and JSON body of a request."""
+
+
+def _pick(rng: random.Random, table: str, count: int) -> str:
+    """Pick the ID of a random seeded row of a table."""
+    return str(entity_id(table, rng.randint(1, count)))
+
+
+def _resource_body(rng: random.Random, spec: SeedSpec) -> dict[str, Any]:
+    """Build the body of a new resource owned by a random team."""
+    return {
+        "name": f"load-{rng.randrange(1 << 30)}",
+        "type": "postgres",
+        "lifecycle_status": "active",
+        "description": "created by the load driver",
+        "owner": _pick(rng, "team", spec.teams),
+    }
+
+
+DEFAULT_OPERATIONS = (
+    Operation(
+        "GET /resources/{id}",
+        30,
+        lambda rng, spec: (
+            "GET",
+            f"/resources/{_pick(rng, 'resource', spec.resources)}",
+            None,
+        ),
+    ),
+    Operation(
+        "GET /resources",
+        10,
+        lambda rng, spec: ("GET", "/resources?limit=50", None),
+    ),
+    Operation(
+        "GET /teams/{id}",
+        15,
+        lambda rng, spec: ("GET", f"/teams/{_pick(rng, 'team', spec.teams)}", None),
+    ),
+    Operation(
+        "GET /users/{id}",
+        15,
+        lambda rng, spec: ("GET", f"/users/{_pick(rng, 'user', spec.users)}", None),
+    ),
+    Operation(
+        "GET /users",
+        5,
+        lambda rng, spec: ("GET", "/users?limit=50&sort=name", None),
+    ),
+    Operation(
+        "PUT /resource/{id}",
+        15,
+        lambda rng, spec: (
+            "PUT",
+            f"/resource/{_pick(rng, 'resource', spec.resources)}",
+            {"description": f"updated {rng.random()}"},
+        ),
+    ),
+    Operation(
+        "POST /resource",
+        10,
+        lambda rng, spec: ("POST", "/resource", _resource_body(rng, spec)),
+    ),
+)
+"""A read-heavy service-discovery mix with some writes."""
+
+
+@dataclass
+class LoadResult:
+    """Latencies and errors recorded by a load run."""
+
+    seconds: float = 0.0
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    spec: SeedSpec,
+    *,
+    concurrency: int,
+    duration: float,
+    operations: tuple[Operation, ...] = DEFAULT_OPERATIONS,
+    random_seed: int = 0,
+) -> LoadResult:
+    """Drive the app with concurrent workers until the duration has passed.
+
+    Args:
+        client (httpx.AsyncClient): The client to send requests with.
+        spec (SeedSpec): The shape of the seeded database, for picking IDs.
+        concurrency (int): The number of concurrent workers.
+        duration (float): How long to send requests for in seconds.
+        operations (tuple[Operation, ...], optional): The weighted request mix.
+            Defaults to DEFAULT_OPERATIONS.
+        random_seed (int, optional): Seed for the request mix. Defaults to 0.
+    """
+    result = LoadResult()
+    weights = [operation.weight for operation in operations]
+    deadline = time.perf_counter() + duration
+
+    async def worker(worker_id: int):
+        rng = random.Random(random_seed * 1_000_003 + worker_id)
+        while time.perf_counter() < deadline:
+            operation = rng.choices(operations, weights)[0]
+            method, url, body = operation.build(rng, spec)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, json=body)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            result.latencies[operation.name].append(time.perf_counter() - start)
+            if failed:
+                result.errors[operation.name] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def _free_port() -> int:
+    """Find a free local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.asynccontextmanager
+async def uvicorn_client(
+    db_path: Path, workers: int = 1, env: dict[str, str] | None = None
+) -> AsyncIterator[httpx.AsyncClient]:
+    """Start uvicorn on a database and yield a client for it.
+
+    Args:
+        db_path (Path): The database the server uses.
+        workers (int, optional): The number of uvicorn worker processes.
+            Defaults to 1.
+        env (dict[str, str] | None, optional): Extra environment variables for
+            the server. Defaults to None.
+    """
+    port = _free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "metadata_service.main:app",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+        ],
+        env={
+            **os.environ,
+            "METADATA_DATABASE_URL": f"sqlite+aiosqlite:///{db_path}",
+            **(env or {}),
+        },
+    )
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=30
+        ) as client:
+            for _ in range(200):
+                with contextlib.suppress(httpx.TransportError):
+                    if (await client.get("/health/check")).status_code == 200:
+                        break
+                await asyncio.sleep(0.05)
+            else:
+                raise RuntimeError("uvicorn did not start")
+            yield client
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+@contextlib.asynccontextmanager
+async def target_client(
+    db_path: Path, target: str, workers: int = 1
+) -> AsyncIterator[httpx.AsyncClient]:
+    """Yield a client for an in-process ("asgi") or "uvicorn" target."""
+    if target == "asgi":
+        async with _support.app_client(db_path) as client:
+            yield client
+    else:
+        async with uvicorn_client(db_path, workers) as client:
+            yield client
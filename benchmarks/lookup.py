@@ -0,0 +1,60 @@
+"""Benchmark getting a list of resources one by one versus in one lookup.
+
+Run with ``uv run python -m benchmarks.lookup``. The entity cache is disabled
+so both paths read from SQLite.
+"""
+
+import argparse
+import asyncio
+import random
+from pathlib import Path
+
+from benchmarks import _support, seed
+from metadata_service import cache
+
+SIZES = (50, 200, 500)
+
+
+async def run(db_path: Path, rows: int, repeat: int):
+    """Time fetching lists of IDs both ways."""
+    rng = random.Random(0)
+    async with _support.app_client(db_path) as client:
+        print(f"{'ids':>6}{'per id ms':>12}{'lookup ms':>12}{'speedup':>10}")
+        for size in SIZES:
+            ids = [
+                str(seed.entity_id("resource", n))
+                for n in rng.sample(range(1, rows + 1), size)
+            ]
+
+            async def one_by_one():
+                for id in ids:
+                    (await client.get(f"/resources/{id}")).raise_for_status()
+
+            async def lookup():
+                response = await client.post("/resources:lookup", json={"ids": ids})
+                response.raise_for_status()
+
+            single = await _support.time_calls(one_by_one, repeat)
+            batched = await _support.time_calls(lookup, repeat)
+            print(
+                f"{size:>6}{single['median_ms']:>12.1f}{batched['median_ms']:>12.1f}"
+                f"{single['median_ms'] / batched['median_ms']:>9.1f}x"
+            )
+
+
+def main():
+    """Seed a resource table and print the latency of both paths."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    cache.entities.enabled = False
+    with _support.temp_directory() as directory:
+        db_path = _support.create_database(Path(directory))
+        _support.seed_resources(db_path, args.rows)
+        asyncio.run(run(db_path, args.rows, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Benchmark the per-request cost of the metrics middleware.
+
+Run with ``uv run python -m benchmarks.metrics_overhead``. Each endpoint is
+called with metrics recording on and off, alternating rounds to even out noise.
+"""
+
+import argparse
+import asyncio
+import time
+from pathlib import Path
+
+from benchmarks import _support, seed
+from metadata_service import metrics
+
+ENDPOINTS = {
+    "/health/check": "/health/check",
+    "/resources/{id}": f"/resources/{seed.entity_id('resource', 1)}",
+    "/resources?limit=10": "/resources?limit=10",
+}
+
+
+async def mean_latency_us(client, url: str, calls: int) -> float:
+    """Return the mean latency of calls to a URL in microseconds."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        response = await client.get(url)
+        response.raise_for_status()
+    return (time.perf_counter() - start) / calls * 1_000_000
+
+
+async def run(db_path: Path, calls: int, rounds: int):
+    """Time every endpoint with metrics on and off."""
+    async with _support.app_client(db_path) as client:
+        print(f"{'endpoint':<22}{'off us':>10}{'on us':>10}{'overhead':>10}")
+        for name, url in ENDPOINTS.items():
+            totals = {True: 0.0, False: 0.0}
+            for _ in range(rounds):
+                for enabled in (False, True):
+                    metrics.registry.enabled = enabled
+                    totals[enabled] += await mean_latency_us(client, url, calls)
+            off, on = totals[False] / rounds, totals[True] / rounds
+            print(f"{name:<22}{off:>10.1f}{on:>10.1f}{(on - off) / off:>10.1%}")
+    metrics.registry.enabled = True
+
+
+def main():
+    """Print the latency each endpoint gains from recording metrics."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    with _support.temp_directory() as directory:
+        db_path = _support.create_database(Path(directory))
+        _support.seed_resources(db_path, 1_000)
+        asyncio.run(run(db_path, args.calls, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
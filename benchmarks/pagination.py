@@ -0,0 +1,69 @@
+"""Benchmark offset versus keyset pagination on deep pages of /resources.
+
+Run with ``uv run python -m benchmarks.pagination``. Offset latency grows with
+the page number because SQLite walks every skipped row, keyset latency stays
+flat from page 1 to page 10,000.
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+
+from benchmarks import _support, seed
+from metadata_service import pagination
+from metadata_service.models import database
+
+PAGES = (1, 10, 100, 1_000, 10_000)
+
+
+def cursor_for_page(page: int, limit: int, sort: pagination.SortField) -> str | None:
+    """Build the cursor a client would hold when requesting a page."""
+    if page == 1:
+        return None
+    last = (page - 1) * limit
+    # Seeded names are zero padded from n - 1, so name order matches id order.
+    row = database.Resource(
+        id=seed.entity_id("resource", last), name=f"resource-{last - 1:08d}"
+    )
+    return pagination.encode_cursor(row, sort)
+
+
+async def run(db_path: Path, limit: int, repeat: int):
+    """Time each page with skip and with a cursor for both sort orders."""
+    async with _support.app_client(db_path) as client:
+        print(f"{'sort':<6}{'page':>8}{'skip ms':>12}{'cursor ms':>12}")
+        for sort in ("id", "name"):
+            for page in PAGES:
+                skip_params = {"skip": (page - 1) * limit, "limit": limit, "sort": sort}
+                cursor_params: dict[str, str | int] = {"limit": limit, "sort": sort}
+                cursor = cursor_for_page(page, limit, sort)
+                if cursor is not None:
+                    cursor_params["cursor"] = cursor
+
+                offset = await _support.time_calls(
+                    lambda: client.get("/resources", params=skip_params), repeat
+                )
+                keyset = await _support.time_calls(
+                    lambda: client.get("/resources", params=cursor_params), repeat
+                )
+                print(
+                    f"{sort:<6}{page:>8}{offset['median_ms']:>12.2f}"
+                    f"{keyset['median_ms']:>12.2f}"
+                )
+
+
+def main():
+    """Seed a resource table and print page latency by page number."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with _support.temp_directory() as directory:
+        db_path = _support.create_database(Path(directory))
+        _support.seed_resources(db_path, max(PAGES) * args.limit)
+        asyncio.run(run(db_path, args.limit, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
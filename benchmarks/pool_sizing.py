@@ -0,0 +1,73 @@
+"""Benchmark throughput and checkout waits against connection pool size.
+
+Run with ``uv run python -m benchmarks.pool_sizing``. Drives the load test's
+request mix in process with ``--concurrency`` clients, against a queue pool of
+each ``--pool-sizes`` with no overflow, and reports requests/sec, p95 latency
+and how long checkouts waited for a connection, read from ``/health/pool``.
+A pool smaller than the concurrency shows up as wait time.
+"""
+
+import argparse
+import asyncio
+import statistics
+from pathlib import Path
+
+from benchmarks import _support, load
+from benchmarks.seed import SeedSpec, seed
+from metadata_service.config import Settings
+
+
+async def measure(
+    db_path: Path, spec: SeedSpec, pool_size: int, args: argparse.Namespace
+) -> dict[str, float]:
+    """Drive the app with one pool size and summarise the run."""
+    settings = Settings(db_pool_size=pool_size, db_max_overflow=0)
+    async with _support.app_client(db_path, settings) as client:
+        await load.run_load(
+            client, spec, concurrency=args.concurrency, duration=args.warmup
+        )
+        before = (await client.get("/health/pool")).json()
+        result = await load.run_load(
+            client, spec, concurrency=args.concurrency, duration=args.duration
+        )
+        after = (await client.get("/health/pool")).json()
+    latencies = [latency for values in result.latencies.values() for latency in values]
+    checkouts = after["checkouts"] - before["checkouts"]
+    waited = after["wait_seconds"] - before["wait_seconds"]
+    return {
+        "rps": len(latencies) / result.seconds,
+        "p95_ms": statistics.quantiles(latencies, n=20)[-1] * 1000,
+        "wait_ms": waited / max(checkouts, 1) * 1000,
+        "max_wait_ms": after["max_wait_seconds"] * 1000,
+        "timeouts": after["timeouts"],
+    }
+
+
+def main():
+    """Seed a database and print the load test results for each pool size."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[1, 2, 5, 10, 20])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--warmup", type=float, default=1.0)
+    args = parser.parse_args()
+
+    spec = SeedSpec()
+    with _support.temp_directory() as directory:
+        db_path = Path(directory) / "pool.db"
+        seed(db_path, spec)
+        print(
+            f"{'pool':<6}{'req/s':>8}{'p95 ms':>10}{'wait ms':>10}"
+            f"{'max wait ms':>13}{'timeouts':>10}"
+        )
+        for pool_size in args.pool_sizes:
+            row = asyncio.run(measure(db_path, spec, pool_size, args))
+            print(
+                f"{pool_size:<6}{row['rps']:>8.0f}{row['p95_ms']:>10.1f}"
+                f"{row['wait_ms']:>10.2f}{row['max_wait_ms']:>13.1f}"
+                f"{row['timeouts']:>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Summarise load runs, save them as JSON baselines and compare against one."""
+
+import json
+import math
+import platform
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from benchmarks.load import LoadResult
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Get a nearest-rank percentile of sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarise(result: LoadResult, meta: dict[str, Any]) -> dict[str, Any]:
+    """Build the JSON report of a load run.
+
+    Latencies are reported in milliseconds per endpoint, with requests/sec
+    measured over the whole run.
+    """
+    endpoints: dict[str, dict[str, float]] = {}
+    for name, latencies in sorted(result.latencies.items()):
+        values = sorted(latencies)
+        endpoints[name] = {
+            "requests": len(values),
+            "errors": result.errors.get(name, 0),
+            "rps": len(values) / result.seconds,
+            "p50_ms": percentile(values, 0.50) * 1000,
+            "p95_ms": percentile(values, 0.95) * 1000,
+            "p99_ms": percentile(values, 0.99) * 1000,
+        }
+    total = sum(len(values) for values in result.latencies.values())
+    return {
+        "meta": {
+            **meta,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "total_rps": total / result.seconds if result.seconds else 0.0,
+        "endpoints": endpoints,
+    }
+
+
+def save(report: dict[str, Any], path: Path):
+    """Write a report as JSON."""
+    path.write_text(json.dumps(report, indent=2) + "\n")
+
+
+def load(path: Path) -> dict[str, Any]:
+    """Read a JSON report."""
+    return json.loads(path.read_text())
+
+
+@dataclass(frozen=True)
+class Regression:
+    """A metric of an endpoint that got worse than the threshold allows."""
+
+    endpoint: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        """The relative change from the baseline."""
+        return (self.current - self.baseline) / self.baseline
+
+
+def compare(
+    baseline: dict[str, Any], current: dict[str, Any], threshold: float = 0.2
+) -> list[Regression]:
+    """Find endpoints whose latency rose or throughput fell past a threshold.
+
+    Args:
+        baseline (dict): The baseline report.
+        current (dict): The report to check.
+        threshold (float, optional): The tolerated relative change.
+            Defaults to 0.2.
+    """
+    regressions: list[Regression] = []
+    for name, before in baseline["endpoints"].items():
+        after = current["endpoints"].get(name)
+        if after is None:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            if before[metric] and after[metric] > before[metric] * (1 + threshold):
+                regressions.append(
+                    Regression(name, metric, before[metric], after[metric])
+                )
+        if before["rps"] and after["rps"] < before["rps"] * (1 - threshold):
+            regressions.append(Regression(name, "rps", before["rps"], after["rps"]))
+    return regressions
+
+
+def render(report: dict[str, Any]) -> str:
+    """Render a report as a table."""
+    lines = [
+        f"{'endpoint':<24}{'requests':>10}{'errors':>8}{'rps':>10}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    ]
+    for name, stats in report["endpoints"].items():
+        lines.append(
+            f"{name:<24}{stats['requests']:>10}{stats['errors']:>8}"
+            f"{stats['rps']:>10.1f}{stats['p50_ms']:>10.2f}"
+            f"{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}"
+        )
+    lines.append(f"total rps: {report['total_rps']:.1f}")
+    return "\n".join(lines)
@@ -0,0 +1,115 @@
+"""Benchmark statements and latency of RETURNING updates and deletes.
+
+Run with ``uv run python -m benchmarks.returning``. Compares the previous
+SELECT, flush and refresh handlers (reproduced here) with the current
+single-statement handlers, calling both directly with a session.
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+from fastapi import Response
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlmodel import select
+
+from benchmarks import _support, seed
+from metadata_service.config import Settings
+from metadata_service.db import build_engine
+from metadata_service.models import database, put
+from metadata_service.routers import resource as resource_router
+
+
+async def legacy_update(session: AsyncSession, id: uuid.UUID, description: str):
+    """Update a resource the way the handler did before RETURNING."""
+    async with session.begin():
+        result = await session.execute(
+            select(database.Resource).where(database.Resource.id == id)
+        )
+        resource = result.scalars().one()
+        resource.description = description
+        session.add(resource)
+        await session.flush()
+        await session.refresh(resource)
+
+
+async def legacy_delete(session: AsyncSession, id: uuid.UUID):
+    """Delete a resource the way the handler did before RETURNING."""
+    async with session.begin():
+        result = await session.execute(
+            select(database.Resource).where(database.Resource.id == id)
+        )
+        await session.delete(result.scalars().one())
+        await session.flush()
+
+
+async def returning_update(session: AsyncSession, id: uuid.UUID, description: str):
+    """Update a resource with the current handler."""
+    request = put.RequestResource(description=description)
+    await resource_router.update_resource(id, request, session, Response(), None)
+
+
+async def returning_delete(session: AsyncSession, id: uuid.UUID):
+    """Delete a resource with the current handler."""
+    await resource_router.delete_resource(id, session)
+
+
+async def measure(
+    sessionmaker: async_sessionmaker[AsyncSession],
+    statements: list[str],
+    calls: int,
+    call: Callable[[AsyncSession, uuid.UUID], Awaitable[None]],
+) -> tuple[float, float]:
+    """Return statements per call and mean latency in milliseconds."""
+    statements.clear()
+    start = time.perf_counter()
+    for n in range(1, calls + 1):
+        async with sessionmaker() as session:
+            await call(session, seed.entity_id("resource", n))
+    elapsed = time.perf_counter() - start
+    return len(statements) / calls, elapsed / calls * 1000
+
+
+async def run(directory: Path, calls: int):
+    """Run each path against a fresh copy of the seeded database."""
+    paths: dict[str, Callable[[AsyncSession, uuid.UUID], Awaitable[None]]] = {
+        "update select+flush+refresh": lambda s, id: legacy_update(s, id, "new"),
+        "update returning": lambda s, id: returning_update(s, id, "new"),
+        "delete select+delete": legacy_delete,
+        "delete returning": returning_delete,
+    }
+    print(f"{'path':<30}{'stmts/req':>10}{'ms/req':>10}")
+    for name, call in paths.items():
+        path_directory = directory / name.replace(" ", "_")
+        path_directory.mkdir()
+        db_path = _support.create_database(path_directory)
+        _support.seed_resources(db_path, calls)
+        engine = build_engine(Settings(database_url=f"sqlite+aiosqlite:///{db_path}"))
+        statements: list[str] = []
+        event.listen(
+            engine.sync_engine,
+            "before_cursor_execute",
+            lambda *args: statements.append(args[2]),
+        )
+        sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+        per_call, latency = await measure(sessionmaker, statements, calls, call)
+        await engine.dispose()
+        print(f"{name:<30}{per_call:>10.1f}{latency:>10.3f}")
+
+
+def main():
+    """Print statements per request and latency for each path."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=2_000)
+    args = parser.parse_args()
+
+    with _support.temp_directory() as directory:
+        asyncio.run(run(Path(directory), args.calls))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark full-text search against scanning for the same words.
+
+Run with ``uv run python -m benchmarks.search``. Seeds a resource table (1M
+rows by default), then times ``GET /resources/search`` for a rare word, a
+prefix and a word every row contains, next to the ``LIKE`` scan a client
+paging through ``/resources`` would otherwise have to stand in for.
+"""
+
+import argparse
+import asyncio
+import sqlite3
+import time
+from pathlib import Path
+
+from benchmarks import _support
+
+
+def queries(rows: int) -> list[tuple[str, str, str]]:
+    """Get the search queries and their equivalent LIKE patterns."""
+    rare = str(rows // 2)
+    return [
+        ("rare word", rare, f"% {rare}"),
+        ("prefix", f"{rare[:-1]}*", f"% {rare[:-1]}%"),
+        ("every row", "synthetic", "%synthetic%"),
+    ]
+
+
+def time_scan(db_path: Path, pattern: str, limit: int, repeat: int) -> float:
+    """Time a LIKE scan of resource descriptions, median milliseconds."""
+    samples = []
+    with sqlite3.connect(db_path) as conn:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            conn.execute(
+                "SELECT * FROM resource WHERE description LIKE ? LIMIT ?",
+                (pattern, limit),
+            ).fetchall()
+            samples.append((time.perf_counter() - start) * 1000)
+    return sorted(samples)[len(samples) // 2]
+
+
+async def run(db_path: Path, rows: int, limit: int, repeat: int):
+    """Time each query through the search endpoint and as a scan."""
+    async with _support.app_client(db_path) as client:
+        print(f"{'query':<12}{'search ms':>12}{'p95 ms':>10}{'LIKE ms':>10}")
+        for name, q, pattern in queries(rows):
+
+            async def search():
+                response = await client.get(
+                    "/resources/search", params={"q": q, "limit": limit}
+                )
+                response.raise_for_status()
+
+            timings = await _support.time_calls(search, repeat)
+            scan = time_scan(db_path, pattern, limit, repeat)
+            print(
+                f"{name:<12}{timings['median_ms']:>12.1f}"
+                f"{timings['p95_ms']:>10.1f}{scan:>10.1f}"
+            )
+
+
+def main():
+    """Seed a resource table and print search latency."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with _support.temp_directory() as directory:
+        db_path = _support.create_database(Path(directory))
+        start = time.perf_counter()
+        _support.seed_resources(db_path, args.rows)
+        print(
+            f"seeded and indexed {args.rows} rows in {time.perf_counter() - start:.1f}s"
+        )
+        asyncio.run(run(db_path, args.rows, args.limit, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
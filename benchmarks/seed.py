@@ -0,0 +1,197 @@
+"""Seed a SQLite database with a reproducible synthetic inventory.
+
+Every company gets the same number of users and teams, every team gets members
+from its company and owns the same number of resources. Rows are numbered in
+order and the nth row of a table gets the UUIDv7 ``entity_id(table, n)``, so a
+seeded database of a given shape always has the same IDs, and membership is
+drawn from a seeded random generator.
+
+Run with ``uv run python -m benchmarks.seed <path> [--companies N ...]``.
+"""
+
+import argparse
+import random
+import sqlite3
+import uuid
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlmodel import SQLModel
+
+from metadata_service import ids
+from metadata_service.models import database  # noqa: F401 (registers the tables)
+
+RESOURCE_TYPES = ("postgres", "s3", "lambda", "kafka", "redis")
+LIFECYCLE_STATUSES = ("active", "active", "active", "deprecated", "inactive")
+
+SEED_EPOCH_MS = 1_735_689_600_000
+"""The creation time of the first seeded row, 2025-01-01."""
+
+TABLES = ("company", "user", "team", "resource")
+
+
+@dataclass(frozen=True)
+class SeedSpec:
+    """The shape of a seeded database."""
+
+    companies: int = 10
+    users_per_company: int = 100
+    teams_per_company: int = 10
+    members_per_team: int = 8
+    resources_per_team: int = 100
+    random_seed: int = 42
+
+    @property
+    def users(self) -> int:
+        """Total users."""
+        return self.companies * self.users_per_company
+
+    @property
+    def teams(self) -> int:
+        """Total teams."""
+        return self.companies * self.teams_per_company
+
+    @property
+    def resources(self) -> int:
+        """Total resources."""
+        return self.teams * self.resources_per_team
+
+
+def entity_id(table: str, n: int) -> uuid.UUID:
+    """Get the ID of the nth seeded row of a table.
+
+    Rows are a millisecond apart, so IDs sort in row order, and the random
+    bits name the table, so tables do not share IDs.
+    """
+    return ids.pack(SEED_EPOCH_MS + n, 0, TABLES.index(table))
+
+
+def _id(table: str, n: int) -> bytes:
+    """Get the stored form of the ID of the nth seeded row of a table."""
+    return entity_id(table, n).bytes
+
+
+def create_schema(db_path: Path):
+    """Create every table and index the models declare."""
+    engine = create_engine(f"sqlite:///{db_path}")
+    SQLModel.metadata.create_all(engine)
+    engine.dispose()
+
+
+def _chunks(rows: Iterator[tuple], size: int = 10_000) -> Iterator[list[tuple]]:
+    """Split rows into lists for executemany."""
+    chunk: list[tuple] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def seed(db_path: Path, spec: SeedSpec):
+    """Fill an empty database with the inventory described by a spec.
+
+    Args:
+        db_path (Path): The database file, created if it does not exist.
+        spec (SeedSpec): The shape of the inventory.
+    """
+    create_schema(db_path)
+    rng = random.Random(spec.random_seed)
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO company (id, name) VALUES (?, ?)",
+            (
+                (_id("company", c), f"company-{c:05d}")
+                for c in range(1, spec.companies + 1)
+            ),
+        )
+        conn.executemany(
+            "INSERT INTO user (id, name, email, company_id) VALUES (?, ?, ?, ?)",
+            (
+                (
+                    _id("user", u),
+                    f"user-{u:07d}",
+                    f"user-{u:07d}@fake.com",
+                    _id("company", _company_of_user(spec, u)),
+                )
+                for u in range(1, spec.users + 1)
+            ),
+        )
+        conn.executemany(
+            "INSERT INTO team (id, name, company_id, description) VALUES (?, ?, ?, ?)",
+            (
+                (
+                    _id("team", t),
+                    f"team-{t:06d}",
+                    _id("company", _company_of_team(spec, t)),
+                    f"team {t}",
+                )
+                for t in range(1, spec.teams + 1)
+            ),
+        )
+        for chunk in _chunks(_memberships(spec, rng)):
+            conn.executemany(
+                "INSERT INTO team_members (team_id, user_id) VALUES (?, ?)", chunk
+            )
+        for chunk in _chunks(_resources(spec, rng)):
+            conn.executemany(
+                "INSERT INTO resource "
+                "(id, name, type, lifecycle_status, description, owner) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                chunk,
+            )
+
+
+def _company_of_user(spec: SeedSpec, user_id: int) -> int:
+    """Get the company a seeded user belongs to."""
+    return (user_id - 1) // spec.users_per_company + 1
+
+
+def _company_of_team(spec: SeedSpec, team_id: int) -> int:
+    """Get the company a seeded team belongs to."""
+    return (team_id - 1) // spec.teams_per_company + 1
+
+
+def _memberships(spec: SeedSpec, rng: random.Random) -> Iterator[tuple[bytes, bytes]]:
+    """Pick distinct members for every team from its company's users."""
+    members = min(spec.members_per_team, spec.users_per_company)
+    for team_id in range(1, spec.teams + 1):
+        first_user = (_company_of_team(spec, team_id) - 1) * spec.users_per_company + 1
+        for user_id in rng.sample(
+            range(first_user, first_user + spec.users_per_company), members
+        ):
+            yield _id("team", team_id), _id("user", user_id)
+
+
+def _resources(spec: SeedSpec, rng: random.Random) -> Iterator[tuple]:
+    """Build every resource, owned by teams in order."""
+    for index in range(spec.resources):
+        yield (
+            _id("resource", index + 1),
+            f"resource-{index:08d}",
+            rng.choice(RESOURCE_TYPES),
+            rng.choice(LIFECYCLE_STATUSES),
+            f"synthetic resource {index}",
+            _id("team", index // spec.resources_per_team + 1),
+        )
+
+
+def main():
+    """Seed a database file from command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path", type=Path)
+    for name, value in asdict(SeedSpec()).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=value)
+    args = vars(parser.parse_args())
+    path = args.pop("path")
+    spec = SeedSpec(**args)
+    seed(path, spec)
+    print(f"seeded {path}: {spec}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Benchmark the per-row cost of serializing a page of resources.
+
+Run with ``uv run python -m benchmarks.serialization``. Times FastAPI's
+``response_model`` path (validate the rows, dump them to Python values, then
+``json.dumps``) against the lean path the collection endpoints use,
+both as bare function calls and through a FastAPI route with no database, so
+the numbers are serialization alone.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections.abc import Callable, Sequence
+
+import httpx
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from benchmarks import seed
+from metadata_service import serialization
+from metadata_service.models import database
+
+
+def rows(count: int) -> list[database.Resource]:
+    """Build a page of resources."""
+    return [
+        database.Resource(
+            id=seed.entity_id("resource", i),
+            name=f"resource-{i:08d}",
+            type="postgres",
+            lifecycle_status="active",
+            description=f"synthetic resource {i}",
+            owner=seed.entity_id("team", 1),
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def per_row_us(call: Callable[[], object], count: int, repeat: int) -> float:
+    """Time a call serializing a page, median microseconds per row."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - start) * 1_000_000 / count)
+    return sorted(samples)[len(samples) // 2]
+
+
+def functions(page: list[database.Resource], repeat: int):
+    """Print the cost of each serialization as a plain function call."""
+    response_model = TypeAdapter(Sequence[database.Resource | None])
+    lean = serialization.adapter(list[database.Resource])
+    paths = {
+        "validate + dump_python + dumps": lambda: json.dumps(
+            response_model.dump_python(
+                response_model.validate_python(page), mode="json"
+            )
+        ),
+        "jsonable_encoder + dumps": lambda: json.dumps(jsonable_encoder(page)),
+        "model_dump_json per row": lambda: [row.model_dump_json() for row in page],
+        "TypeAdapter.dump_json": lambda: lean.dump_json(page),
+    }
+    for name, call in paths.items():
+        print(f"{name:<32}{per_row_us(call, len(page), repeat):>10.2f} us/row")
+
+
+async def routes(page: list[database.Resource], repeat: int):
+    """Print the cost of each serialization through a FastAPI route."""
+    app = FastAPI()
+
+    @app.get("/default", response_model=Sequence[database.Resource | None])
+    async def default() -> Sequence[database.Resource | None]:
+        return page
+
+    @app.get("/lean", response_model=Sequence[database.Resource | None])
+    async def lean():
+        return serialization.json_response(page, list[database.Resource])
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://b") as client:
+        default_body = (await client.get("/default")).json()
+        assert default_body == (await client.get("/lean")).json()
+        for path in ("/default", "/lean"):
+            samples = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                (await client.get(path)).raise_for_status()
+                samples.append((time.perf_counter() - start) * 1_000_000 / len(page))
+            median = sorted(samples)[len(samples) // 2]
+            print(f"{'GET ' + path:<32}{median:>10.2f} us/row")
+
+
+def main():
+    """Print the per-row serialization cost of each path."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    page = rows(args.rows)
+    print(f"{args.rows}-row page")
+    functions(page, args.repeat)
+    asyncio.run(routes(page, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Benchmark mixed read/write throughput across SQLite PRAGMA profiles.
+
+Run with ``uv run python -m benchmarks.sqlite_profiles``. Concurrent clients
+read resources by ID and update them at a fixed ratio against the same seeded
+database under each profile. The entity cache is disabled so reads reach SQLite.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from pathlib import Path
+
+from benchmarks import _support, seed
+from metadata_service import cache
+from metadata_service.config import Settings
+
+PROFILES: dict[str, Settings] = {
+    "rollback-full": Settings(
+        sqlite_journal_mode="delete",
+        sqlite_synchronous="full",
+        sqlite_mmap_size=0,
+        sqlite_cache_size=-2_000,
+        sqlite_temp_store="default",
+    ),
+    "wal-full": Settings(sqlite_journal_mode="wal", sqlite_synchronous="full"),
+    "wal-normal": Settings(
+        sqlite_journal_mode="wal", sqlite_synchronous="normal", sqlite_mmap_size=0
+    ),
+    "wal-normal-mmap": Settings(),
+}
+
+
+async def client_loop(
+    client, rows: int, write_ratio: float, deadline: float, counts: dict[str, int]
+):
+    """Issue reads and writes until the deadline."""
+    rng = random.Random()
+    while time.perf_counter() < deadline:
+        id = seed.entity_id("resource", rng.randint(1, rows))
+        if rng.random() < write_ratio:
+            response = await client.put(
+                f"/resource/{id}", json={"description": f"updated {rng.random()}"}
+            )
+            kind = "writes"
+        else:
+            response = await client.get(f"/resources/{id}")
+            kind = "reads"
+        counts[kind if response.status_code == 200 else "errors"] += 1
+
+
+async def run_profile(
+    db_path: Path,
+    settings: Settings,
+    rows: int,
+    clients: int,
+    seconds: float,
+    write_ratio: float,
+) -> dict[str, int]:
+    """Run the mixed workload against one profile."""
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    async with _support.app_client(db_path, settings) as client:
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(
+            *(
+                client_loop(client, rows, write_ratio, deadline, counts)
+                for _ in range(clients)
+            )
+        )
+    return counts
+
+
+def main():
+    """Print reads, writes and errors per second for every profile."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    cache.entities.enabled = False
+    print(f"{'profile':<18}{'ops/s':>10}{'reads/s':>10}{'writes/s':>10}{'errors':>8}")
+    for name, settings in PROFILES.items():
+        with _support.temp_directory() as directory:
+            db_path = _support.create_database(Path(directory))
+            _support.seed_resources(db_path, args.rows)
+            counts = asyncio.run(
+                run_profile(
+                    db_path,
+                    settings,
+                    args.rows,
+                    args.clients,
+                    args.seconds,
+                    args.write_ratio,
+                )
+            )
+        reads = counts["reads"] / args.seconds
+        writes = counts["writes"] / args.seconds
+        print(
+            f"{name:<18}{reads + writes:>10.0f}{reads:>10.0f}{writes:>10.0f}"
+            f"{counts['errors']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Benchmark answering "what does this company look like".
+
+Run with ``uv run python -m benchmarks.topology``. Times walking a company's
+teams, members, users and resources through the paged list endpoints against
+one ``GET /companies/{id}/topology``, and reports how long the graph takes to
+build and the memory it holds. The entity cache is disabled so the list
+endpoints read from SQLite.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import tracemalloc
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from benchmarks import _support, seed
+from metadata_service import cache, topology
+from metadata_service.pagination import NEXT_CURSOR_HEADER
+
+PAGE_SIZE = 100
+
+
+async def paged(client, url: str, params: dict, calls: list[int]) -> list[dict]:
+    """Follow next page cursors and return every row."""
+    rows: list[dict] = []
+    params = {**params, "limit": PAGE_SIZE}
+    while True:
+        response = await client.get(url, params=params)
+        response.raise_for_status()
+        calls[0] += 1
+        rows.extend(response.json())
+        if NEXT_CURSOR_HEADER not in response.headers:
+            return rows
+        params["cursor"] = response.headers[NEXT_CURSOR_HEADER]
+
+
+async def run(db_path: Path, companies: int, repeat: int):
+    """Time both ways of reading random companies' topology."""
+    rng = random.Random(0)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+    async with _support.app_client(db_path) as client:
+        start = time.perf_counter()
+        await topology.graph.rebuild(sessionmaker)
+        build_seconds = time.perf_counter() - start
+        tracemalloc.start()
+        await topology.graph.rebuild(sessionmaker)
+        graph_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        stats = topology.graph.stats()
+        print(
+            f"graph: {stats.company_count} companies, {stats.team_count} teams, "
+            f"{stats.user_count} users, {stats.resource_count} resources"
+        )
+        print(f"build {build_seconds:.1f}s, {graph_bytes / 2**20:.0f} MiB")
+
+        calls = [0]
+
+        async def walk():
+            calls[0] = 0
+            id = seed.entity_id("company", rng.randint(1, companies))
+            teams = await paged(client, "/teams", {"company_id": id}, calls)
+            await paged(client, "/users", {"company_id": id}, calls)
+            for team in teams:
+                await paged(client, f"/teams/{team['id']}/members", {}, calls)
+                await paged(client, "/resources", {"owner": team["id"]}, calls)
+
+        async def one_call():
+            id = seed.entity_id("company", rng.randint(1, companies))
+            (await client.get(f"/companies/{id}/topology")).raise_for_status()
+
+        walked = await _support.time_calls(walk, repeat)
+        served = await _support.time_calls(one_call, repeat)
+        print(f"{'path':<24}{'calls':>8}{'median ms':>12}{'p95 ms':>10}")
+        print(
+            f"{'paged lists':<24}{calls[0]:>8}"
+            f"{walked['median_ms']:>12.1f}{walked['p95_ms']:>10.1f}"
+        )
+        print(
+            f"{'GET topology':<24}{1:>8}"
+            f"{served['median_ms']:>12.1f}{served['p95_ms']:>10.1f}"
+        )
+    await engine.dispose()
+
+
+def main():
+    """Seed an inventory and print the latency of both paths."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--companies", type=int, default=100)
+    parser.add_argument("--teams-per-company", type=int, default=10)
+    parser.add_argument("--resources-per-team", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    cache.entities.enabled = False
+    with _support.temp_directory() as directory:
+        db_path = Path(directory) / "bench.db"
+        seed.seed(
+            db_path,
+            seed.SeedSpec(
+                companies=args.companies,
+                teams_per_company=args.teams_per_company,
+                resources_per_team=args.resources_per_team,
+            ),
+        )
+        asyncio.run(run(db_path, args.companies, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
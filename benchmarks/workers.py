@@ -0,0 +1,104 @@
+"""Benchmark throughput scaling with the number of uvicorn workers.
+
+Run with ``uv run python -m benchmarks.workers --workers 1 2 4``. Seeds one
+database, then for each worker count serves it behind uvicorn and drives the
+load test's request mix from ``--client-processes`` processes, so the load
+generator is not the bottleneck. Reports requests/sec, the scaling relative to
+one worker, p95 latency and errors. Workers only scale up to the cores there
+are to run them on, shared with the client processes.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import httpx
+
+from benchmarks import _support, load
+from benchmarks.seed import SeedSpec, seed
+
+
+def drive(
+    base_url: str, spec: SeedSpec, concurrency: int, duration: float, random_seed: int
+) -> tuple[int, int, list[float]]:
+    """Drive the server from this process and return requests, errors, latencies."""
+
+    async def run() -> load.LoadResult:
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+        async with httpx.AsyncClient(
+            base_url=base_url, limits=limits, timeout=30
+        ) as client:
+            return await load.run_load(
+                client,
+                spec,
+                concurrency=concurrency,
+                duration=duration,
+                random_seed=random_seed,
+            )
+
+    result = asyncio.run(run())
+    latencies = [latency for values in result.latencies.values() for latency in values]
+    return len(latencies), sum(result.errors.values()), latencies
+
+
+async def measure(
+    db_path: Path, spec: SeedSpec, workers: int, args: argparse.Namespace
+) -> tuple[float, float, int]:
+    """Serve the database with some workers and return req/s, p95 ms, errors."""
+    async with load.uvicorn_client(db_path, workers) as client:
+        base_url = str(client.base_url)
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(args.client_processes) as pool:
+            for duration in (args.warmup, args.duration):
+                runs = await asyncio.gather(
+                    *(
+                        loop.run_in_executor(
+                            pool,
+                            drive,
+                            base_url,
+                            spec,
+                            args.concurrency,
+                            duration,
+                            i,
+                        )
+                        for i in range(args.client_processes)
+                    )
+                )
+    requests = sum(count for count, _, _ in runs)
+    errors = sum(failed for _, failed, _ in runs)
+    latencies = [latency for _, _, values in runs for latency in values]
+    p95 = statistics.quantiles(latencies, n=20)[-1] * 1000 if latencies else 0.0
+    return requests / args.duration, p95, errors
+
+
+def main():
+    """Seed a database and print the throughput of each worker count."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--client-processes", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=32, help="per process")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=1.0)
+    args = parser.parse_args()
+
+    spec = SeedSpec()
+    print(f"{os.cpu_count()} CPUs, {args.client_processes} client processes")
+    with _support.temp_directory() as directory:
+        db_path = Path(directory) / "workers.db"
+        seed(db_path, spec)
+        print(f"{'workers':<10}{'req/s':>10}{'scaling':>10}{'p95 ms':>10}{'errors':>8}")
+        baseline = None
+        for workers in args.workers:
+            rps, p95, errors = asyncio.run(measure(db_path, spec, workers, args))
+            baseline = baseline or rps
+            print(
+                f"{workers:<10}{rps:>10.0f}{rps / baseline:>9.2f}x"
+                f"{p95:>10.1f}{errors:>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -9,13 +9,13 @@ curl -X 'POST' \
   -d "@${PROJECT_HOME}test/sample_data/user.json"
 
   curl -X 'PUT' \
-  'http://127.0.0.1:8000/user/3' \
+  'http://127.0.0.1:8000/user/0192b8c4-6c2d-7104-9e7a-3f5b0c8d2a16' \
   -H 'accept: application/json' \
   -H 'Content-Type: application/json' \
   -d "@${PROJECT_HOME}test/sample_data/update_user.json"
 
 curl -X 'DELETE' \
-  'http://127.0.0.1:8000/user/3' \
+  'http://127.0.0.1:8000/user/0192b8c4-6c2d-7104-9e7a-3f5b0c8d2a16' \
   -H 'accept: application/json'
 
 PROJECT_HOME="/workspaces/metadataservice/"
@@ -0,0 +1,27 @@
+"""A prototype for an API that maintains company metadata."""
+
+import argparse
+
+
+def main():
+    """Serve the API with uvicorn, in one or more worker processes.
+
+    Every worker keeps its own entity cache and topology graph, and follows
+    the change log to stay coherent with the writes of the others.
+    """
+    import uvicorn
+
+    from metadata_service.config import get_settings
+
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Serve the metadata service API.")
+    parser.add_argument("--host", default=settings.host)
+    parser.add_argument("--port", type=int, default=settings.port)
+    parser.add_argument("--workers", type=int, default=settings.workers)
+    args = parser.parse_args()
+    uvicorn.run(
+        "metadata_service.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+    )
@@ -0,0 +1,203 @@
+"""Admission control for the write path.
+
+SQLite has one writer, so under a burst of writes requests pile up waiting for
+the write lock, each holding a pooled connection, until clients time out and
+the reads queued behind them for a connection slow down too. Each write route
+(``POST``, ``PUT``, ``PATCH`` and ``DELETE`` of a route template) is admitted
+through its own gate: up to ``limit`` requests run at once, up to
+``max_queue`` more wait in line for at most ``queue_timeout_seconds``, and the
+rest are rejected at once with ``503 Service Unavailable`` and
+``Retry-After``. Reads are never queued, including the ``POST`` lookups, which
+only take a ``POST`` for ID lists too long for a URL.
+
+Everything runs on the event loop thread, so the counters are plain
+attributes without locks.
+"""
+
+import asyncio
+from collections import defaultdict
+from collections.abc import AsyncIterator
+
+from fastapi import HTTPException, Request
+from pydantic import BaseModel
+
+from metadata_service.config import get_settings
+
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+"""The methods admitted through a route's gate."""
+
+READ_ROUTE_SUFFIXES = (":lookup",)
+"""Suffixes of the routes that only read whatever their method."""
+
+
+class GateStats(BaseModel):
+    """A write route's admission counters."""
+
+    method: str
+    route: str
+    limit: int
+    max_queue: int
+    active: int
+    queued: int
+    admitted: int
+    rejected: dict[str, int]
+
+
+class Gate:
+    """A concurrency limit with a bounded, timed wait queue."""
+
+    def __init__(self, limit: int, max_queue: int):
+        """Create an open gate.
+
+        Args:
+            limit (int): The most requests admitted at once.
+            max_queue (int): The most requests waiting to be admitted.
+        """
+        self.limit = limit
+        self.max_queue = max_queue
+        self.active = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected: dict[str, int] = defaultdict(int)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._semaphore = asyncio.Semaphore(limit)
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Get the semaphore for the running loop, a semaphore is bound to one."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.limit)
+            self.active = 0
+        return self._semaphore
+
+    async def acquire(self, timeout: float) -> str | None:
+        """Wait in line to be admitted.
+
+        Args:
+            timeout (float): The longest to wait in line, in seconds.
+
+        Returns:
+            None once admitted, otherwise why the request was rejected:
+            ``queue_full`` or ``timeout``.
+        """
+        semaphore = self._get_semaphore()
+        if semaphore.locked():
+            if self.queued >= self.max_queue:
+                self.rejected["queue_full"] += 1
+                return "queue_full"
+            self.queued += 1
+            try:
+                await asyncio.wait_for(semaphore.acquire(), timeout)
+            except TimeoutError:
+                self.rejected["timeout"] += 1
+                return "timeout"
+            finally:
+                self.queued -= 1
+        else:
+            await semaphore.acquire()
+        self.active += 1
+        self.admitted += 1
+        return None
+
+    def release(self):
+        """Leave the gate, admitting the next request in line."""
+        self.active -= 1
+        self._semaphore.release()
+
+
+class AdmissionController:
+    """The gates of the write routes."""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        limit: int = 4,
+        max_queue: int = 64,
+        queue_timeout_seconds: float = 5.0,
+        retry_after_seconds: int = 1,
+    ):
+        """Create a controller with no gates yet.
+
+        Args:
+            enabled (bool, optional): Whether to limit writes at all. Defaults
+                to True.
+            limit (int, optional): The most requests a write route runs at
+                once. Defaults to 4.
+            max_queue (int, optional): The most requests waiting for a write
+                route. Defaults to 64.
+            queue_timeout_seconds (float, optional): The longest a request
+                waits in line. Defaults to 5.0.
+            retry_after_seconds (int, optional): The ``Retry-After`` sent with
+                rejections. Defaults to 1.
+        """
+        self.enabled = enabled
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.retry_after_seconds = retry_after_seconds
+        self.gates: dict[tuple[str, str], Gate] = {}
+
+    def gate(self, method: str, route: str) -> Gate:
+        """Get the gate of a write route, creating it on first use."""
+        gate = self.gates.get((method, route))
+        if gate is None:
+            gate = self.gates[(method, route)] = Gate(self.limit, self.max_queue)
+        return gate
+
+    def stats(self) -> list[GateStats]:
+        """Get the counters of every write route's gate."""
+        return [
+            GateStats(
+                method=method,
+                route=route,
+                limit=gate.limit,
+                max_queue=gate.max_queue,
+                active=gate.active,
+                queued=gate.queued,
+                admitted=gate.admitted,
+                rejected=dict(gate.rejected),
+            )
+            for (method, route), gate in self.gates.items()
+        ]
+
+
+_settings = get_settings()
+controller = AdmissionController(
+    enabled=_settings.admission_enabled,
+    limit=_settings.admission_write_concurrency,
+    max_queue=_settings.admission_write_queue_size,
+    queue_timeout_seconds=_settings.admission_queue_timeout_seconds,
+    retry_after_seconds=_settings.admission_retry_after_seconds,
+)
+"""The admission control of the service's write routes."""
+
+
+async def admit(request: Request) -> AsyncIterator[None]:
+    """Admit a write request through its route's gate, for as long as it runs.
+
+    A dependency of every route, so the route template is known and the
+    request is admitted before it checks a connection out for its session.
+
+    Raises:
+        HTTPException: 503 with ``Retry-After`` if the route is saturated.
+    """
+    route = request.scope["route"].path
+    if (
+        request.method not in WRITE_METHODS
+        or route.endswith(READ_ROUTE_SUFFIXES)
+        or not controller.enabled
+    ):
+        yield
+        return
+    gate = controller.gate(request.method, route)
+    if await gate.acquire(controller.queue_timeout_seconds) is not None:
+        raise HTTPException(
+            status_code=503,
+            detail="Service overloaded, retry later",
+            headers={"Retry-After": str(controller.retry_after_seconds)},
+        )
+    try:
+        yield
+    finally:
+        gate.release()
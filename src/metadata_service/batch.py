@@ -0,0 +1,161 @@
+"""Batch create support shared by the entity routers.
+
+A batch is validated up front, given its IDs and inserted with one
+executemany ``INSERT`` inside the request's transaction, instead of one
+transaction, flush and refresh per entity.
+"""
+
+import functools
+import uuid
+from collections.abc import Sequence
+from typing import Any, Literal
+
+from pydantic import BaseModel, ValidationError, create_model
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import SQLModel
+
+from metadata_service import ids
+from metadata_service.models.response import BatchCreateResult, BatchItemError
+
+BatchMode = Literal["atomic", "partial"]
+"""``atomic`` creates every item or none, ``partial`` creates the valid items."""
+
+
+class BatchRejected(Exception):
+    """Raised when an atomic batch contains items that cannot be created."""
+
+    def __init__(self, errors: list[BatchItemError]):
+        """Initialise the exception with the errors of the rejected items."""
+        super().__init__(f"{len(errors)} item(s) rejected")
+        self.errors = errors
+
+
+def _describe(error: ValidationError) -> str:
+    """Flatten a validation error into a single line."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+@functools.cache
+def row_model(model: type[SQLModel]) -> type[BaseModel]:
+    """Build a plain pydantic model with the fields and constraints of a table.
+
+    Validating a table model builds an ORM instance with instrumented
+    attributes, which costs over ten times as much as validating the row alone.
+
+    Args:
+        model (type[SQLModel]): The database model of the entities.
+    """
+    return create_model(
+        f"{model.__name__}Row",
+        **{
+            name: (field.annotation, field)
+            for name, field in model.model_fields.items()
+        },
+    )
+
+
+def validate_items(
+    model: type[SQLModel], items: Sequence[dict[str, Any]], keep_ids: bool = False
+) -> tuple[list[tuple[int, dict[str, Any]]], list[BatchItemError]]:
+    """Validate each item against the model.
+
+    IDs are generated by the service, so a submitted ``id`` is dropped unless
+    ``keep_ids`` is set.
+
+    Args:
+        model (type[SQLModel]): The database model of the entities.
+        items (Sequence[dict]): The submitted items.
+        keep_ids (bool, optional): Whether to keep submitted IDs, so rows
+            exported elsewhere keep the IDs other rows refer to them by.
+            Defaults to False.
+
+    Returns:
+        The valid rows with their index in the batch, and an error for every
+        invalid item.
+    """
+    validator = row_model(model)
+    rows: list[tuple[int, dict[str, Any]]] = []
+    errors: list[BatchItemError] = []
+    for index, item in enumerate(items):
+        try:
+            entity = validator.model_validate(item)
+        except ValidationError as e:
+            errors.append(BatchItemError(index=index, detail=_describe(e)))
+            continue
+        row = entity.model_dump(exclude=None if keep_ids and "id" in item else {"id"})
+        rows.append((index, row))
+    return rows, errors
+
+
+async def _insert(
+    session: AsyncSession, model: type[SQLModel], rows: list[dict[str, Any]]
+) -> list[uuid.UUID]:
+    """Insert rows in one statement and return their IDs in order.
+
+    Rows without an ID are given a new one.
+    """
+    if not rows:
+        return []
+    rows = [row if "id" in row else {**row, "id": ids.uuid7()} for row in rows]
+    # A Core insert on the table skips the ORM's per-row bulk insert bookkeeping.
+    await session.execute(insert(model.__table__), rows)
+    return [row["id"] for row in rows]
+
+
+async def create_many(
+    session: AsyncSession,
+    model: type[SQLModel],
+    items: Sequence[dict[str, Any]],
+    mode: BatchMode = "atomic",
+    keep_ids: bool = False,
+) -> BatchCreateResult:
+    """Validate and insert a batch of entities in the session's transaction.
+
+    Args:
+        session (AsyncSession): The database session, with a transaction begun.
+        model (type[SQLModel]): The database model of the entities.
+        items (Sequence[dict]): The submitted items.
+        mode (BatchMode, optional): How to handle items that cannot be created.
+            Defaults to "atomic".
+        keep_ids (bool, optional): Whether to keep submitted IDs. In partial
+            mode an ID that is already taken rejects its item. Defaults to
+            False.
+
+    Raises:
+        BatchRejected: If the mode is atomic and any item is invalid.
+    """
+    rows, errors = validate_items(model, items, keep_ids)
+    if errors and mode == "atomic":
+        raise BatchRejected(errors)
+
+    created: list[uuid.UUID | None] = [None] * len(items)
+    if mode == "atomic":
+        new_ids = await _insert(session, model, [row for _, row in rows])
+        for (index, _), new_id in zip(rows, new_ids, strict=True):
+            created[index] = new_id
+        return BatchCreateResult(ids=created)
+
+    try:
+        async with session.begin_nested():
+            new_ids = await _insert(session, model, [row for _, row in rows])
+        for (index, _), new_id in zip(rows, new_ids, strict=True):
+            created[index] = new_id
+    except SQLAlchemyError:
+        # Retry row by row to find the rows the database rejected.
+        for index, row in rows:
+            try:
+                async with session.begin_nested():
+                    created[index] = (await _insert(session, model, [row]))[0]
+            except SQLAlchemyError as e:
+                errors.append(
+                    BatchItemError(
+                        index=index, detail=str(getattr(e, "orig", None) or e)
+                    )
+                )
+    errors.sort(key=lambda error: error.index)
+    return BatchCreateResult(ids=created, errors=errors)
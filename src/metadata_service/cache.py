@@ -0,0 +1,258 @@
+"""Read-through cache for entities looked up by ID.
+
+Service-discovery clients ask for the same few hundred IDs over and over, so
+the by-id handlers check this in-process LRU cache before querying SQLite.
+Entries expire after a TTL and are invalidated when an update or delete of
+the entity commits.
+
+A read that started before an invalidation must not put the old row back in
+the cache. Readers take a token before querying and the cache refuses to store
+a row if its key was invalidated after the token was taken.
+
+Each worker process has its own cache, and a commit only invalidates the cache
+of the process that made it. To stay coherent with writes from other workers
+(or tools), every process also follows the change log, invalidating the
+entities it names, so a cached entity is stale for at most the sync interval.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from pydantic import BaseModel
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from metadata_service import changes
+from metadata_service.config import get_settings
+from metadata_service.models import database
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "cache_invalidations"
+_RECENT_INVALIDATIONS = 4096
+
+SYNC_PAGE = 1000
+"""The most changes a sync applies one by one, more clear the whole cache."""
+
+MODELS: dict[str, type] = {
+    model.__tablename__: model for model in database.ENTITIES.values()
+}
+"""The database model of each change log entity name."""
+
+
+class CacheStats(BaseModel):
+    """Counters for an entity cache."""
+
+    enabled: bool
+    size: int
+    max_entries: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+
+
+class EntityCache:
+    """A size-bounded LRU cache with a TTL, keyed by entity type and ID."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        enabled: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Create an empty cache.
+
+        Args:
+            max_entries (int): The most entries to hold before evicting.
+            ttl_seconds (float): How long an entry stays fresh.
+            enabled (bool, optional): Whether to cache at all. Defaults to True.
+            clock (Callable[[], float], optional): The time source.
+                Defaults to time.monotonic.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled and max_entries > 0
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._generation = 0
+        self._invalidated: OrderedDict[Hashable, int] = OrderedDict()
+        self._floor = 0
+        self._synced_seq: int | None = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def token(self) -> int:
+        """Get a token to pass to put, taken before reading from the database."""
+        return self._generation
+
+    def get(self, model: type, id: Hashable) -> Any | None:
+        """Get a fresh cached entity or None.
+
+        Args:
+            model (type): The entity's database model.
+            id (Hashable): The entity's ID.
+        """
+        if not self.enabled:
+            return None
+        key = (model.__name__, id)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, model: type, id: Hashable, value: Any, token: int):
+        """Cache an entity read from the database.
+
+        Args:
+            model (type): The entity's database model.
+            id (Hashable): The entity's ID.
+            value (Any): The entity.
+            token (int): The token taken before the entity was read.
+        """
+        if not self.enabled:
+            return
+        key = (model.__name__, id)
+        if token < self._floor or token < self._invalidated.get(key, 0):
+            return
+        self._entries[key] = (self._clock() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, model: type, id: Hashable):
+        """Drop an entity and stop in-flight reads from caching it again.
+
+        Args:
+            model (type): The entity's database model.
+            id (Hashable): The entity's ID.
+        """
+        key = (model.__name__, id)
+        self._generation += 1
+        self._invalidated[key] = self._generation
+        self._invalidated.move_to_end(key)
+        if len(self._invalidated) > _RECENT_INVALIDATIONS:
+            _, generation = self._invalidated.popitem(last=False)
+            self._floor = max(self._floor, generation)
+        if self._entries.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self):
+        """Drop every entity."""
+        self._generation += 1
+        self._floor = self._generation
+        self._invalidated.clear()
+        self._entries.clear()
+        self._synced_seq = None
+
+    async def sync(self, sessionmaker: async_sessionmaker[AsyncSession]):
+        """Invalidate the entities changed since the last sync, by any process.
+
+        The first sync only records where the change log is. A sync that finds
+        more than ``SYNC_PAGE`` changes, or changes compacted away, clears the
+        cache instead.
+
+        Args:
+            sessionmaker (async_sessionmaker): The factory for the sync's session.
+        """
+        async with sessionmaker() as session, session.begin():
+            since = self._synced_seq
+            if since is not None:
+                try:
+                    page = await changes.read(session, since, SYNC_PAGE)
+                except changes.ChangesExpired:
+                    page = None
+                if page is not None and len(page) < SYNC_PAGE:
+                    for change in page:
+                        model = MODELS.get(change.entity)
+                        if model is not None:
+                            self.invalidate(model, change.entity_id)
+                    self._synced_seq = page[-1].seq if page else since
+                    return
+                self.clear()
+            self._synced_seq = await changes.last_seq(session)
+
+    async def follow_changes(
+        self, sessionmaker: async_sessionmaker[AsyncSession], interval: float
+    ):
+        """Sync with the change log on an interval until cancelled.
+
+        Args:
+            sessionmaker (async_sessionmaker): The factory for the syncs' sessions.
+            interval (float): Seconds between syncs.
+        """
+        while True:
+            try:
+                await self.sync(sessionmaker)
+            except Exception:
+                logger.exception("Entity cache sync failed")
+            await asyncio.sleep(interval)
+
+    def invalidate_on_commit(self, session: AsyncSession, model: type, id: Hashable):
+        """Invalidate an entity once the session's transaction commits.
+
+        Args:
+            session (AsyncSession): The session writing the entity.
+            model (type): The entity's database model.
+            id (Hashable): The entity's ID.
+        """
+        pending: list[tuple[EntityCache, type, Hashable]] = session.info.setdefault(
+            _PENDING_KEY, []
+        )
+        pending.append((self, model, id))
+
+    def stats(self) -> CacheStats:
+        """Get the cache's counters."""
+        return CacheStats(
+            enabled=self.enabled,
+            size=len(self._entries),
+            max_entries=self.max_entries,
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            expirations=self.expirations,
+            invalidations=self.invalidations,
+        )
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session):
+    """Apply the invalidations queued by a transaction that committed."""
+    for cache, model, id in session.info.pop(_PENDING_KEY, []):
+        cache.invalidate(model, id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_rolled_back(session: Session, previous_transaction: Any):
+    """Forget the invalidations queued by a transaction that rolled back."""
+    if not session.in_transaction():
+        session.info.pop(_PENDING_KEY, None)
+
+
+_settings = get_settings()
+entities = EntityCache(
+    max_entries=_settings.cache_max_entries,
+    ttl_seconds=_settings.cache_ttl_seconds,
+    enabled=_settings.cache_enabled,
+)
+"""The cache shared by the by-id handlers."""
@@ -0,0 +1,246 @@
+"""The change feed, for consumers that sync incrementally.
+
+Triggers on the entity tables append every insert, update and delete to the
+``change_log`` table in the writing transaction, whichever endpoint (or tool
+outside the service) made it. Entries carry a sequence number that only ever
+grows, so a consumer reads the changes after the last one it saw, re-reads the
+entities that changed and remembers the new sequence number. SQLite has one
+writer at a time, so entries commit in sequence order and a consumer cannot
+skip past an entry that commits late.
+
+The log is compacted by age and length. A consumer asking for changes older
+than the oldest kept entry gets ``ChangesExpired`` and must sync in full again.
+"""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from metadata_service import serialization
+from metadata_service.config import Settings
+from metadata_service.models import database
+from metadata_service.models import response as api
+
+logger = logging.getLogger(__name__)
+
+EVENT_STREAM_MEDIA_TYPE = "text/event-stream"
+
+POLL_INTERVAL_SECONDS = 0.1
+"""How often a waiting request checks the log for new entries."""
+
+MAX_WAIT_SECONDS = 30.0
+"""The longest a long-poll request waits for a change before answering."""
+
+STREAM_SECONDS = 300.0
+"""How long an event stream stays open, the client reconnects with its last ID."""
+
+HEARTBEAT_SECONDS = 15.0
+"""How long an idle event stream goes before sending a comment to keep it open."""
+
+COMPACTION_CHUNK_ROWS = 10_000
+"""Entries deleted per transaction, so compaction never holds the write lock long."""
+
+
+class ChangesExpired(Exception):
+    """Raised when the changes after a sequence number were compacted away."""
+
+
+async def last_seq(session: AsyncSession) -> int:
+    """Get the sequence number of the latest change, 0 when there never was one.
+
+    Compaction always keeps the latest entry, so it is never lost.
+
+    Args:
+        session (AsyncSession): The database session.
+    """
+    seq = await session.scalar(select(func.max(database.ChangeLog.seq)))
+    return seq or 0
+
+
+async def check_since(session: AsyncSession, since: int):
+    """Check the changes after a sequence number are all still in the log.
+
+    Args:
+        session (AsyncSession): The database session.
+        since (int): The sequence number of the last change the consumer saw.
+
+    Raises:
+        ChangesExpired: If entries after it were compacted away.
+    """
+    oldest = await session.scalar(select(func.min(database.ChangeLog.seq)))
+    if oldest is not None and since + 1 < oldest:
+        raise ChangesExpired(f"Changes before {oldest} were compacted, sync again")
+
+
+async def read(
+    session: AsyncSession, since: int, limit: int
+) -> list[database.ChangeLog]:
+    """Read the changes after a sequence number, oldest first.
+
+    Args:
+        session (AsyncSession): The database session.
+        since (int): The sequence number of the last change the consumer saw.
+        limit (int): The most changes to read.
+
+    Raises:
+        ChangesExpired: If entries after ``since`` were compacted away.
+    """
+    result = await session.scalars(
+        select(database.ChangeLog)
+        .where(database.ChangeLog.seq > since)
+        .order_by(database.ChangeLog.seq)
+        .limit(limit)
+    )
+    changes = list(result.all())
+    # Sequence numbers only have gaps where entries were compacted away.
+    if not changes or changes[0].seq != since + 1:
+        await check_since(session, since)
+    return changes
+
+
+async def wait_for_changes(
+    sessionmaker: async_sessionmaker[AsyncSession],
+    since: int | None,
+    limit: int,
+    wait: float,
+) -> api.ChangePage:
+    """Read the changes after a sequence number, waiting for one if there are none.
+
+    Each check reads in a new transaction, so it sees changes committed since
+    the last one.
+
+    Args:
+        sessionmaker (async_sessionmaker): The factory for the reads' sessions.
+        since (int | None): The sequence number of the last change the consumer
+            saw, None to start from the latest change.
+        limit (int): The most changes to return.
+        wait (float): The longest to wait for a change, in seconds.
+
+    Raises:
+        ChangesExpired: If entries after ``since`` were compacted away.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+    while True:
+        async with sessionmaker() as session, session.begin():
+            if since is None:
+                since = await last_seq(session)
+            changes = await read(session, since, limit)
+        remaining = deadline - loop.time()
+        if changes or remaining <= 0:
+            return api.ChangePage(
+                changes=changes, next_since=changes[-1].seq if changes else since
+            )
+        await asyncio.sleep(min(POLL_INTERVAL_SECONDS, remaining))
+
+
+async def stream_events(
+    sessionmaker: async_sessionmaker[AsyncSession], since: int, limit: int
+) -> AsyncIterator[bytes]:
+    """Stream the changes after a sequence number as Server-Sent Events.
+
+    Each change is an event whose ID is its sequence number, so a client that
+    reconnects sends it back in ``Last-Event-ID`` and resumes where it stopped.
+    The stream ends after ``STREAM_SECONDS``.
+
+    Args:
+        sessionmaker (async_sessionmaker): The factory for the reads' sessions.
+        since (int): The sequence number of the last change the client saw.
+        limit (int): The most changes to read at a time.
+    """
+    adapter = serialization.adapter(database.ChangeLog)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + STREAM_SECONDS
+    idle_since = loop.time()
+    while loop.time() < deadline:
+        async with sessionmaker() as session, session.begin():
+            changes = await read(session, since, limit)
+        if changes:
+            since = changes[-1].seq
+            idle_since = loop.time()
+            yield b"".join(
+                b"id: %d\nevent: change\ndata: %s\n\n"
+                % (change.seq, adapter.dump_json(change))
+                for change in changes
+            )
+            if len(changes) == limit:
+                continue
+        elif loop.time() - idle_since >= HEARTBEAT_SECONDS:
+            idle_since = loop.time()
+            yield b": keep-alive\n\n"
+        await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+
+async def compact(
+    sessionmaker: async_sessionmaker[AsyncSession],
+    retention_seconds: float,
+    max_rows: int,
+) -> int:
+    """Delete the entries older than the retention period or beyond the cap.
+
+    The latest entry is always kept, it records the sequence number consumers
+    resume from.
+
+    Args:
+        sessionmaker (async_sessionmaker): The factory for the sessions.
+        retention_seconds (float): How long entries are kept.
+        max_rows (int): The most entries kept.
+
+    Returns:
+        int: The number of entries deleted.
+    """
+    seq = database.ChangeLog.seq
+    async with sessionmaker() as session, session.begin():
+        last = await last_seq(session)
+        # Entries are in time order, so this stops at the first entry it keeps.
+        first_recent = await session.scalar(
+            select(seq)
+            .where(
+                database.ChangeLog.changed_at
+                >= func.datetime("now", f"-{int(retention_seconds)} seconds")
+            )
+            .order_by(seq)
+            .limit(1)
+        )
+    expired = last if first_recent is None else first_recent
+    bound = min(max(expired, last - max_rows + 1), last)
+    deleted = 0
+    while True:
+        async with sessionmaker() as session, session.begin():
+            result = await session.execute(
+                delete(database.ChangeLog).where(
+                    seq.in_(
+                        select(seq)
+                        .where(seq < bound)
+                        .order_by(seq)
+                        .limit(COMPACTION_CHUNK_ROWS)
+                    )
+                )
+            )
+        deleted += result.rowcount
+        if result.rowcount < COMPACTION_CHUNK_ROWS:
+            return deleted
+
+
+async def compact_periodically(
+    sessionmaker: async_sessionmaker[AsyncSession], settings: Settings
+):
+    """Compact the change log on the configured interval until cancelled.
+
+    Args:
+        sessionmaker (async_sessionmaker): The factory for the sessions.
+        settings (Settings): The service settings.
+    """
+    while True:
+        await asyncio.sleep(settings.change_log_compaction_interval_seconds)
+        try:
+            await compact(
+                sessionmaker,
+                settings.change_log_retention_seconds,
+                settings.change_log_max_rows,
+            )
+        except Exception:
+            logger.exception("Change log compaction failed")
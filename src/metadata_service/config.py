@@ -0,0 +1,100 @@
+"""Service settings loaded from environment variables."""
+
+import os
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Literal
+
+from pydantic import BaseModel, Field, field_validator
+
+ENV_PREFIX = "METADATA_"
+"""Prefix of the environment variables settings are read from."""
+
+
+class Settings(BaseModel):
+    """Settings for the metadata service.
+
+    Each field can be set with an environment variable named after the field in
+    upper case with the ``METADATA_`` prefix, e.g. ``METADATA_CACHE_ENABLED=false``.
+    """
+
+    host: str = "127.0.0.1"
+    port: int = Field(default=8000, ge=0, le=65535)
+    workers: int = Field(default=1, ge=1)
+
+    database_url: str = "sqlite+aiosqlite:///db/metadata.db"
+    sqlite_journal_mode: Literal[
+        "delete", "truncate", "persist", "memory", "wal", "off"
+    ] = "wal"
+    sqlite_synchronous: Literal["off", "normal", "full", "extra"] = "normal"
+    sqlite_mmap_size: int = Field(default=256 * 1024 * 1024, ge=0)
+    sqlite_cache_size: int = -64_000
+    sqlite_temp_store: Literal["default", "file", "memory"] = "memory"
+    sqlite_busy_timeout_ms: int = Field(default=5_000, ge=0)
+
+    db_pool_class: Literal["queue", "null", "static"] = "queue"
+    db_pool_size: int = Field(default=5, ge=1)
+    db_max_overflow: int = Field(default=10, ge=-1)
+    db_pool_timeout_seconds: float = Field(default=30.0, gt=0)
+    db_pool_pre_ping: bool = False
+    db_pool_recycle_seconds: int = Field(default=-1, ge=-1)
+
+    cache_enabled: bool = True
+    cache_max_entries: int = Field(default=10_000, ge=0)
+    cache_ttl_seconds: float = Field(default=30.0, gt=0)
+    cache_sync_interval_seconds: float = Field(default=0.1, gt=0)
+
+    metrics_enabled: bool = True
+
+    sql_profiling_header_enabled: bool = False
+    sql_profiling_sample_rate: float = Field(default=0.0, ge=0, le=1)
+    slow_query_threshold_ms: float = Field(default=100.0, ge=0)
+
+    admission_enabled: bool = True
+    admission_write_concurrency: int = Field(default=4, ge=1)
+    admission_write_queue_size: int = Field(default=64, ge=0)
+    admission_queue_timeout_seconds: float = Field(default=5.0, gt=0)
+    admission_retry_after_seconds: int = Field(default=1, ge=0)
+
+    write_batching_enabled: bool = False
+    write_batch_window_ms: float = Field(default=0.0, ge=0)
+    write_batch_max_size: int = Field(default=100, ge=1)
+
+    change_log_retention_seconds: float = Field(default=7 * 24 * 3600, gt=0)
+    change_log_max_rows: int = Field(default=1_000_000, ge=1)
+    change_log_compaction_interval_seconds: float = Field(default=300.0, gt=0)
+
+    topology_max_staleness_seconds: float = Field(default=1.0, ge=0)
+
+    @field_validator(
+        "sqlite_journal_mode",
+        "sqlite_synchronous",
+        "sqlite_temp_store",
+        "db_pool_class",
+        mode="before",
+    )
+    @classmethod
+    def _lower_case(cls, value: object) -> object:
+        """Accept PRAGMA values and the pool class in any case, e.g. ``WAL``."""
+        return value.lower() if isinstance(value, str) else value
+
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str] = os.environ) -> "Settings":
+        """Build the settings from environment variables.
+
+        Args:
+            environ (Mapping[str, str], optional): The environment to read.
+                Defaults to os.environ.
+        """
+        values = {
+            name: environ[f"{ENV_PREFIX}{name.upper()}"]
+            for name in cls.model_fields
+            if f"{ENV_PREFIX}{name.upper()}" in environ
+        }
+        return cls.model_validate(values)
+
+
+@lru_cache
+def get_settings() -> Settings:
+    """Get the service settings, read once from the environment."""
+    return Settings.from_env()
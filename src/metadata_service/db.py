@@ -1,16 +1,235 @@
-"""DB engine and session management for database operations."""
+"""DB engine and session management for database operations.
 
-from typing import Annotated
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+The engine is built from the settings when the app starts, see
+``start_engine``, and disposed when it stops. Its pool times every checkout,
+so ``pool_stats`` can show how long requests wait for a connection and how
+often the pool overflows, to size it against real concurrency.
+"""
+
+import bisect
+import time
+from typing import Annotated, Any
+from pydantic import BaseModel
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, StaticPool
 from fastapi import Depends
 
-# TODO: These values should be replaced with environment variables.
-sqlite_file_name = "metadata.db"
-sqlite_url = f"sqlite+aiosqlite:///db/{sqlite_file_name}"
+from metadata_service.config import Settings
+
+POOL_WAIT_BUCKETS = (0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+"""Connection checkout wait histogram buckets in seconds."""
+
+
+class TimedPool(Pool):
+    """A pool that counts and times its checkouts.
+
+    Mixed in ahead of a SQLAlchemy pool class. Everything runs on the event
+    loop thread, so the counters are plain attributes without locks.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        """Create the pool with its counters at zero."""
+        super().__init__(*args, **kwargs)
+        self.checked_out = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.wait_counts = [0] * (len(POOL_WAIT_BUCKETS) + 1)
+
+    def connect(self) -> Any:
+        """Check a connection out, timing how long it took to get one."""
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        waited = time.perf_counter() - start
+        self.checked_out += 1
+        self.checkouts += 1
+        self.wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        self.wait_counts[bisect.bisect_left(POOL_WAIT_BUCKETS, waited)] += 1
+        return connection
+
+    def _return_conn(self, record: Any):
+        """Check a connection back in."""
+        self.checked_out -= 1
+        super()._return_conn(record)
+
+
+class TimedQueuePool(TimedPool, AsyncAdaptedQueuePool):
+    """A queue pool, bounded by size and overflow, that times its checkouts."""
+
+
+class TimedNullPool(TimedPool, NullPool):
+    """A pool opening a connection per checkout, that times its checkouts."""
+
+
+class TimedStaticPool(TimedPool, StaticPool):
+    """A pool sharing one connection, that times its checkouts."""
+
+
+POOL_CLASSES: dict[str, type[TimedPool]] = {
+    "queue": TimedQueuePool,
+    "null": TimedNullPool,
+    "static": TimedStaticPool,
+}
+"""The pool class for each ``db_pool_class`` setting."""
+
+
+class PoolStats(BaseModel):
+    """Connection pool sizing and checkout counters."""
+
+    pool_class: str
+    size: int
+    max_overflow: int
+    checked_out: int
+    overflow: int
+    checkouts: int
+    timeouts: int
+    wait_seconds: float
+    max_wait_seconds: float
+    wait_counts: list[int]
+
+
+def sqlite_pragmas(settings: Settings) -> dict[str, str | int]:
+    """Get the PRAGMAs to apply to each new SQLite connection.
+
+    Args:
+        settings (Settings): The service settings.
+    """
+    return {
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "mmap_size": settings.sqlite_mmap_size,
+        "cache_size": settings.sqlite_cache_size,
+        "temp_store": settings.sqlite_temp_store,
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+    }
 
-connect_args = {"check_same_thread": False}
-engine = create_async_engine(sqlite_url, connect_args=connect_args)
-async_session = async_sessionmaker(engine, expire_on_commit=False)
+
+def build_engine(settings: Settings) -> AsyncEngine:
+    """Create the database engine described by the settings.
+
+    SQLite connections get the configured PRAGMAs applied as they connect, the
+    defaults use WAL journaling so readers do not block behind a writer and
+    commits do not fsync in synchronous=NORMAL mode. The pool is one of the
+    ``POOL_CLASSES``, sized and timed out as configured.
+
+    The sqlite3 driver opens a transaction before an INSERT, UPDATE or DELETE
+    but none before a SAVEPOINT, which SQLite then runs as a transaction of
+    its own that its RELEASE commits. So a SAVEPOINT outside a transaction is
+    preceded by a BEGIN, and nests inside the session's transaction. Reads
+    before the first write still run outside any transaction: in WAL mode a
+    transaction that has read cannot wait for the write lock another
+    connection holds, and would fail at once with SQLITE_BUSY.
+
+    Args:
+        settings (Settings): The service settings.
+    """
+    pool_args: dict[str, Any] = {}
+    if settings.db_pool_class == "queue":
+        pool_args = {
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+            "pool_timeout": settings.db_pool_timeout_seconds,
+        }
+    engine = create_async_engine(
+        settings.database_url,
+        connect_args={"check_same_thread": False},
+        poolclass=POOL_CLASSES[settings.db_pool_class],
+        pool_pre_ping=settings.db_pool_pre_ping,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        **pool_args,
+    )
+    if engine.dialect.name == "sqlite":
+        pragmas = sqlite_pragmas(settings)
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def apply_pragmas(dbapi_connection: Any, connection_record: Any):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+
+        @event.listens_for(engine.sync_engine, "before_cursor_execute")
+        def begin_before_savepoint(
+            conn: Any,
+            cursor: Any,
+            statement: str,
+            parameters: Any,
+            context: Any,
+            executemany: bool,
+        ):
+            dbapi_connection = conn.connection.dbapi_connection
+            if (
+                statement.startswith("SAVEPOINT")
+                and not dbapi_connection.driver_connection.in_transaction
+            ):
+                # On the driver's cursor, so statement metrics only count queries.
+                begin = dbapi_connection.cursor()
+                begin.execute("BEGIN")
+                begin.close()
+
+    return engine
+
+
+engine: AsyncEngine | None = None
+"""The service's engine, while the app is running."""
+
+async_session = async_sessionmaker(expire_on_commit=False)
+"""The factory for the service's sessions, bound to ``engine`` when it starts."""
+
+
+def start_engine(settings: Settings) -> AsyncEngine:
+    """Build the service's engine and bind the session factory to it.
+
+    Args:
+        settings (Settings): The service settings.
+    """
+    global engine
+    engine = build_engine(settings)
+    async_session.configure(bind=engine)
+    return engine
+
+
+async def dispose_engine():
+    """Close the service's engine and its pooled connections."""
+    global engine
+    if engine is not None:
+        await engine.dispose()
+    engine = None
+    async_session.configure(bind=None)
+
+
+def pool_stats() -> PoolStats | None:
+    """Get the service engine's pool counters, if the engine has started."""
+    if engine is None:
+        return None
+    pool = engine.pool
+    if not isinstance(pool, TimedPool):
+        return None
+    queue = isinstance(pool, AsyncAdaptedQueuePool)
+    return PoolStats(
+        pool_class=type(pool).__name__,
+        size=pool.size() if queue else 0,
+        max_overflow=pool._max_overflow if queue else 0,
+        checked_out=pool.checked_out,
+        overflow=max(pool.overflow(), 0) if queue else 0,
+        checkouts=pool.checkouts,
+        timeouts=pool.timeouts,
+        wait_seconds=pool.wait_seconds,
+        max_wait_seconds=pool.max_wait_seconds,
+        wait_counts=list(pool.wait_counts),
+    )
 
 
 async def get_session():
@@ -20,3 +239,15 @@ async def get_session():
 
 
 SessionDep = Annotated[AsyncSession, Depends(get_session)]
+
+
+def get_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """Get the session factory, for work that outlives the request's session.
+
+    A streaming response body is sent after the request's dependencies have
+    finished, so it opens its own session from this factory.
+    """
+    return async_session
+
+
+SessionmakerDep = Annotated[async_sessionmaker[AsyncSession], Depends(get_sessionmaker)]
@@ -0,0 +1,166 @@
+"""Entity tags for conditional requests.
+
+Every entity has a ``version`` column that the update handlers increment, so
+a row's version identifies its content. A by-id response is tagged with the
+row's version and a page with a hash of its rows' IDs and versions, letting a
+poller's ``If-None-Match`` be answered with ``304 Not Modified`` before the
+body is serialized. ``If-Match`` on an update becomes a ``version = ?``
+condition on the ``UPDATE`` itself, so concurrent writers need no locks.
+"""
+
+import hashlib
+import uuid
+from collections.abc import Sequence
+
+from fastapi import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import SQLModel, select
+
+from metadata_service.pagination import NEXT_CURSOR_HEADER
+
+ETAG_HEADER = "ETag"
+
+
+class PreconditionFailed(Exception):
+    """Raised when an If-Match header does not match the current version."""
+
+
+def entity_etag(entity: SQLModel) -> str:
+    """Get the strong entity tag of a row.
+
+    Args:
+        entity (SQLModel): The row.
+    """
+    return f'"{entity.version}"'
+
+
+def page_etag(rows: Sequence[SQLModel], next_cursor: str | None = None) -> str:
+    """Get the strong entity tag of a page of rows.
+
+    Args:
+        rows (Sequence[SQLModel]): The rows of the page.
+        next_cursor (str | None, optional): The next page cursor sent with the
+            page. Defaults to None.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for row in rows:
+        digest.update(f"{row.id}:{row.version},".encode())
+    if next_cursor:
+        digest.update(next_cursor.encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def _tags(header: str) -> list[str]:
+    """Split an If-Match or If-None-Match header into its entity tags."""
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def none_match(if_none_match: str | None, etag: str) -> bool:
+    """Check whether a response should be sent for an If-None-Match header.
+
+    If-None-Match uses the weak comparison, so ``W/"3"`` matches ``"3"``.
+
+    Args:
+        if_none_match (str | None): The request's If-None-Match header.
+        etag (str): The entity tag of the current representation.
+    """
+    if if_none_match is None:
+        return True
+    for tag in _tags(if_none_match):
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return False
+    return True
+
+
+def not_modified(etag: str) -> Response:
+    """Build the body-less response to a matching If-None-Match.
+
+    Args:
+        etag (str): The entity tag of the current representation.
+    """
+    return Response(status_code=304, headers={ETAG_HEADER: etag})
+
+
+def expected_version(if_match: str | None) -> int | None:
+    """Get the version an If-Match header requires, or None for any version.
+
+    If-Match uses the strong comparison, so weak tags never match.
+
+    Args:
+        if_match (str | None): The request's If-Match header.
+
+    Raises:
+        PreconditionFailed: If the header cannot match any version.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    tags = _tags(if_match)
+    if len(tags) == 1:
+        tag = tags[0]
+        if len(tag) > 2 and tag[0] == tag[-1] == '"' and tag[1:-1].isdigit():
+            return int(tag[1:-1])
+    raise PreconditionFailed("If-Match must be a single entity tag from an ETag")
+
+
+def _check(response: Response, tag: str, if_none_match: str | None) -> Response | None:
+    """Tag a response and get the 304 to send instead if the client has it."""
+    response.headers[ETAG_HEADER] = tag
+    if none_match(if_none_match, tag):
+        return None
+    return Response(status_code=304, headers=dict(response.headers))
+
+
+def check_entity(
+    response: Response, entity: SQLModel, if_none_match: str | None
+) -> Response | None:
+    """Set the ETag of a by-id response and check it against If-None-Match.
+
+    Args:
+        response (Response): The response to add the header to.
+        entity (SQLModel): The row being returned.
+        if_none_match (str | None): The request's If-None-Match header.
+
+    Returns:
+        A 304 response to return instead when the client's copy is current.
+    """
+    return _check(response, entity_etag(entity), if_none_match)
+
+
+def check_page(
+    response: Response, rows: Sequence[SQLModel], if_none_match: str | None
+) -> Response | None:
+    """Set the ETag of a page and check it against If-None-Match.
+
+    Call after the next page cursor is set, it is part of the tag.
+
+    Args:
+        response (Response): The response to add the header to.
+        rows (Sequence[SQLModel]): The rows of the page.
+        if_none_match (str | None): The request's If-None-Match header.
+
+    Returns:
+        A 304 response to return instead when the client's copy is current.
+    """
+    tag = page_etag(rows, response.headers.get(NEXT_CURSOR_HEADER))
+    return _check(response, tag, if_none_match)
+
+
+async def check_version(
+    session: AsyncSession, model: type[SQLModel], id: uuid.UUID, version: int | None
+):
+    """Explain why a conditional update or read of a row found nothing.
+
+    Args:
+        session (AsyncSession): The database session.
+        model (type[SQLModel]): The database model of the row.
+        id (UUID): The ID of the row.
+        version (int | None): The version the request required.
+
+    Raises:
+        PreconditionFailed: If the row exists with another version.
+    """
+    if version is None:
+        return
+    current = await session.scalar(select(model.version).where(model.id == id))
+    if current is not None:
+        raise PreconditionFailed(f"Version is {current}, not {version}")
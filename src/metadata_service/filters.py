@@ -0,0 +1,80 @@
+"""Query parameter filters for the list endpoints.
+
+Each entity has a model of the filters its list endpoint accepts, with fields
+named after the columns they match, taken as a dependency so every field is
+its own query parameter. The filters given are added to the list's single
+``SELECT`` as ``WHERE`` conditions, and composite indexes that lead with the
+filtered columns let SQLite read only the matching rows.
+"""
+
+import sys
+import uuid
+from typing import Any
+
+from pydantic import BaseModel
+from sqlalchemy import ColumnElement, Select
+from sqlmodel import SQLModel
+
+
+def name_prefix(column: Any, prefix: str) -> list[ColumnElement[bool]]:
+    """Build the conditions matching values that start with a prefix.
+
+    A range on the column rather than ``LIKE``, which SQLite can only serve
+    from an index when the column uses ``NOCASE``, so the match is case
+    sensitive.
+
+    Args:
+        column (Any): The text column to match.
+        prefix (str): The start of the values to match.
+    """
+    if not prefix:
+        return []
+    conditions = [column >= prefix]
+    last = ord(prefix[-1])
+    if last < sys.maxunicode:
+        conditions.append(column < prefix[:-1] + chr(last + 1))
+    return conditions
+
+
+class Filters(BaseModel):
+    """The filters every list endpoint accepts."""
+
+    name_prefix: str | None = None
+
+    def apply(self, statement: Select[Any], model: type[SQLModel]) -> Select[Any]:
+        """Add the filters that were given to a select statement.
+
+        Args:
+            statement (Select): The select statement to filter.
+            model (type[SQLModel]): The model being listed.
+        """
+        for name, value in self.model_dump(exclude_none=True).items():
+            if name == "name_prefix":
+                statement = statement.where(*name_prefix(model.name, value))
+            else:
+                statement = statement.where(getattr(model, name) == value)
+        return statement
+
+
+class CompanyFilters(Filters):
+    """The filters of the company list."""
+
+
+class TeamFilters(Filters):
+    """The filters of the team list."""
+
+    company_id: uuid.UUID | None = None
+
+
+class UserFilters(Filters):
+    """The filters of the user list."""
+
+    company_id: uuid.UUID | None = None
+
+
+class ResourceFilters(Filters):
+    """The filters of the resource list."""
+
+    type: str | None = None
+    lifecycle_status: str | None = None
+    owner: uuid.UUID | None = None
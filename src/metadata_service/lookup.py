@@ -0,0 +1,73 @@
+"""Multi-get support shared by the entity routers.
+
+Clients holding a list of IDs get them in one request, served from the entity
+cache where possible and otherwise with ``WHERE id IN (...)`` queries of up
+to ``LOOKUP_CHUNK_SIZE`` IDs, which keeps each statement under SQLite's bound
+parameter limit (999 before SQLite 3.32).
+"""
+
+import uuid
+from collections.abc import Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import SQLModel, select
+
+from metadata_service import cache
+from metadata_service.models.response import LookupResult
+
+LOOKUP_CHUNK_SIZE = 900
+"""The most IDs bound to a single ``IN`` query."""
+
+MAX_LOOKUP_IDS = 10_000
+"""The most IDs a single lookup request may ask for."""
+
+
+def parse_ids(ids: str) -> list[uuid.UUID]:
+    """Parse a comma separated list of IDs.
+
+    Args:
+        ids (str): The query parameter value.
+
+    Raises:
+        ValueError: If an ID is not a UUID or there are too many IDs.
+    """
+    parsed = [uuid.UUID(id.strip()) for id in ids.split(",") if id.strip()]
+    if len(parsed) > MAX_LOOKUP_IDS:
+        raise ValueError(f"At most {MAX_LOOKUP_IDS} IDs can be looked up at once")
+    return parsed
+
+
+async def get_many[T: SQLModel](
+    session: AsyncSession, model: type[T], ids: Sequence[uuid.UUID]
+) -> LookupResult[T]:
+    """Get the entities with the given IDs.
+
+    Args:
+        session (AsyncSession): The database session, with a transaction begun.
+        model (type[SQLModel]): The database model of the entities.
+        ids (Sequence[UUID]): The IDs to get, duplicates are ignored.
+
+    Returns:
+        The entities found in the order their IDs were given, and the IDs that
+        were not found.
+    """
+    wanted = list(dict.fromkeys(ids))
+    found: dict[uuid.UUID, T] = {}
+    for id in wanted:
+        cached = cache.entities.get(model, id)
+        if cached is not None:
+            found[id] = cached
+
+    token = cache.entities.token()
+    remaining = [id for id in wanted if id not in found]
+    for start in range(0, len(remaining), LOOKUP_CHUNK_SIZE):
+        chunk = remaining[start : start + LOOKUP_CHUNK_SIZE]
+        result = await session.execute(select(model).where(model.id.in_(chunk)))
+        for entity in result.scalars():
+            found[entity.id] = entity
+            cache.entities.put(model, entity.id, entity, token)
+
+    return LookupResult(
+        found=[found[id] for id in wanted if id in found],
+        missing=[id for id in wanted if id not in found],
+    )
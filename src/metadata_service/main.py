@@ -1,19 +1,101 @@
 """A prototype for an API that maintains company metadata."""
 
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse
-from metadata_service.routers import company, resource, team, user
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator
 
+from fastapi import Depends, FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
+from metadata_service import (
+    admission,
+    cache,
+    changes,
+    db,
+    metrics,
+    profiling,
+    topology,
+)
+from metadata_service.config import get_settings
+from metadata_service.routers import (
+    changes as changes_router,
+    company,
+    export,
+    imports,
+    resource,
+    team,
+    user,
+)
 
-app = FastAPI()
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Start the engine, then run the background tasks while the app serves.
+
+    The tasks are change log compaction, topology refresh and cache sync.
+    """
+    settings = get_settings()
+    db.start_engine(settings)
+    tasks = [
+        asyncio.create_task(changes.compact_periodically(db.async_session, settings)),
+        asyncio.create_task(
+            topology.graph.keep_fresh(
+                db.async_session, settings.topology_max_staleness_seconds
+            )
+        ),
+    ]
+    if settings.cache_enabled:
+        tasks.append(
+            asyncio.create_task(
+                cache.entities.follow_changes(
+                    db.async_session, settings.cache_sync_interval_seconds
+                )
+            )
+        )
+    yield
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await db.dispose_engine()
+
+
+app = FastAPI(lifespan=lifespan, dependencies=[Depends(admission.admit)])
+app.add_middleware(metrics.MetricsMiddleware)
+app.add_middleware(profiling.ProfilingMiddleware)
 app.include_router(user.router)
 app.include_router(team.router)
 app.include_router(resource.router)
 app.include_router(company.router)
+app.include_router(export.router)
+app.include_router(imports.router)
+app.include_router(changes_router.router)
 
 
-# TODO: Add middleware for metrics and logging.
+# TODO: Add middleware for logging.
 @app.get("/health/check")
 async def health_check() -> JSONResponse:
     """Health check endpoint."""
     return JSONResponse(content={"status": "ok"}, status_code=200)
+
+
+@app.get("/health/cache", response_model=cache.CacheStats)
+async def cache_stats() -> cache.CacheStats:
+    """Entity cache hit, miss and eviction counters."""
+    return cache.entities.stats()
+
+
+@app.get("/health/pool", response_model=db.PoolStats | None)
+async def pool_stats() -> db.PoolStats | None:
+    """Database connection pool sizing, checkout and wait counters."""
+    return db.pool_stats()
+
+
+@app.get("/health/admission", response_model=list[admission.GateStats])
+async def admission_stats() -> list[admission.GateStats]:
+    """Write route concurrency, queue depth and rejection counters."""
+    return admission.controller.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    """Request, database and cache metrics in the Prometheus text format."""
+    return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
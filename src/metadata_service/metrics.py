@@ -0,0 +1,264 @@
+"""Request and database metrics in the Prometheus text format.
+
+``MetricsMiddleware`` times every HTTP request and counts it by route template
+and status code. SQLAlchemy engine events add the number of statements a
+request executed and the time they took, and the connection pool's counters
+show how long checkouts waited. The admission gates show the write requests
+in flight, queued and rejected per route. Everything runs on the event loop
+thread, so the counters are plain dictionaries without locks.
+"""
+
+import bisect
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import Engine, event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from metadata_service import admission, cache, db
+from metadata_service.config import get_settings
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+"""Request latency histogram buckets in seconds."""
+
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50)
+"""Statements per request histogram buckets."""
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+"""Content type of the Prometheus text format."""
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Histogram:
+    """A cumulative histogram per label set."""
+
+    def __init__(self, buckets: Iterable[float]):
+        """Create an empty histogram with the given upper bounds."""
+        self.buckets = tuple(buckets)
+        self.counts: dict[Labels, list[int]] = {}
+        self.sums: dict[Labels, float] = defaultdict(float)
+
+    def observe(self, labels: Labels, value: float):
+        """Record a value."""
+        counts = self.counts.get(labels)
+        if counts is None:
+            counts = self.counts[labels] = [0] * (len(self.buckets) + 1)
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sums[labels] += value
+
+    def render(self, name: str) -> Iterable[str]:
+        """Render the histogram's samples."""
+        for labels, counts in self.counts.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts, strict=True):
+                cumulative += count
+                yield _sample(
+                    f"{name}_bucket", (*labels, ("le", str(bound))), cumulative
+                )
+            yield _sample(f"{name}_sum", labels, self.sums[labels])
+            yield _sample(f"{name}_count", labels, cumulative)
+
+
+@dataclass
+class RequestStats:
+    """Database work done while serving one request."""
+
+    statements: int = 0
+    statement_seconds: float = 0.0
+    statement_started: float = 0.0
+
+
+@dataclass
+class Registry:
+    """The service's metrics."""
+
+    enabled: bool = True
+    requests: dict[Labels, int] = field(default_factory=lambda: defaultdict(int))
+    latency: Histogram = field(default_factory=lambda: Histogram(LATENCY_BUCKETS))
+    statements: Histogram = field(default_factory=lambda: Histogram(STATEMENT_BUCKETS))
+    statement_seconds: dict[Labels, float] = field(
+        default_factory=lambda: defaultdict(float)
+    )
+    collectors: list[Callable[[], Iterable[str]]] = field(default_factory=list)
+
+    def record(
+        self, method: str, route: str, status: int, seconds: float, stats: RequestStats
+    ):
+        """Record a finished request."""
+        labels = (("method", method), ("route", route))
+        self.requests[(*labels, ("status", str(status)))] += 1
+        self.latency.observe(labels, seconds)
+        self.statements.observe(labels, stats.statements)
+        self.statement_seconds[labels] += stats.statement_seconds
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format."""
+        lines = [
+            "# HELP metadata_http_requests_total HTTP requests by route and status.",
+            "# TYPE metadata_http_requests_total counter",
+            *(
+                _sample("metadata_http_requests_total", labels, count)
+                for labels, count in self.requests.items()
+            ),
+            "# HELP metadata_http_request_duration_seconds HTTP request latency.",
+            "# TYPE metadata_http_request_duration_seconds histogram",
+            *self.latency.render("metadata_http_request_duration_seconds"),
+            "# HELP metadata_db_statements_per_request SQL statements per request.",
+            "# TYPE metadata_db_statements_per_request histogram",
+            *self.statements.render("metadata_db_statements_per_request"),
+            "# HELP metadata_db_statement_seconds_total Time spent executing SQL.",
+            "# TYPE metadata_db_statement_seconds_total counter",
+            *(
+                _sample("metadata_db_statement_seconds_total", labels, seconds)
+                for labels, seconds in self.statement_seconds.items()
+            ),
+        ]
+        for collector in self.collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """Forget every recorded request."""
+        self.requests.clear()
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.statements = Histogram(STATEMENT_BUCKETS)
+        self.statement_seconds.clear()
+
+
+def _escape(value: str) -> str:
+    """Escape a label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _sample(name: str, labels: Labels, value: float) -> str:
+    """Render one sample line."""
+    if not labels:
+        return f"{name} {value}"
+    rendered = ",".join(f'{key}="{_escape(label)}"' for key, label in labels)
+    return f"{name}{{{rendered}}} {value}"
+
+
+_request_stats: ContextVar[RequestStats | None] = ContextVar(
+    "request_stats", default=None
+)
+
+registry = Registry(enabled=get_settings().metrics_enabled)
+"""The metrics served at /metrics."""
+
+
+class MetricsMiddleware:
+    """ASGI middleware that records request counts, latency and SQL work."""
+
+    def __init__(self, app: ASGIApp):
+        """Wrap an ASGI app."""
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """Serve a request and record its metrics."""
+        if scope["type"] != "http" or not registry.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_stats.reset(token)
+            route = scope.get("route")
+            # Label by route template so IDs in paths do not explode cardinality.
+            path = getattr(route, "path", "unmatched")
+            registry.record(scope["method"], path, status, elapsed, stats)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _statement_started(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, many: bool
+):
+    """Note when a statement run for a request started."""
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.statement_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _statement_finished(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, many: bool
+):
+    """Add a finished statement to the request's stats."""
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.statement_seconds += time.perf_counter() - stats.statement_started
+
+
+def _cache_metrics() -> Iterable[str]:
+    """Render the entity cache counters."""
+    stats = cache.entities.stats()
+    for name in ("hits", "misses", "evictions", "expirations", "invalidations"):
+        yield f"# TYPE metadata_cache_{name}_total counter"
+        yield _sample(f"metadata_cache_{name}_total", (), getattr(stats, name))
+    yield "# TYPE metadata_cache_entries gauge"
+    yield _sample("metadata_cache_entries", (), stats.size)
+
+
+registry.collectors.append(_cache_metrics)
+
+
+def _pool_metrics() -> Iterable[str]:
+    """Render the connection pool gauges and checkout counters."""
+    stats = db.pool_stats()
+    if stats is None:
+        return
+    for name in ("size", "max_overflow", "checked_out", "overflow"):
+        yield f"# TYPE metadata_db_pool_{name} gauge"
+        yield _sample(f"metadata_db_pool_{name}", (), getattr(stats, name))
+    yield "# TYPE metadata_db_pool_timeouts_total counter"
+    yield _sample("metadata_db_pool_timeouts_total", (), stats.timeouts)
+    wait = Histogram(db.POOL_WAIT_BUCKETS)
+    wait.counts[()] = stats.wait_counts
+    wait.sums[()] = stats.wait_seconds
+    yield "# HELP metadata_db_pool_wait_seconds Time to check a connection out."
+    yield "# TYPE metadata_db_pool_wait_seconds histogram"
+    yield from wait.render("metadata_db_pool_wait_seconds")
+
+
+registry.collectors.append(_pool_metrics)
+
+
+def _admission_metrics() -> Iterable[str]:
+    """Render the write routes' in-flight and queued requests and rejections."""
+    gates = admission.controller.gates.items()
+    for name in ("active", "queued"):
+        yield f"# TYPE metadata_admission_{name} gauge"
+        for (method, route), gate in gates:
+            labels = (("method", method), ("route", route))
+            yield _sample(f"metadata_admission_{name}", labels, getattr(gate, name))
+    yield "# TYPE metadata_admission_admitted_total counter"
+    for (method, route), gate in gates:
+        labels = (("method", method), ("route", route))
+        yield _sample("metadata_admission_admitted_total", labels, gate.admitted)
+    yield "# HELP metadata_admission_rejected_total Write requests rejected with 503."
+    yield "# TYPE metadata_admission_rejected_total counter"
+    for (method, route), gate in gates:
+        for reason, count in gate.rejected.items():
+            labels = (("method", method), ("route", route), ("reason", reason))
+            yield _sample("metadata_admission_rejected_total", labels, count)
+
+
+registry.collectors.append(_admission_metrics)
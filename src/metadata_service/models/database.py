@@ -1,46 +1,275 @@
 """Database models for the application."""
 
-from sqlmodel import Field, SQLModel
+import uuid
+from datetime import datetime
+from typing import Any, Literal
+
+from sqlalchemy import DDL, event, func
+from sqlmodel import Field, Index, Relationship, SQLModel
+
+from metadata_service import ids
+
+
+# Relationships are only loaded on request with selectinload, so an unplanned
+# lazy load raises instead of quietly issuing a query per row.
+RAISE_ON_LAZY_LOAD = {"lazy": "raise"}
+
+# Lists page by (sort column, id). The id is not the rowid, so indexes end
+# with it explicitly for a page to be read in order without sorting.
+
+
+def id_field() -> Any:
+    """Create the primary key column, a UUIDv7 generated when the row is built."""
+    return Field(default_factory=ids.uuid7, primary_key=True, sa_type=ids.BlobUUID)
+
+
+def reference_field(target: str, **kwargs: Any) -> Any:
+    """Create a column holding the ID of a row of another table.
+
+    Args:
+        target (str): The referenced column, such as ``company.id``.
+        **kwargs: Further ``Field`` arguments.
+    """
+    return Field(foreign_key=target, sa_type=ids.BlobUUID, **kwargs)
+
+
+def version_field() -> int:
+    """Create the row version column the update handlers increment.
+
+    The version is sent as the ETag header rather than in response bodies.
+    """
+    return Field(default=1, sa_column_kwargs={"server_default": "1"}, exclude=True)
 
 
 class Company(SQLModel, table=True):
     """Database model for a company."""
 
-    id: int = Field(default=None, primary_key=True)
-    name: str = Field(index=True, max_length=100)
+    __table_args__ = (Index("ix_company_name", "name", "id"),)
+
+    id: uuid.UUID = id_field()
+    name: str = Field(max_length=100)
+    version: int = version_field()
 
 
 class Team_Members(SQLModel, table=True):
     """Database model for team members."""
 
-    team_id: int | None = Field(default=None, foreign_key="team.id", primary_key=True)
-    user_id: int | None = Field(default=None, foreign_key="user.id", primary_key=True)
+    # The primary key covers team -> users, this index covers user -> teams.
+    __table_args__ = (Index("ix_team_members_user_id", "user_id", "team_id"),)
+
+    team_id: uuid.UUID = reference_field("team.id", primary_key=True)
+    user_id: uuid.UUID = reference_field("user.id", primary_key=True)
 
 
 class Team(SQLModel, table=True):
     """Database model for a team."""
 
-    id: int | None = Field(default=None, primary_key=True, gt=0)
-    name: str = Field(index=True, max_length=100)
-    company_id: int = Field(foreign_key="company.id", gt=0)
+    # Serves the company filter, alone or with a name prefix or name order.
+    __table_args__ = (
+        Index("ix_team_name", "name", "id"),
+        Index("ix_team_company_id_name", "company_id", "name", "id"),
+    )
+
+    id: uuid.UUID = id_field()
+    name: str = Field(max_length=100)
+    company_id: uuid.UUID = reference_field("company.id")
     description: str = Field(max_length=255)
+    version: int = version_field()
+
+    members: list["User"] = Relationship(
+        back_populates="teams",
+        link_model=Team_Members,
+        sa_relationship_kwargs=RAISE_ON_LAZY_LOAD,
+    )
+    resources: list["Resource"] = Relationship(
+        sa_relationship_kwargs=RAISE_ON_LAZY_LOAD
+    )
+    company: Company = Relationship(sa_relationship_kwargs=RAISE_ON_LAZY_LOAD)
 
 
 class User(SQLModel, table=True):
     """Database model for a user."""
 
-    id: int | None = Field(default=None, primary_key=True, gt=0)
-    name: str = Field(index=True, max_length=50)
+    # Serves the company filter, alone or with a name prefix or name order.
+    __table_args__ = (
+        Index("ix_user_name", "name", "id"),
+        Index("ix_user_company_id_name", "company_id", "name", "id"),
+    )
+
+    id: uuid.UUID = id_field()
+    name: str = Field(max_length=50)
     email: str = Field(max_length=100)
-    company_id: int = Field(foreign_key="company.id", gt=0)
+    company_id: uuid.UUID = reference_field("company.id")
+    version: int = version_field()
+
+    teams: list[Team] = Relationship(
+        back_populates="members",
+        link_model=Team_Members,
+        sa_relationship_kwargs=RAISE_ON_LAZY_LOAD,
+    )
+    company: Company = Relationship(sa_relationship_kwargs=RAISE_ON_LAZY_LOAD)
 
 
 class Resource(SQLModel, table=True):
     """Database model for a resource."""
 
-    id: int = Field(default=None, primary_key=True, gt=0)
-    name: str = Field(index=True, max_length=100)
+    # The list filters read only matching rows through these, and the owner
+    # index also serves loading a team's resources.
+    __table_args__ = (
+        Index("ix_resource_name", "name", "id"),
+        Index(
+            "ix_resource_owner_type_status", "owner", "type", "lifecycle_status", "id"
+        ),
+        Index("ix_resource_type_status", "type", "lifecycle_status", "id"),
+    )
+
+    id: uuid.UUID = id_field()
+    name: str = Field(max_length=100)
     type: str = Field(max_length=50)
     lifecycle_status: str = Field(max_length=50)
     description: str = Field(max_length=255)
-    owner: int = Field(foreign_key="team.id", gt=0)
+    owner: uuid.UUID = reference_field("team.id")
+    version: int = version_field()
+
+
+class ChangeLog(SQLModel, table=True):
+    """Database model for an entry of the change feed.
+
+    Triggers on the entity tables append an entry for every insert, update and
+    delete in the writing transaction. AUTOINCREMENT keeps sequence numbers
+    from being reused once old entries are compacted away.
+    """
+
+    __tablename__ = "change_log"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    seq: int | None = Field(default=None, primary_key=True)
+    entity: str = Field(max_length=20)
+    entity_id: uuid.UUID = Field(sa_type=ids.BlobUUID)
+    operation: str = Field(max_length=10)
+    version: int | None = None
+    changed_at: datetime | None = Field(
+        default=None, sa_column_kwargs={"server_default": func.current_timestamp()}
+    )
+
+
+EntityName = Literal["companies", "users", "teams", "resources"]
+"""The plural names the bulk endpoints use for the entity tables."""
+
+ENTITIES: dict[str, type[SQLModel]] = {
+    "companies": Company,
+    "users": User,
+    "teams": Team,
+    "resources": Resource,
+}
+
+SEARCH_COLUMNS: dict[str, tuple[str, ...]] = {
+    "resource": ("name", "description"),
+    "team": ("name", "description"),
+    "user": ("name", "email"),
+}
+"""The text columns of each table indexed in its ``<table>_search`` FTS5 table."""
+
+
+def search_index_ddl(table: str, columns: tuple[str, ...]) -> list[str]:
+    """Build the statements creating a table's full-text index.
+
+    The index is an external content FTS5 table, it stores only the index and
+    reads column values from the table itself. Triggers keep it in step with
+    every insert, update and delete, including ones made outside the service.
+    The statements are idempotent, as ``create_all`` runs them even when the
+    tables already exist.
+
+    The index is keyed by the table's implicit integer rowid, FTS5 rowids
+    cannot be UUIDs. ``VACUUM`` may renumber the rowids of a table without an
+    integer primary key, so follow it with the index's ``rebuild`` command.
+
+    Args:
+        table (str): The name of the indexed table.
+        columns (tuple[str, ...]): The text columns to index.
+    """
+    search = f"{table}_search"
+    names = ", ".join(columns)
+    new = ", ".join(f"new.{column}" for column in columns)
+    old = ", ".join(f"old.{column}" for column in columns)
+    insert = f"INSERT INTO {search}(rowid, {names}) VALUES (new.rowid, {new});"
+    delete = (
+        f"INSERT INTO {search}({search}, rowid, {names}) "
+        f"VALUES ('delete', old.rowid, {old});"
+    )
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {search} USING fts5("
+        f"{names}, content='{table}')",
+        f"CREATE TRIGGER IF NOT EXISTS {search}_insert AFTER INSERT ON {table} "
+        f"BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {search}_delete AFTER DELETE ON {table} "
+        f"BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {search}_update "
+        f"AFTER UPDATE OF {names} ON {table} "
+        f"BEGIN {delete} {insert} END",
+    ]
+
+
+for _table, _columns in SEARCH_COLUMNS.items():
+    for _statement in search_index_ddl(_table, _columns):
+        event.listen(
+            SQLModel.metadata,
+            "after_create",
+            DDL(_statement).execute_if(dialect="sqlite"),
+        )
+    event.listen(
+        SQLModel.metadata,
+        "before_drop",
+        DDL(f"DROP TABLE IF EXISTS {_table}_search").execute_if(dialect="sqlite"),
+    )
+
+
+CHANGE_LOG_TABLES = ("company", "team", "user", "resource")
+"""The tables whose inserts, updates and deletes are recorded in the change log."""
+
+
+def change_log_ddl(table: str) -> list[str]:
+    """Build the triggers recording a table's changes in the change log.
+
+    Args:
+        table (str): The name of the entity table.
+    """
+    log = "INSERT INTO change_log(entity, entity_id, operation, version)"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {table}_changes_insert "
+        f"AFTER INSERT ON {table} "
+        f"BEGIN {log} VALUES ('{table}', new.id, 'create', new.version); END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_changes_update "
+        f"AFTER UPDATE ON {table} "
+        f"BEGIN {log} VALUES ('{table}', new.id, 'update', new.version); END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_changes_delete "
+        f"AFTER DELETE ON {table} "
+        f"BEGIN {log} VALUES ('{table}', old.id, 'delete', old.version); END",
+    ]
+
+
+def membership_change_log_ddl() -> list[str]:
+    """Build the triggers recording membership changes as updates of the team.
+
+    Team members have no ID of their own, so a consumer sees the team change
+    and reads its members again.
+    """
+    log = (
+        "INSERT INTO change_log(entity, entity_id, operation, version) "
+        "SELECT 'team', id, 'update', version FROM team WHERE id = {row}.team_id;"
+    )
+    return [
+        "CREATE TRIGGER IF NOT EXISTS team_members_changes_insert "
+        f"AFTER INSERT ON team_members BEGIN {log.format(row='new')} END",
+        "CREATE TRIGGER IF NOT EXISTS team_members_changes_delete "
+        f"AFTER DELETE ON team_members BEGIN {log.format(row='old')} END",
+    ]
+
+
+for _statement in (
+    *(statement for table in CHANGE_LOG_TABLES for statement in change_log_ddl(table)),
+    *membership_change_log_ddl(),
+):
+    event.listen(
+        SQLModel.metadata, "after_create", DDL(_statement).execute_if(dialect="sqlite")
+    )
@@ -1,32 +1,46 @@
 """Database models for the application."""
 
+import uuid
+
 from pydantic import BaseModel, Field
 
 
 class RequestTeam(BaseModel):
     """API Request model for a team."""
 
-    id: int | None = Field(default=None, gt=0)
+    id: uuid.UUID | None = None
     name: str | None = Field(default=None, max_length=100)
-    company_id: int | None = Field(default=None, gt=0)
+    company_id: uuid.UUID | None = None
     description: str | None = Field(default=None, max_length=255)
 
 
 class RequestUser(BaseModel):
     """API Request model for a user."""
 
-    id: int | None = Field(default=None, gt=0)
+    id: uuid.UUID | None = None
     name: str | None = Field(default=None, max_length=50)
     email: str | None = Field(default=None, max_length=100)
-    company_id: int | None = Field(default=None, gt=0)
+    company_id: uuid.UUID | None = None
 
 
 class RequestResource(BaseModel):
     """API Request model for a resource."""
 
-    id: int | None = Field(default=None, gt=0)
+    id: uuid.UUID | None = None
     name: str | None = Field(default=None, max_length=100)
     type: str | None = Field(default=None, max_length=50)
     lifecycle_status: str | None = Field(default=None, max_length=50)
     description: str | None = Field(default=None, max_length=255)
-    owner: int | None = Field(default=None, gt=0)
+    owner: uuid.UUID | None = None
+
+
+class RequestTeamMembers(BaseModel):
+    """API Request model for users to add to or remove from a team."""
+
+    user_ids: list[uuid.UUID] = Field(min_length=1, max_length=1000)
+
+
+class RequestLookup(BaseModel):
+    """API Request model for the IDs of entities to get."""
+
+    ids: list[uuid.UUID] = Field(min_length=1, max_length=10_000)
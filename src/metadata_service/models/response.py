@@ -0,0 +1,126 @@
+"""API response models that are not database entities."""
+
+import uuid
+
+from pydantic import BaseModel, Field
+
+from metadata_service.models import database
+
+
+class BatchItemError(BaseModel):
+    """API Response model for an item of a batch that could not be created."""
+
+    index: int = Field(ge=0)
+    detail: str
+
+
+class BatchCreateResult(BaseModel):
+    """API Response model for a batch create request.
+
+    ``ids`` lines up with the submitted items, items that were not created have
+    an ID of ``None`` and a matching entry in ``errors``.
+    """
+
+    ids: list[uuid.UUID | None]
+    errors: list[BatchItemError] = []
+
+
+class ImportResult(BaseModel):
+    """API Response model for a bulk import request.
+
+    ``errors`` holds the first rejected lines of the body, by zero based line
+    index, up to a limit, ``rejected`` counts all of them.
+    """
+
+    accepted: int = 0
+    rejected: int = 0
+    errors: list[BatchItemError] = []
+    seconds: float = 0.0
+    rows_per_second: float = 0.0
+
+
+class MembershipChange(BaseModel):
+    """API Response model for users added to or removed from a team.
+
+    ``user_ids`` only lists the users whose membership changed, users that were
+    already in (or not in) the team, or do not exist, are left out.
+    """
+
+    team_id: uuid.UUID
+    user_ids: list[uuid.UUID]
+
+
+class TeamDetail(BaseModel):
+    """API Response model for a team with the related data it was asked for.
+
+    Related data that was not asked for is None and left out of the response.
+    """
+
+    id: uuid.UUID | None = None
+    name: str
+    company_id: uuid.UUID
+    description: str
+    members: list[database.User] | None = None
+    resources: list[database.Resource] | None = None
+    company: database.Company | None = None
+
+
+class UserDetail(BaseModel):
+    """API Response model for a user with the related data it was asked for.
+
+    Related data that was not asked for is None and left out of the response.
+    """
+
+    id: uuid.UUID | None = None
+    name: str
+    email: str
+    company_id: uuid.UUID
+    teams: list[database.Team] | None = None
+    company: database.Company | None = None
+
+
+class LookupResult[T](BaseModel):
+    """API Response model for a multi-get by IDs.
+
+    ``found`` is in the order the IDs were asked for, ``missing`` lists the IDs
+    that do not exist.
+    """
+
+    found: list[T]
+    missing: list[uuid.UUID]
+
+
+class ChangePage(BaseModel):
+    """API Response model for a page of the change feed.
+
+    ``next_since`` is the ``since`` to send for the following page, the last
+    sequence number returned, or the one sent when nothing changed.
+    """
+
+    changes: list[database.ChangeLog]
+    next_since: int
+
+
+class Topology(BaseModel):
+    """API Response model for a company's teams, their members and resources.
+
+    ``users`` lists every user of the company, members of its teams from other
+    companies only appear under the team. ``seq`` is the change feed position
+    the answer reflects.
+    """
+
+    company: database.Company
+    teams: list[TeamDetail]
+    users: list[database.User]
+    seq: int
+
+
+class TopologyStats(BaseModel):
+    """API Response model for the size and freshness of the topology graph."""
+
+    seq: int
+    age_seconds: float
+    company_count: int
+    team_count: int
+    user_count: int
+    resource_count: int
@@ -0,0 +1,161 @@
+"""Keyset (cursor) pagination helpers for the list endpoints.
+
+Offset pagination makes SQLite walk and discard ``skip`` rows on every call, so
+deep pages get slower as a table grows. A cursor records the sort key of the
+last row of a page and the next query seeks straight past it using the primary
+key (or the ``name`` index), so every page costs the same.
+"""
+
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from typing import Any, Literal
+
+from fastapi import Response
+from sqlalchemy import ColumnElement, Select, literal, tuple_
+from sqlmodel import SQLModel
+
+SortField = Literal["id", "name", "-id", "-name"]
+"""The columns a list endpoint can be ordered and paged by, ``-`` for descending."""
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+"""Response header carrying the cursor for the next page."""
+
+
+class CursorError(ValueError):
+    """Raised when a cursor is malformed or does not match the requested sort."""
+
+
+def encode_cursor(row: SQLModel, sort: SortField) -> str:
+    """Encode the sort key of a row as an opaque cursor.
+
+    Args:
+        row (SQLModel): The last row of the page.
+        sort (SortField): The field the page is sorted by.
+    """
+    key: list[Any] = [str(row.id)] if sort.endswith("id") else [row.name, str(row.id)]
+    return encode_key(sort, key)
+
+
+def encode_key(sort: str, key: list[Any]) -> str:
+    """Encode a sort key as an opaque cursor.
+
+    Args:
+        sort (str): The name of the ordering the key belongs to.
+        key (list[Any]): The JSON serializable sort key of the last row.
+    """
+    payload = json.dumps({"s": sort, "k": key}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: SortField) -> list[Any]:
+    """Decode an opaque cursor back into the sort key it was built from.
+
+    Args:
+        cursor (str): The cursor returned by a previous page.
+        sort (SortField): The field the page is sorted by.
+
+    Raises:
+        CursorError: If the cursor is invalid or was issued for another sort.
+    """
+    return decode_key(cursor, sort, 1 if sort.endswith("id") else 2)
+
+
+def decode_key(cursor: str, sort: str, length: int) -> list[Any]:
+    """Decode an opaque cursor back into a sort key of a known length.
+
+    Args:
+        cursor (str): The cursor returned by a previous page.
+        sort (str): The name of the ordering the key must belong to.
+        length (int): The number of values in the key.
+
+    Raises:
+        CursorError: If the cursor is invalid or was issued for another sort.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        key: list[Any] = payload["k"]
+        cursor_sort = payload["s"]
+    except (binascii.Error, ValueError, TypeError, KeyError) as e:
+        raise CursorError("Invalid cursor") from e
+    if cursor_sort != sort or not isinstance(key, list) or len(key) != length:
+        raise CursorError(f"Cursor does not match sort '{sort}'")
+    return key
+
+
+def typed_key(columns: Sequence[Any], key: list[Any]) -> ColumnElement[Any]:
+    """Bind a decoded sort key as a row value, each value as its column's type.
+
+    IDs travel in cursors as text, binding them with the column's type stores
+    them as the column does.
+
+    Args:
+        columns (Sequence[Any]): The columns the key is compared with.
+        key (list[Any]): The decoded sort key.
+    """
+    return tuple_(*(literal(value, column.type) for column, value in zip(columns, key)))
+
+
+def paginate(
+    statement: Select[Any],
+    model: type[SQLModel],
+    *,
+    skip: int = 0,
+    limit: int = 10,
+    cursor: str | None = None,
+    sort: SortField = "id",
+    id_column: ColumnElement[Any] | None = None,
+) -> Select[Any]:
+    """Apply ordering and either keyset or offset paging to a select statement.
+
+    When a cursor is given the statement seeks past the cursor's key and
+    ``skip`` is ignored, otherwise ``skip`` is applied as an offset. SQLite
+    reads an index backwards as cheaply as forwards, so descending sorts are
+    served by the same indexes.
+
+    Args:
+        statement (Select): The select statement to page.
+        model (type[SQLModel]): The model being listed.
+        skip (int, optional): The number of records to skip. Defaults to 0.
+        limit (int, optional): The maximum number of records to return. Defaults to 10.
+        cursor (str | None, optional): The previous page cursor. Defaults to None.
+        sort (SortField, optional): The field to sort by, prefixed with ``-``
+            to sort descending. Defaults to "id".
+        id_column (ColumnElement | None, optional): A column equal to the model's
+            ID to order and seek by instead, such as the foreign key of a link
+            table the model is joined through, so the link table's index
+            supplies the order. Defaults to the model's ID.
+    """
+    if id_column is None:
+        id_column = model.id
+    descending = sort.startswith("-")
+    columns = [id_column] if sort.endswith("id") else [model.name, id_column]
+    statement = statement.order_by(
+        *(column.desc() if descending else column for column in columns)
+    )
+
+    if cursor is not None:
+        key = typed_key(columns, decode_cursor(cursor, sort))
+        position = tuple_(*columns)
+        statement = statement.where(position < key if descending else position > key)
+    elif skip:
+        statement = statement.offset(skip)
+
+    return statement.limit(limit)
+
+
+def set_next_cursor(
+    response: Response, rows: Sequence[SQLModel], limit: int, sort: SortField
+) -> None:
+    """Set the next page cursor header when the page is full.
+
+    Args:
+        response (Response): The response to add the header to.
+        rows (Sequence[SQLModel]): The rows of the current page.
+        limit (int): The page size that was requested.
+        sort (SortField): The field the page is sorted by.
+    """
+    if rows and len(rows) >= limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1], sort)
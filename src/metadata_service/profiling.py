@@ -0,0 +1,248 @@
+"""Per-request SQL profiles and the slow query log.
+
+A request is profiled when it sends ``X-Profile-SQL: 1`` (if
+``sql_profiling_header_enabled``) or is picked by ``sql_profiling_sample_rate``.
+Every statement it issues is recorded with its parameters, its time and its
+``EXPLAIN QUERY PLAN``, and the profile is logged at INFO. A request that asked
+for its profile also gets it back as JSON in the ``X-SQL-Profile`` header,
+holding the statements run before the response started.
+
+Independently of profiling, any statement slower than
+``slow_query_threshold_ms`` is logged as a warning.
+"""
+
+import json
+import logging
+import random
+import time
+import uuid
+from collections.abc import Sequence
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from sqlalchemy import Engine, event
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from metadata_service.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+REQUEST_HEADER = "X-Profile-SQL"
+"""Request header asking for a SQL profile of the request."""
+
+RESPONSE_HEADER = "X-SQL-Profile"
+"""Response header carrying the requested SQL profile."""
+
+MAX_HEADER_BYTES = 8192
+"""The longest profile header sent, later statements are dropped to fit."""
+
+_EXPLAINED = ("SELECT", "INSERT", "UPDATE", "DELETE", "REPLACE", "WITH")
+"""Statements SQLite can explain the query plan of."""
+
+
+@dataclass
+class StatementProfile:
+    """One statement a profiled request executed."""
+
+    statement: str
+    parameters: list[Any]
+    executions: int
+    milliseconds: float
+    plan: list[str]
+
+
+@dataclass
+class RequestProfile:
+    """The statements a profiled request executed."""
+
+    method: str
+    path: str
+    statements: list[StatementProfile] = field(default_factory=list)
+    milliseconds: float = 0.0
+
+    def header_value(self, max_bytes: int = MAX_HEADER_BYTES) -> str:
+        """Render the profile as compact JSON, dropping statements to fit.
+
+        Args:
+            max_bytes (int, optional): The longest value to render.
+                Defaults to MAX_HEADER_BYTES.
+        """
+        profile = asdict(self)
+        statements = profile["statements"]
+        kept = len(statements)
+        while True:
+            profile["statements"] = statements[:kept]
+            profile["truncated"] = len(statements) - kept
+            value = json.dumps(profile, separators=(",", ":"))
+            if len(value) <= max_bytes or not kept:
+                return value
+            kept -= 1
+
+
+@dataclass
+class Profiler:
+    """When to profile requests and which statements are slow."""
+
+    header_enabled: bool = False
+    sample_rate: float = 0.0
+    slow_query_seconds: float = 0.1
+
+    def wants_profile(self, headers: Headers) -> tuple[bool, bool]:
+        """Decide whether to profile a request, and to return the profile.
+
+        Args:
+            headers (Headers): The request headers.
+
+        Returns:
+            Whether to profile the request and whether it asked for the profile.
+        """
+        asked = self.header_enabled and headers.get(REQUEST_HEADER, "").lower() in (
+            "1",
+            "true",
+        )
+        sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        return asked or sampled, asked
+
+
+_settings = get_settings()
+profiler = Profiler(
+    header_enabled=_settings.sql_profiling_header_enabled,
+    sample_rate=_settings.sql_profiling_sample_rate,
+    slow_query_seconds=_settings.slow_query_threshold_ms / 1000,
+)
+"""The service's profiling settings."""
+
+_request_profile: ContextVar[RequestProfile | None] = ContextVar(
+    "request_profile", default=None
+)
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles the SQL of requests that ask or are sampled."""
+
+    def __init__(self, app: ASGIApp):
+        """Wrap an ASGI app."""
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """Serve a request, profiling it if it asked or was sampled."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        profile, asked = profiler.wants_profile(Headers(scope=scope))
+        if not profile:
+            await self.app(scope, receive, send)
+            return
+
+        request_profile = RequestProfile(scope["method"], scope["path"])
+        token = _request_profile.set(request_profile)
+        start = time.perf_counter()
+
+        async def send_with_profile(message: Message):
+            if asked and message["type"] == "http.response.start":
+                request_profile.milliseconds = (time.perf_counter() - start) * 1000
+                headers = MutableHeaders(scope=message)
+                headers[RESPONSE_HEADER] = request_profile.header_value()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            _request_profile.reset(token)
+            request_profile.milliseconds = (time.perf_counter() - start) * 1000
+            logger.info(
+                "SQL profile: %s",
+                json.dumps(asdict(request_profile)),
+                extra={"sql_profile": request_profile},
+            )
+
+
+def _jsonable(value: Any) -> Any:
+    """Convert a bound parameter to a JSON value, IDs to their text form."""
+    if value is None or isinstance(value, bool | int | float | str):
+        return value
+    if isinstance(value, memoryview):
+        value = value.tobytes()
+    # IDs are the only BLOBs the service binds.
+    if isinstance(value, bytes) and len(value) == 16:
+        return str(uuid.UUID(bytes=value))
+    if isinstance(value, bytes):
+        return value.hex()
+    return str(value)
+
+
+def _parameter_list(parameters: Any) -> list[Any]:
+    """List the values bound to one execution of a statement."""
+    if isinstance(parameters, dict):
+        return [_jsonable(value) for value in parameters.values()]
+    return [_jsonable(value) for value in parameters or ()]
+
+
+def _explain(conn: Any, statement: str, parameters: Any) -> list[str]:
+    """Get a statement's query plan, one indented line per step.
+
+    Explaining a statement does not run it, so writes are explained too.
+    """
+    if not statement.lstrip().upper().startswith(_EXPLAINED):
+        return []
+    explain = conn.connection.dbapi_connection.cursor()
+    try:
+        explain.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        rows = explain.fetchall()
+    except Exception as e:
+        return [f"Error: {e}"]
+    finally:
+        explain.close()
+    depths = {0: -1}
+    plan = []
+    for step, parent, _, detail in rows:
+        depths[step] = depths.get(parent, -1) + 1
+        plan.append("  " * depths[step] + detail)
+    return plan
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _statement_started(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, many: bool
+):
+    """Note when a statement started."""
+    if context is not None:
+        context.profiling_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _statement_finished(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, many: bool
+):
+    """Log a slow statement and add it to the request's profile."""
+    started = getattr(context, "profiling_started", None)
+    if started is None:
+        return
+    seconds = time.perf_counter() - started
+    request_profile = _request_profile.get()
+    if seconds < profiler.slow_query_seconds and request_profile is None:
+        return
+
+    executions = len(parameters) if many else 1
+    first: Sequence[Any] | dict[str, Any] = (
+        (parameters[0] if parameters else ()) if many else parameters
+    )
+    if seconds >= profiler.slow_query_seconds:
+        logger.warning(
+            "Slow query took %.1f ms: %s %s",
+            seconds * 1000,
+            statement,
+            _parameter_list(first),
+        )
+    if request_profile is not None:
+        request_profile.statements.append(
+            StatementProfile(
+                statement=statement,
+                parameters=_parameter_list(first),
+                executions=executions,
+                milliseconds=seconds * 1000,
+                plan=_explain(conn, statement, first),
+            )
+        )
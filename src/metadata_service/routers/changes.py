@@ -0,0 +1,56 @@
+"""This is the router for the change feed API."""
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from metadata_service.models import response as api
+from metadata_service.db import SessionmakerDep
+from metadata_service import changes
+
+router = APIRouter()
+
+
+@router.get("/changes", response_model=api.ChangePage)
+async def get_changes(
+    sessionmaker: SessionmakerDep,
+    since: int | None = Query(default=None, ge=0),
+    limit: int = Query(default=100, ge=1, le=1000),
+    wait: float = Query(default=0.0, ge=0, le=changes.MAX_WAIT_SECONDS),
+    accept: str | None = Header(default=None),
+    last_event_id: int | None = Header(default=None, ge=0),
+) -> api.ChangePage | StreamingResponse:
+    """This endpoint gets the changes made after a sequence number.
+
+    Without ``since`` it answers with no changes and the latest sequence
+    number, to start syncing from. With ``wait`` it waits that many seconds
+    for a change before answering with none. With ``Accept:
+    text/event-stream`` it streams changes as Server-Sent Events, resuming
+    from ``Last-Event-ID`` on reconnect. Changes that were compacted away
+    answer 410, and the consumer syncs in full again.
+
+    Args:
+        sessionmaker (SessionmakerDep): The factory for the reads' sessions.
+        since (int | None, optional): The sequence number of the last change
+            seen. Defaults to None.
+        limit (int, optional): The most changes to return. Defaults to 100.
+        wait (float, optional): Seconds to wait for a change. Defaults to 0.
+        accept (str | None, optional): The Accept header. Defaults to None.
+        last_event_id (int | None, optional): The ID of the last event a
+            reconnecting event stream received. Defaults to None.
+    """
+    try:
+        if accept and changes.EVENT_STREAM_MEDIA_TYPE in accept:
+            start = last_event_id if last_event_id is not None else since
+            async with sessionmaker() as session, session.begin():
+                if start is None:
+                    start = await changes.last_seq(session)
+                await changes.check_since(session, start)
+            return StreamingResponse(
+                changes.stream_events(sessionmaker, start, limit),
+                media_type=changes.EVENT_STREAM_MEDIA_TYPE,
+                headers={"Cache-Control": "no-cache"},
+            )
+        return await changes.wait_for_changes(sessionmaker, since, limit, wait)
+    except changes.ChangesExpired as e:
+        raise HTTPException(status_code=410, detail=f"Error: {e}")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error: {e}")
@@ -1,10 +1,25 @@
 """This is the router for company API requests."""
 
-from fastapi import APIRouter, HTTPException
+import uuid
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from collections.abc import Sequence
-from sqlmodel import select
-from metadata_service.models import database
-from metadata_service.db import SessionDep
+from typing import Annotated, Any
+from sqlmodel import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from metadata_service.models import database, put, response as api
+from metadata_service.config import get_settings
+from metadata_service.db import SessionDep, SessionmakerDep
+from metadata_service import (
+    batch,
+    cache,
+    etag,
+    filters,
+    lookup,
+    pagination,
+    serialization,
+    topology,
+    writes,
+)
 
 router = APIRouter()
 
@@ -12,37 +27,76 @@ router = APIRouter()
 @router.get("/companies", response_model=Sequence[database.Company | None])
 async def get_companies(
     session: SessionDep,
+    response: Response,
+    where: Annotated[filters.CompanyFilters, Depends()],
     skip: int = 0,
     limit: int = 10,
+    cursor: str | None = None,
+    sort: pagination.SortField = "id",
+    if_none_match: str | None = Header(default=None),
 ) -> Sequence[database.Company | None]:
     """This endpoint gets companies metadata.
 
     Args:
         session (SessionDep): The database session.
+        response (Response): The response, used to return the next page cursor.
+        where (CompanyFilters): Filters on name_prefix, only matching companies
+            are listed.
         skip (int, optional): The number of records to skip. Defaults to 0.
         limit (int, optional): The maximum number of records to return. Defaults to 10.
+        cursor (str | None, optional): The cursor from the previous page.
+            When given, skip is ignored. Defaults to None.
+        sort (SortField, optional): The field to sort and page by, prefixed with
+            ``-`` to sort descending. Defaults to "id".
+        if_none_match (str | None, optional): The ETag of the page the client
+            has, answered with 304 when unchanged. Defaults to None.
     """
     try:
         async with session.begin():
             result = await session.execute(
-                select(database.Company).offset(skip).limit(limit)
+                pagination.paginate(
+                    where.apply(select(database.Company), database.Company),
+                    database.Company,
+                    skip=skip,
+                    limit=limit,
+                    cursor=cursor,
+                    sort=sort,
+                )
             )
-            response: Sequence[database.Company] = result.scalars().all()
+            companies: Sequence[database.Company] = result.scalars().all()
+            pagination.set_next_cursor(response, companies, limit, sort)
+            not_modified = etag.check_page(response, companies, if_none_match)
+            if not_modified:
+                return not_modified
 
-            return response
+            return serialization.json_response(
+                companies, list[database.Company], response
+            )
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error: {e}")
 
 
 @router.get("/companies/{id}", response_model=database.Company | None)
-async def get_company(session: SessionDep, id: int) -> database.Company | None:
+async def get_company(
+    session: SessionDep,
+    response: Response,
+    id: uuid.UUID,
+    if_none_match: str | None = Header(default=None),
+) -> database.Company | None:
     """This endpoint gets company metadata.
 
     Args:
         session (SessionDep): The database session.
-        id (int): The ID of the company to retrieve.
+        response (Response): The response, used to return the ETag.
+        id (UUID): The ID of the company to retrieve.
+        if_none_match (str | None, optional): The ETag of the company the client
+            has, answered with 304 when unchanged. Defaults to None.
     """
+    cached: database.Company | None = cache.entities.get(database.Company, id)
+    if cached:
+        return etag.check_entity(response, cached, if_none_match) or cached
     try:
+        token = cache.entities.token()
         async with session.begin():
             result = await session.execute(
                 select(database.Company).where(database.Company.id == id)
@@ -50,12 +104,52 @@ async def get_company(session: SessionDep, id: int) -> database.Company | None:
             company: database.Company | None = result.scalars().one_or_none()
 
             if company:
-                return company
+                cache.entities.put(database.Company, id, company, token)
+                return etag.check_entity(response, company, if_none_match) or company
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error: {e}")
     raise HTTPException(status_code=404, detail="Item not found")
 
 
+@router.get("/companies/{id}/topology", response_model=api.Topology)
+async def get_company_topology(
+    sessionmaker: SessionmakerDep, id: uuid.UUID
+) -> api.Topology:
+    """This endpoint gets a company's teams, their members and resources.
+
+    It is answered from the in-memory topology graph, which is caught up with
+    the change feed first if it is older than the configured staleness bound.
+
+    Args:
+        sessionmaker (SessionmakerDep): The factory for the graph's reads.
+        id (UUID): The ID of the company.
+    """
+    try:
+        await topology.graph.refresh(
+            sessionmaker, get_settings().topology_max_staleness_seconds
+        )
+        company = topology.graph.topology(id)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error: {e}")
+    if company is None:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return serialization.json_response(company, topology.Topology)
+
+
+@router.post("/topology:rebuild", response_model=api.TopologyStats)
+async def rebuild_topology(sessionmaker: SessionmakerDep) -> api.TopologyStats:
+    """This endpoint builds the topology graph again from the tables.
+
+    Args:
+        sessionmaker (SessionmakerDep): The factory for the graph's reads.
+    """
+    try:
+        await topology.graph.rebuild(sessionmaker)
+        return topology.graph.stats()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error: {e}")
+
+
 @router.post("/company", response_model=database.Company | None)
 async def create_company(
     session: SessionDep, company: database.Company
@@ -67,61 +161,171 @@ async def create_company(
         company (Company): The company to create.
     """
     try:
-        async with session.begin():
+
+        async def write(session: AsyncSession) -> database.Company:
             session.add(company)
             await session.flush()
             await session.refresh(company)
             return company
+
+        return await writes.coordinator.run(session, write)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error: {e}")
+
+
+@router.post("/companies:batch", response_model=api.BatchCreateResult)
+async def create_companies_batch(
+    session: SessionDep,
+    companies: list[dict[str, Any]],
+    mode: batch.BatchMode = "atomic",
+) -> api.BatchCreateResult:
+    """This endpoint creates many companies in a single transaction.
+
+    Args:
+        session (SessionDep): The database session.
+        companies (list[dict]): The companies to create.
+        mode (BatchMode, optional): "atomic" creates every company or none,
+            "partial" creates the valid companies and reports the rest.
+            Defaults to "atomic".
+    """
+    try:
+        async with session.begin():
+            return await batch.create_many(session, database.Company, companies, mode)
+    except batch.BatchRejected as e:
+        raise HTTPException(
+            status_code=400, detail=[error.model_dump() for error in e.errors]
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error: {e}")
+
+
+@router.get("/companies:lookup", response_model=api.LookupResult[database.Company])
+async def lookup_companies(
+    session: SessionDep, ids: str
+) -> api.LookupResult[database.Company]:
+    """This endpoint gets many companies by ID in one request.
+
+    Args:
+        session (SessionDep): The database session.
+        ids (str): Comma separated IDs of the companies to get.
+    """
+    try:
+        async with session.begin():
+            result = await lookup.get_many(
+                session, database.Company, lookup.parse_ids(ids)
+            )
+            return serialization.json_response(
+                result, api.LookupResult[database.Company]
+            )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error: {e}")
+
+
+@router.post("/companies:lookup", response_model=api.LookupResult[database.Company])
+async def lookup_companies_by_body(
+    session: SessionDep, request: put.RequestLookup
+) -> api.LookupResult[database.Company]:
+    """This endpoint gets many companies by ID, for lists too long for a URL.
+
+    Args:
+        session (SessionDep): The database session.
+        request (RequestLookup): The IDs of the companies to get.
+    """
+    try:
+        async with session.begin():
+            result = await lookup.get_many(session, database.Company, request.ids)
+            return serialization.json_response(
+                result, api.LookupResult[database.Company]
+            )
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error: {e}")
 
 
 @router.put("/company/{id}", response_model=database.Company | None)
 async def update_company(
-    id: int, company: database.Company, session: SessionDep
+    id: uuid.UUID,
+    company: database.Company,
+    session: SessionDep,
+    response: Response,
+    if_match: str | None = Header(default=None),
 ) -> database.Company | None:
     """This endpoint updates company metadata.
 
+    The update is a single UPDATE ... RETURNING statement, empty fields keep
+    their current value. Every update increments the row's version, and an
+    If-Match header makes the update conditional on the version it names,
+    answering 412 when another write got there first.
+
     Args:
-        id (int): The ID of the company to update.
+        id (UUID): The ID of the company to update.
         company (Company): The company to update.
         session (SessionDep): The database session.
+        response (Response): The response, used to set the ETag header.
+        if_match (str | None, optional): The ETag the client last read, the
+            update only applies to that version. Defaults to None.
     """
+    values = {
+        name: value
+        for name, value in company.model_dump(exclude={"id"}).items()
+        if value
+    }
     try:
-        async with session.begin():
-            result = await session.execute(
-                select(database.Company).where(database.Company.id == id)
-            )
-            company_to_update: database.Company | None = result.scalars().one_or_none()
-            if company_to_update:
-                company_to_update.name = company.name or company_to_update.name
-                session.add(company_to_update)
-                await session.flush()
-                await session.refresh(company_to_update)
-                return company_to_update
+        expected = etag.expected_version(if_match)
+        conditions = [database.Company.id == id]
+        if expected is not None:
+            conditions.append(database.Company.version == expected)
+        statement = (
+            update(database.Company)
+            .where(*conditions)
+            .values({**values, "version": database.Company.version + 1})
+            .returning(database.Company)
+            .execution_options(synchronize_session=False)
+            if values
+            else select(database.Company).where(*conditions)
+        )
+
+        async def write(session: AsyncSession) -> database.Company | None:
+            result = await session.execute(statement)
+            company_updated: database.Company | None = result.scalars().one_or_none()
+            if company_updated:
+                cache.entities.invalidate_on_commit(session, database.Company, id)
+                return company_updated
+            await etag.check_version(session, database.Company, id, expected)
+            return None
+
+        company_updated = await writes.coordinator.run(session, write)
+        if company_updated:
+            response.headers[etag.ETAG_HEADER] = etag.entity_etag(company_updated)
+            return company_updated
+    except etag.PreconditionFailed as e:
+        raise HTTPException(status_code=412, detail=f"Error: {e}")
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error: {e}")
     raise HTTPException(status_code=404, detail="Item not found")
 
 
-@router.delete("/company/{id}", response_model=dict[str, int | str])
-async def delete_company(id: int, session: SessionDep) -> dict[str, int | str]:
+@router.delete("/company/{id}", response_model=dict[str, uuid.UUID | str])
+async def delete_company(
+    id: uuid.UUID, session: SessionDep
+) -> dict[str, uuid.UUID | str]:
     """This endpoint deletes company metadata.
 
     Args:
-        id (int): The ID of the company to delete.
+        id (UUID): The ID of the company to delete.
         session (SessionDep): The database session.
     """
     try:
         async with session.begin():
             result = await session.execute(
-                select(database.Company).where(database.Company.id == id)
+                delete(database.Company)
+                .where(database.Company.id == id)
+                .returning(database.Company)
+                .execution_options(synchronize_session=False)
             )
             company: database.Company | None = result.scalars().one_or_none()
 
             if company:
-                await session.delete(company)
-                await session.flush()
+                cache.entities.invalidate_on_commit(session, database.Company, id)
                 return {"id": id, "name": company.name, "status": "deleted"}
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error: {e}")
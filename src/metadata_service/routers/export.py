@@ -0,0 +1,99 @@
+"""This is the router for the bulk export API."""
+
+from collections.abc import AsyncIterator, Mapping
+from typing import Any
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import ColumnElement, Select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlmodel import SQLModel, select
+from metadata_service.models import database
+from metadata_service.db import SessionmakerDep
+from metadata_service import serialization
+from metadata_service.filters import name_prefix
+
+router = APIRouter()
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+EXPORT_CHUNK_ROWS = 1000
+"""Rows fetched from the cursor and written to the response at a time."""
+
+
+def export_filters(
+    model: type[SQLModel], params: Mapping[str, str]
+) -> list[ColumnElement[bool]]:
+    """Build equality filters from query parameters named after model fields.
+
+    ``name_prefix`` matches names starting with its value, as on the lists.
+
+    Args:
+        model (type[SQLModel]): The model being exported.
+        params (Mapping[str, str]): The request query parameters.
+
+    Raises:
+        ValueError: If a parameter is not a field of the model or its value
+            does not match the field's type.
+    """
+    filters: list[ColumnElement[bool]] = []
+    for name, value in params.items():
+        if name == "name_prefix" and "name" in model.model_fields:
+            filters.extend(name_prefix(model.name, value))
+            continue
+        field = model.model_fields.get(name)
+        if field is None:
+            raise ValueError(f"Unknown filter '{name}'")
+        typed = TypeAdapter(field.annotation).validate_python(value)
+        filters.append(getattr(model, name) == typed)
+    return filters
+
+
+async def stream_ndjson(
+    sessionmaker: async_sessionmaker[AsyncSession], statement: Select[Any]
+) -> AsyncIterator[bytes]:
+    """Stream the rows of a statement as newline delimited JSON.
+
+    Rows are read through a server side cursor a chunk at a time, so memory
+    does not grow with the table. The whole stream is read in one transaction,
+    which gives a consistent snapshot of the table.
+
+    Args:
+        sessionmaker (async_sessionmaker): The factory for the export's session.
+        statement (Select): The statement selecting the rows to export.
+    """
+    async with sessionmaker() as session, session.begin():
+        result = await session.stream_scalars(
+            statement.execution_options(yield_per=EXPORT_CHUNK_ROWS)
+        )
+        async for rows in result.partitions():
+            yield serialization.ndjson(rows)
+
+
+@router.get("/export/{entity}", response_class=StreamingResponse)
+async def export_entities(
+    entity: database.EntityName, request: Request, sessionmaker: SessionmakerDep
+) -> StreamingResponse:
+    """This endpoint streams every row of an entity table as NDJSON.
+
+    Query parameters named after a field of the entity filter the export to
+    rows with that value, e.g.
+    ``/export/resources?owner=0190a1b2-c3d4-7e5f-8a6b-7c8d9e0f1a2b&type=postgres``.
+
+    Args:
+        entity (EntityName): The entity table to export.
+        request (Request): The request, used to read the filters.
+        sessionmaker (SessionmakerDep): The factory for the export's session.
+    """
+    model = database.ENTITIES[entity]
+    try:
+        statement = (
+            select(model)
+            .where(*export_filters(model, request.query_params))
+            .order_by(model.id)
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error: {e}")
+    return StreamingResponse(
+        stream_ndjson(sessionmaker, statement), media_type=NDJSON_MEDIA_TYPE
+    )
@@ -0,0 +1,125 @@
+"""This is the router for the bulk import API."""
+
+import json
+import time
+from collections.abc import AsyncIterator
+from typing import Any
+from fastapi import APIRouter, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import SQLModel
+from metadata_service.models import database, response as api
+from metadata_service.db import SessionDep
+from metadata_service import batch
+
+router = APIRouter()
+
+MAX_LINE_BYTES = 1024 * 1024
+"""The longest NDJSON line accepted, bounding the memory a request can use."""
+
+MAX_REPORTED_ERRORS = 100
+"""Rejected lines reported individually, the rest are only counted."""
+
+
+async def read_lines(body: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Split a streamed request body into lines without reading all of it.
+
+    Args:
+        body (AsyncIterator[bytes]): The request body chunks.
+
+    Raises:
+        ValueError: If a line is longer than MAX_LINE_BYTES.
+    """
+    buffer = b""
+    async for chunk in body:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+        if len(buffer) > MAX_LINE_BYTES:
+            raise ValueError(f"Line longer than {MAX_LINE_BYTES} bytes")
+    if buffer:
+        yield buffer
+
+
+async def _commit_chunk(
+    session: AsyncSession,
+    model: type[SQLModel],
+    lines: list[int],
+    items: list[dict[str, Any]],
+    result: api.ImportResult,
+):
+    """Create a chunk of items in its own transaction and tally the outcome."""
+    async with session.begin():
+        created = await batch.create_many(
+            session, model, items, "partial", keep_ids=True
+        )
+    result.accepted += sum(1 for id in created.ids if id is not None)
+    for error in created.errors:
+        _reject(result, lines[error.index], error.detail)
+
+
+def _reject(result: api.ImportResult, line: int, detail: str):
+    """Count a rejected line and report it while under the limit."""
+    result.rejected += 1
+    if len(result.errors) < MAX_REPORTED_ERRORS:
+        result.errors.append(api.BatchItemError(index=line, detail=detail))
+
+
+@router.post("/import/{entity}", response_model=api.ImportResult)
+async def import_entities(
+    entity: database.EntityName,
+    request: Request,
+    session: SessionDep,
+    chunk_size: int = Query(default=1000, ge=1, le=10_000),
+) -> api.ImportResult:
+    """This endpoint creates entities from an NDJSON request body.
+
+    The body is read incrementally and every ``chunk_size`` lines are validated
+    and inserted in their own transaction, so neither the body nor a single
+    transaction grows with the size of the import. Invalid lines are rejected
+    and the rest of their chunk is still created. Chunks committed before an
+    error that stops the import stay committed.
+
+    A line's ``id`` is kept, so an export imported elsewhere keeps the
+    references between its rows, and a line whose ID is already taken is
+    rejected. Lines without one are given a new ID.
+
+    Args:
+        entity (EntityName): The entity table to import into.
+        request (Request): The request, used to stream the body.
+        session (SessionDep): The database session.
+        chunk_size (int, optional): Lines per transaction. Defaults to 1000.
+    """
+    model = database.ENTITIES[entity]
+    result = api.ImportResult()
+    start = time.perf_counter()
+    lines: list[int] = []
+    items: list[dict[str, Any]] = []
+    try:
+        line = -1
+        async for line_bytes in read_lines(request.stream()):
+            line += 1
+            if not line_bytes.strip():
+                continue
+            try:
+                item = json.loads(line_bytes)
+            except ValueError as e:
+                _reject(result, line, f"Invalid JSON: {e}")
+                continue
+            if not isinstance(item, dict):
+                _reject(result, line, "Expected a JSON object")
+                continue
+            lines.append(line)
+            items.append(item)
+            if len(items) >= chunk_size:
+                await _commit_chunk(session, model, lines, items, result)
+                lines, items = [], []
+        if items:
+            await _commit_chunk(session, model, lines, items, result)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error: {e}")
+    result.errors.sort(key=lambda error: error.index)
+    result.seconds = time.perf_counter() - start
+    if result.seconds:
+        result.rows_per_second = result.accepted / result.seconds
+    return result
@@ -1,10 +1,24 @@
 """This is the router for the resource API."""
 
-from fastapi import APIRouter, HTTPException
+import uuid
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from collections.abc import Sequence
-from sqlmodel import select
-from metadata_service.models import database, put
+from typing import Annotated, Any
+from sqlmodel import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from metadata_service.models import database, put, response as api
 from metadata_service.db import SessionDep
+from metadata_service import (
+    batch,
+    cache,
+    etag,
+    filters,
+    lookup,
+    pagination,
+    search,
+    serialization,
+    writes,
+)
 
 router = APIRouter()
 
@@ -12,36 +26,114 @@ router = APIRouter()
 @router.get("/resources", response_model=Sequence[database.Resource | None])
 async def get_resources(
     session: SessionDep,
+    response: Response,
+    where: Annotated[filters.ResourceFilters, Depends()],
     skip: int = 0,
     limit: int = 10,
+    cursor: str | None = None,
+    sort: pagination.SortField = "id",
+    if_none_match: str | None = Header(default=None),
 ) -> Sequence[database.Resource | None]:
     """This endpoint gets resources metadata.
 
     Args:
         session (SessionDep): The database session.
+        response (Response): The response, used to return the next page cursor.
+        where (ResourceFilters): Filters on type, lifecycle_status, owner and
+            name_prefix, only matching resources are listed.
         skip (int, optional): The number of records to skip. Defaults to 0.
         limit (int, optional): The maximum number of records to return. Defaults to 10.
+        cursor (str | None, optional): The cursor from the previous page.
+            When given, skip is ignored. Defaults to None.
+        sort (SortField, optional): The field to sort and page by, prefixed with
+            ``-`` to sort descending. Defaults to "id".
+        if_none_match (str | None, optional): The ETag of the page the client
+            has, answered with 304 when unchanged. Defaults to None.
     """
     try:
         async with session.begin():
             result = await session.execute(
-                select(database.Resource).offset(skip).limit(limit)
+                pagination.paginate(
+                    where.apply(select(database.Resource), database.Resource),
+                    database.Resource,
+                    skip=skip,
+                    limit=limit,
+                    cursor=cursor,
+                    sort=sort,
+                )
+            )
+            resources: Sequence[database.Resource] = result.scalars().all()
+            pagination.set_next_cursor(response, resources, limit, sort)
+            not_modified = etag.check_page(response, resources, if_none_match)
+            if not_modified:
+                return not_modified
+
+            return serialization.json_response(
+                resources, list[database.Resource], response
+            )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error: {e}")
+
+
+@router.get("/resources/search", response_model=Sequence[database.Resource])
+async def search_resources(
+    session: SessionDep,
+    response: Response,
+    q: str,
+    limit: int = 10,
+    cursor: str | None = None,
+) -> Sequence[database.Resource]:
+    """This endpoint searches resources by the words in their name and description.
+
+    Every word must match, a trailing ``*`` matches words starting with it.
+    Results are ordered by relevance and paged with the X-Next-Cursor header.
+
+    Args:
+        session (SessionDep): The database session.
+        response (Response): The response, used to return the next page cursor.
+        q (str): The words to search for.
+        limit (int, optional): The maximum number of records to return. Defaults to 10.
+        cursor (str | None, optional): The cursor from the previous page.
+            Defaults to None.
+    """
+    try:
+        async with session.begin():
+            result = await session.execute(
+                search.search_statement(
+                    database.Resource, q, limit=limit, cursor=cursor
+                )
             )
+            rows = result.all()
+            search.set_next_cursor(response, rows, limit)
 
-            return result.scalars().all()
+            return serialization.json_response(
+                [resource for resource, _ in rows], list[database.Resource], response
+            )
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error: {e}")
 
 
 @router.get("/resources/{id}", response_model=database.Resource | None)
-async def get_resource(session: SessionDep, id: int) -> database.Resource | None:
+async def get_resource(
+    session: SessionDep,
+    response: Response,
+    id: uuid.UUID,
+    if_none_match: str | None = Header(default=None),
+) -> database.Resource | None:
     """This endpoint gets resource metadata.
 
     Args:
         session (SessionDep): The database session.
-        id (int): The ID of the resource to retrieve.
+        response (Response): The response, used to return the ETag.
+        id (UUID): The ID of the resource to retrieve.
+        if_none_match (str | None, optional): The ETag of the resource the client
+            has, answered with 304 when unchanged. Defaults to None.
     """
+    cached: database.Resource | None = cache.entities.get(database.Resource, id)
+    if cached:
+        return etag.check_entity(response, cached, if_none_match) or cached
     try:
+        token = cache.entities.token()
         async with session.begin():
             result = await session.execute(
                 select(database.Resource).where(database.Resource.id == id)
@@ -49,7 +141,8 @@ async def get_resource(session: SessionDep, id: int) -> database.Resource | None
             resource: database.Resource | None = result.scalars().one_or_none()
 
             if resource:
-                return resource
+                cache.entities.put(database.Resource, id, resource, token)
+                return etag.check_entity(response, resource, if_none_match) or resource
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error: {e}")
     raise HTTPException(status_code=404, detail="Item not found")
@@ -66,71 +159,171 @@ async def create_resource(
         resource (Resource): The resource to create.
     """
     try:
-        async with session.begin():
+
+        async def write(session: AsyncSession) -> database.Resource:
             session.add(resource)
             await session.flush()
             await session.refresh(resource)
             return resource
+
+        return await writes.coordinator.run(session, write)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error: {e}")
+
+
+@router.post("/resources:batch", response_model=api.BatchCreateResult)
+async def create_resources_batch(
+    session: SessionDep,
+    resources: list[dict[str, Any]],
+    mode: batch.BatchMode = "atomic",
+) -> api.BatchCreateResult:
+    """This endpoint creates many resources in a single transaction.
+
+    Args:
+        session (SessionDep): The database session.
+        resources (list[dict]): The resources to create.
+        mode (BatchMode, optional): "atomic" creates every resource or none,
+            "partial" creates the valid resources and reports the rest.
+            Defaults to "atomic".
+    """
+    try:
+        async with session.begin():
+            return await batch.create_many(session, database.Resource, resources, mode)
+    except batch.BatchRejected as e:
+        raise HTTPException(
+            status_code=400, detail=[error.model_dump() for error in e.errors]
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error: {e}")
+
+
+@router.get("/resources:lookup", response_model=api.LookupResult[database.Resource])
+async def lookup_resources(
+    session: SessionDep, ids: str
+) -> api.LookupResult[database.Resource]:
+    """This endpoint gets many resources by ID in one request.
+
+    Args:
+        session (SessionDep): The database session.
+        ids (str): Comma separated IDs of the resources to get.
+    """
+    try:
+        async with session.begin():
+            result = await lookup.get_many(
+                session, database.Resource, lookup.parse_ids(ids)
+            )
+            return serialization.json_response(
+                result, api.LookupResult[database.Resource]
+            )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error: {e}")
+
+
+@router.post("/resources:lookup", response_model=api.LookupResult[database.Resource])
+async def lookup_resources_by_body(
+    session: SessionDep, request: put.RequestLookup
+) -> api.LookupResult[database.Resource]:
+    """This endpoint gets many resources by ID, for lists too long for a URL.
+
+    Args:
+        session (SessionDep): The database session.
+        request (RequestLookup): The IDs of the resources to get.
+    """
+    try:
+        async with session.begin():
+            result = await lookup.get_many(session, database.Resource, request.ids)
+            return serialization.json_response(
+                result, api.LookupResult[database.Resource]
+            )
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error: {e}")
 
 
 @router.put("/resource/{id}", response_model=database.Resource | None)
 async def update_resource(
-    id: int, resource: put.RequestResource, session: SessionDep
+    id: uuid.UUID,
+    resource: put.RequestResource,
+    session: SessionDep,
+    response: Response,
+    if_match: str | None = Header(default=None),
 ) -> database.Resource | None:
     """This endpoint updates resource metadata.
 
+    The update is a single UPDATE ... RETURNING statement, empty fields keep
+    their current value. Every update increments the row's version, and an
+    If-Match header makes the update conditional on the version it names,
+    answering 412 when another write got there first.
+
     Args:
-        id (int): The ID of the resource to update.
+        id (UUID): The ID of the resource to update.
         resource (Resource): The resource to update.
         session (SessionDep): The database session.
+        response (Response): The response, used to set the ETag header.
+        if_match (str | None, optional): The ETag the client last read, the
+            update only applies to that version. Defaults to None.
     """
+    values = {
+        name: value
+        for name, value in resource.model_dump(exclude={"id"}).items()
+        if value
+    }
     try:
-        async with session.begin():
-            result = await session.execute(
-                select(database.Resource).where(database.Resource.id == id)
-            )
-            resource_to_update: database.Resource | None = (
-                result.scalars().one_or_none()
-            )
-            if resource_to_update:
-                resource_to_update.name = resource.name or resource_to_update.name
-                resource_to_update.type = resource.type or resource_to_update.type
-                resource_to_update.lifecycle_status = (
-                    resource.lifecycle_status or resource_to_update.lifecycle_status
-                )
-                resource_to_update.description = (
-                    resource.description or resource_to_update.description
-                )
-                resource_to_update.owner = resource.owner or resource_to_update.owner
-                session.add(resource_to_update)
-                await session.flush()
-                await session.refresh(resource_to_update)
-                return resource_to_update
+        expected = etag.expected_version(if_match)
+        conditions = [database.Resource.id == id]
+        if expected is not None:
+            conditions.append(database.Resource.version == expected)
+        statement = (
+            update(database.Resource)
+            .where(*conditions)
+            .values({**values, "version": database.Resource.version + 1})
+            .returning(database.Resource)
+            .execution_options(synchronize_session=False)
+            if values
+            else select(database.Resource).where(*conditions)
+        )
+
+        async def write(session: AsyncSession) -> database.Resource | None:
+            result = await session.execute(statement)
+            resource_updated: database.Resource | None = result.scalars().one_or_none()
+            if resource_updated:
+                cache.entities.invalidate_on_commit(session, database.Resource, id)
+                return resource_updated
+            await etag.check_version(session, database.Resource, id, expected)
+            return None
+
+        resource_updated = await writes.coordinator.run(session, write)
+        if resource_updated:
+            response.headers[etag.ETAG_HEADER] = etag.entity_etag(resource_updated)
+            return resource_updated
+    except etag.PreconditionFailed as e:
+        raise HTTPException(status_code=412, detail=f"Error: {e}")
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error: {e}")
     raise HTTPException(status_code=404, detail="Item not found")
 
 
-@router.delete("/resource/{id}", response_model=dict[str, int | str])
-async def delete_resource(id: int, session: SessionDep) -> dict[str, int | str]:
+@router.delete("/resource/{id}", response_model=dict[str, uuid.UUID | str])
+async def delete_resource(
+    id: uuid.UUID, session: SessionDep
+) -> dict[str, uuid.UUID | str]:
     """This endpoint delets resource metadata.
 
     Args:
-        id (int): The ID of the resource to delete.
+        id (UUID): The ID of the resource to delete.
         session (SessionDep): The database session.
     """
     try:
         async with session.begin():
             result = await session.execute(
-                select(database.Resource).where(database.Resource.id == id)
+                delete(database.Resource)
+                .where(database.Resource.id == id)
+                .returning(database.Resource)
+                .execution_options(synchronize_session=False)
             )
             resource: database.Resource | None = result.scalars().one_or_none()
 
             if resource:
-                await session.delete(resource)
-                await session.flush()
+                cache.entities.invalidate_on_commit(session, database.Resource, id)
                 return {"id": id, "name": resource.name, "status": "deleted"}
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error: {e}")
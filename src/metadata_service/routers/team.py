@@ -1,56 +1,185 @@
 """This is the FastAPI router for team-related endpoints."""
 
-from fastapi import APIRouter, HTTPException
+import uuid
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from collections.abc import Sequence
-from sqlmodel import select
-from metadata_service.models import database, put
+from typing import Annotated, Any
+from sqlmodel import delete, insert, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from metadata_service.models import database, put, response as api
 from metadata_service.db import SessionDep
+from metadata_service import (
+    batch,
+    cache,
+    etag,
+    filters,
+    includes,
+    lookup,
+    pagination,
+    search,
+    serialization,
+    writes,
+)
 
 router = APIRouter()
 
 
-@router.get("/teams", response_model=Sequence[database.Team | None])
+@router.get(
+    "/teams",
+    response_model=Sequence[api.TeamDetail],
+    response_model_exclude_none=True,
+)
 async def get_teams(
     session: SessionDep,
+    response: Response,
+    where: Annotated[filters.TeamFilters, Depends()],
     skip: int = 0,
     limit: int = 10,
-) -> Sequence[database.Team | None]:
+    cursor: str | None = None,
+    sort: pagination.SortField = "id",
+    include: str | None = None,
+    if_none_match: str | None = Header(default=None),
+) -> Sequence[api.TeamDetail]:
     """This endpoint gets teams metadata.
 
     Args:
         session (SessionDep): The database session.
+        response (Response): The response, used to return the next page cursor.
+        where (TeamFilters): Filters on company_id and name_prefix, only
+            matching teams are listed.
         skip (int, optional): The number of records to skip. Defaults to 0.
         limit (int, optional): The maximum number of records to return. Defaults to 10.
+        cursor (str | None, optional): The cursor from the previous page.
+            When given, skip is ignored. Defaults to None.
+        sort (SortField, optional): The field to sort and page by, prefixed with
+            ``-`` to sort descending. Defaults to "id".
+        include (str | None, optional): Comma separated related data to embed
+            in each team, any of members, resources, company. Defaults to None.
+        if_none_match (str | None, optional): The ETag of the page the client
+            has, answered with 304 when unchanged. Skipped with includes.
+            Defaults to None.
     """
     try:
+        related = includes.parse(include, includes.TEAM_INCLUDES)
         async with session.begin():
             result = await session.execute(
-                select(database.Team).offset(skip).limit(limit)
+                pagination.paginate(
+                    where.apply(
+                        select(database.Team).options(
+                            *includes.load_options(database.Team, related)
+                        ),
+                        database.Team,
+                    ),
+                    database.Team,
+                    skip=skip,
+                    limit=limit,
+                    cursor=cursor,
+                    sort=sort,
+                )
+            )
+            teams: Sequence[database.Team] = result.scalars().all()
+            pagination.set_next_cursor(response, teams, limit, sort)
+            if not related:
+                not_modified = etag.check_page(response, teams, if_none_match)
+                if not_modified:
+                    return not_modified
+                return serialization.json_response(teams, list[database.Team], response)
+            return serialization.json_response(
+                [includes.embed(team, api.TeamDetail, related) for team in teams],
+                list[api.TeamDetail],
+                response,
+                exclude_none=True,
             )
-            response: Sequence[database.Team] = result.scalars().all()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error: {e}")
+
+
+@router.get("/teams/search", response_model=Sequence[database.Team])
+async def search_teams(
+    session: SessionDep,
+    response: Response,
+    q: str,
+    limit: int = 10,
+    cursor: str | None = None,
+) -> Sequence[database.Team]:
+    """This endpoint searches teams by the words in their name and description.
+
+    Every word must match, a trailing ``*`` matches words starting with it.
+    Results are ordered by relevance and paged with the X-Next-Cursor header.
 
-            return response
+    Args:
+        session (SessionDep): The database session.
+        response (Response): The response, used to return the next page cursor.
+        q (str): The words to search for.
+        limit (int, optional): The maximum number of records to return. Defaults to 10.
+        cursor (str | None, optional): The cursor from the previous page.
+            Defaults to None.
+    """
+    try:
+        async with session.begin():
+            result = await session.execute(
+                search.search_statement(database.Team, q, limit=limit, cursor=cursor)
+            )
+            rows = result.all()
+            search.set_next_cursor(response, rows, limit)
+
+            return serialization.json_response(
+                [team for team, _ in rows], list[database.Team], response
+            )
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error: {e}")
 
 
-@router.get("/teams/{id}", response_model=database.Team | None)
-async def get_team(session: SessionDep, id: int) -> database.Team | None:
+@router.get(
+    "/teams/{id}",
+    response_model=api.TeamDetail,
+    response_model_exclude_none=True,
+)
+async def get_team(
+    session: SessionDep,
+    response: Response,
+    id: uuid.UUID,
+    include: str | None = None,
+    if_none_match: str | None = Header(default=None),
+) -> api.TeamDetail:
     """This endpoint gets team metadata.
 
     Args:
         session (SessionDep): The database session.
-        id (int): The ID of the team to retrieve.
+        response (Response): The response, used to return the ETag.
+        id (UUID): The ID of the team to retrieve.
+        include (str | None, optional): Comma separated related data to embed,
+            any of members, resources, company. Defaults to None.
+        if_none_match (str | None, optional): The ETag of the team the client
+            has, answered with 304 when unchanged. Skipped with includes.
+            Defaults to None.
     """
     try:
+        related = includes.parse(include, includes.TEAM_INCLUDES)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error: {e}")
+    if not related:
+        cached: database.Team | None = cache.entities.get(database.Team, id)
+        if cached:
+            not_modified = etag.check_entity(response, cached, if_none_match)
+            return not_modified or includes.embed(cached, api.TeamDetail, related)
+    try:
+        token = cache.entities.token()
         async with session.begin():
             result = await session.execute(
-                select(database.Team).where(database.Team.id == id)
+                select(database.Team)
+                .where(database.Team.id == id)
+                .options(*includes.load_options(database.Team, related))
             )
             team: database.Team | None = result.scalars().one_or_none()
 
             if team:
-                return team
+                if not related:
+                    cache.entities.put(database.Team, id, team, token)
+                    not_modified = etag.check_entity(response, team, if_none_match)
+                    if not_modified:
+                        return not_modified
+                return includes.embed(team, api.TeamDetail, related)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error: {e}")
     raise HTTPException(status_code=404, detail="Item not found")
@@ -65,72 +194,314 @@ async def create_team(session: SessionDep, team: database.Team) -> database.Team
         team (Team): The team to create.
     """
     try:
-        async with session.begin():
-            db_team: database.Team = database.Team(
-                name=team.name,
-                company_id=team.company_id,
-                description=team.description,
-            )
+        db_team: database.Team = database.Team(
+            name=team.name,
+            company_id=team.company_id,
+            description=team.description,
+        )
 
+        async def write(session: AsyncSession) -> database.Team:
             session.add(db_team)
             await session.flush()
             await session.refresh(db_team)
             return db_team
+
+        return await writes.coordinator.run(session, write)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error: {e}")
+
+
+@router.post("/teams:batch", response_model=api.BatchCreateResult)
+async def create_teams_batch(
+    session: SessionDep,
+    teams: list[dict[str, Any]],
+    mode: batch.BatchMode = "atomic",
+) -> api.BatchCreateResult:
+    """This endpoint creates many teams in a single transaction.
+
+    Args:
+        session (SessionDep): The database session.
+        teams (list[dict]): The teams to create.
+        mode (BatchMode, optional): "atomic" creates every team or none,
+            "partial" creates the valid teams and reports the rest.
+            Defaults to "atomic".
+    """
+    try:
+        async with session.begin():
+            return await batch.create_many(session, database.Team, teams, mode)
+    except batch.BatchRejected as e:
+        raise HTTPException(
+            status_code=400, detail=[error.model_dump() for error in e.errors]
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error: {e}")
+
+
+@router.get("/teams:lookup", response_model=api.LookupResult[database.Team])
+async def lookup_teams(
+    session: SessionDep, ids: str
+) -> api.LookupResult[database.Team]:
+    """This endpoint gets many teams by ID in one request.
+
+    Args:
+        session (SessionDep): The database session.
+        ids (str): Comma separated IDs of the teams to get.
+    """
+    try:
+        async with session.begin():
+            result = await lookup.get_many(
+                session, database.Team, lookup.parse_ids(ids)
+            )
+            return serialization.json_response(result, api.LookupResult[database.Team])
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error: {e}")
+
+
+@router.post("/teams:lookup", response_model=api.LookupResult[database.Team])
+async def lookup_teams_by_body(
+    session: SessionDep, request: put.RequestLookup
+) -> api.LookupResult[database.Team]:
+    """This endpoint gets many teams by ID, for lists too long for a URL.
+
+    Args:
+        session (SessionDep): The database session.
+        request (RequestLookup): The IDs of the teams to get.
+    """
+    try:
+        async with session.begin():
+            result = await lookup.get_many(session, database.Team, request.ids)
+            return serialization.json_response(result, api.LookupResult[database.Team])
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error: {e}")
 
 
 @router.put("/team/{id}", response_model=database.Team | None)
 async def update_team(
-    id: int, team: put.RequestTeam, session: SessionDep
+    id: uuid.UUID,
+    team: put.RequestTeam,
+    session: SessionDep,
+    response: Response,
+    if_match: str | None = Header(default=None),
 ) -> database.Team | None:
     """This endpoint updates team metadata.
 
+    The update is a single UPDATE ... RETURNING statement, empty fields keep
+    their current value. Every update increments the row's version, and an
+    If-Match header makes the update conditional on the version it names,
+    answering 412 when another write got there first.
+
     Args:
-        id (int): The ID of the team to update.
+        id (UUID): The ID of the team to update.
         team (Team): The team to update.
         session (SessionDep): The database session.
+        response (Response): The response, used to set the ETag header.
+        if_match (str | None, optional): The ETag the client last read, the
+            update only applies to that version. Defaults to None.
     """
+    values = {
+        name: value for name, value in team.model_dump(exclude={"id"}).items() if value
+    }
     try:
-        async with session.begin():
-            result = await session.execute(
-                select(database.Team).where(database.Team.id == id)
-            )
-            team_to_update: database.Team | None = result.scalars().one_or_none()
-            if team_to_update:
-                team_to_update.name = team.name or team_to_update.name
-                team_to_update.company_id = team.company_id or team_to_update.company_id
-                team_to_update.description = (
-                    team.description or team_to_update.description
-                )
-                session.add(team_to_update)
-                await session.flush()
-                await session.refresh(team_to_update)
-                return team_to_update
+        expected = etag.expected_version(if_match)
+        conditions = [database.Team.id == id]
+        if expected is not None:
+            conditions.append(database.Team.version == expected)
+        statement = (
+            update(database.Team)
+            .where(*conditions)
+            .values({**values, "version": database.Team.version + 1})
+            .returning(database.Team)
+            .execution_options(synchronize_session=False)
+            if values
+            else select(database.Team).where(*conditions)
+        )
+
+        async def write(session: AsyncSession) -> database.Team | None:
+            result = await session.execute(statement)
+            team_updated: database.Team | None = result.scalars().one_or_none()
+            if team_updated:
+                cache.entities.invalidate_on_commit(session, database.Team, id)
+                return team_updated
+            await etag.check_version(session, database.Team, id, expected)
+            return None
+
+        team_updated = await writes.coordinator.run(session, write)
+        if team_updated:
+            response.headers[etag.ETAG_HEADER] = etag.entity_etag(team_updated)
+            return team_updated
+    except etag.PreconditionFailed as e:
+        raise HTTPException(status_code=412, detail=f"Error: {e}")
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error: {e}")
     raise HTTPException(status_code=404, detail="Item not found")
 
 
-@router.delete("/team/{id}", response_model=dict[str, int | str])
-async def delete_team(id: int, session: SessionDep) -> dict[str, int | str]:
+@router.delete("/team/{id}", response_model=dict[str, uuid.UUID | str])
+async def delete_team(id: uuid.UUID, session: SessionDep) -> dict[str, uuid.UUID | str]:
     """This endpoint deletes a team's metadata.
 
     Args:
-        id (int): The ID of the team to delete.
+        id (UUID): The ID of the team to delete.
         session (SessionDep): The database session.
     """
     try:
         async with session.begin():
             result = await session.execute(
-                select(database.Team).where(database.Team.id == id)
+                delete(database.Team)
+                .where(database.Team.id == id)
+                .returning(database.Team)
+                .execution_options(synchronize_session=False)
             )
             team: database.Team | None = result.scalars().one_or_none()
 
             if team:
-                await session.delete(team)
-                await session.flush()
+                await session.execute(
+                    delete(database.Team_Members).where(
+                        database.Team_Members.team_id == id
+                    )
+                )
+                cache.entities.invalidate_on_commit(session, database.Team, id)
                 return {"id": id, "name": team.name, "status": "deleted"}
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error: {e}")
     raise HTTPException(status_code=404, detail="Item not found")
+
+
+@router.get("/teams/{id}/members", response_model=Sequence[database.User | None])
+async def get_team_members(
+    session: SessionDep,
+    response: Response,
+    id: uuid.UUID,
+    limit: int = 10,
+    cursor: str | None = None,
+) -> Sequence[database.User | None]:
+    """This endpoint gets the users in a team, ordered by user ID.
+
+    Pages are read from the team_members primary key (team_id, user_id), so a
+    page costs the same however large the team is.
+
+    Args:
+        session (SessionDep): The database session.
+        response (Response): The response, used to return the next page cursor.
+        id (UUID): The ID of the team.
+        limit (int, optional): The maximum number of records to return. Defaults to 10.
+        cursor (str | None, optional): The cursor from the previous page.
+            Defaults to None.
+    """
+    try:
+        async with session.begin():
+            result = await session.execute(
+                pagination.paginate(
+                    select(database.User)
+                    .join(
+                        database.Team_Members,
+                        database.Team_Members.user_id == database.User.id,
+                    )
+                    .where(database.Team_Members.team_id == id),
+                    database.User,
+                    limit=limit,
+                    cursor=cursor,
+                    id_column=database.Team_Members.user_id,
+                )
+            )
+            users: Sequence[database.User] = result.scalars().all()
+            pagination.set_next_cursor(response, users, limit, "id")
+
+            return serialization.json_response(users, list[database.User], response)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error: {e}")
+
+
+@router.get("/teams/{id}/members/{user_id}", response_model=database.Team_Members)
+async def get_team_member(
+    session: SessionDep, id: uuid.UUID, user_id: uuid.UUID
+) -> database.Team_Members:
+    """This endpoint checks a user is a member of a team.
+
+    Args:
+        session (SessionDep): The database session.
+        id (UUID): The ID of the team.
+        user_id (UUID): The ID of the user.
+    """
+    try:
+        async with session.begin():
+            result = await session.execute(
+                select(database.Team_Members).where(
+                    database.Team_Members.team_id == id,
+                    database.Team_Members.user_id == user_id,
+                )
+            )
+            member: database.Team_Members | None = result.scalars().one_or_none()
+
+            if member:
+                return member
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error: {e}")
+    raise HTTPException(status_code=404, detail="Item not found")
+
+
+@router.post("/teams/{id}/members", response_model=api.MembershipChange)
+async def add_team_members(
+    session: SessionDep, id: uuid.UUID, members: put.RequestTeamMembers
+) -> api.MembershipChange:
+    """This endpoint adds users to a team in a single statement.
+
+    Users that do not exist or are already members are skipped.
+
+    Args:
+        session (SessionDep): The database session.
+        id (UUID): The ID of the team.
+        members (RequestTeamMembers): The users to add.
+    """
+    try:
+        async with session.begin():
+            team = await session.execute(
+                select(database.Team.id).where(database.Team.id == id)
+            )
+            if team.scalar_one_or_none() is not None:
+                result = await session.execute(
+                    insert(database.Team_Members)
+                    .prefix_with("OR IGNORE")
+                    .from_select(
+                        ["team_id", "user_id"],
+                        select(
+                            literal(id, database.Team_Members.team_id.type),
+                            database.User.id,
+                        ).where(database.User.id.in_(members.user_ids)),
+                    )
+                    .returning(database.Team_Members.user_id)
+                )
+                return api.MembershipChange(
+                    team_id=id, user_ids=sorted(result.scalars().all())
+                )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error: {e}")
+    raise HTTPException(status_code=404, detail="Item not found")
+
+
+@router.post("/teams/{id}/members:remove", response_model=api.MembershipChange)
+async def remove_team_members(
+    session: SessionDep, id: uuid.UUID, members: put.RequestTeamMembers
+) -> api.MembershipChange:
+    """This endpoint removes users from a team in a single statement.
+
+    Args:
+        session (SessionDep): The database session.
+        id (UUID): The ID of the team.
+        members (RequestTeamMembers): The users to remove.
+    """
+    try:
+        async with session.begin():
+            result = await session.execute(
+                delete(database.Team_Members)
+                .where(
+                    database.Team_Members.team_id == id,
+                    database.Team_Members.user_id.in_(members.user_ids),
+                )
+                .returning(database.Team_Members.user_id)
+            )
+            return api.MembershipChange(
+                team_id=id, user_ids=sorted(result.scalars().all())
+            )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error: {e}")
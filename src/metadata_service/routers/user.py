@@ -1,57 +1,185 @@
 """This module contains the FastAPI router for user-related endpoints."""
-# TODO: Add a functions to add users to a team, remove users from a team and list users in a team
 
-from fastapi import APIRouter, HTTPException
+import uuid
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from collections.abc import Sequence
-from sqlmodel import select
-from metadata_service.models import database, put
+from typing import Annotated, Any
+from sqlmodel import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from metadata_service.models import database, put, response as api
 from metadata_service.db import SessionDep
+from metadata_service import (
+    batch,
+    cache,
+    etag,
+    filters,
+    includes,
+    lookup,
+    pagination,
+    search,
+    serialization,
+    writes,
+)
 
 router = APIRouter()
 
 
-@router.get("/users", response_model=Sequence[database.User | None])
+@router.get(
+    "/users",
+    response_model=Sequence[api.UserDetail],
+    response_model_exclude_none=True,
+)
 async def get_users(
     session: SessionDep,
+    response: Response,
+    where: Annotated[filters.UserFilters, Depends()],
     skip: int = 0,
     limit: int = 10,
-) -> Sequence[database.User | None]:
+    cursor: str | None = None,
+    sort: pagination.SortField = "id",
+    include: str | None = None,
+    if_none_match: str | None = Header(default=None),
+) -> Sequence[api.UserDetail]:
     """This endpoint gets users metadata.
 
     Args:
         session (SessionDep): The database session.
+        response (Response): The response, used to return the next page cursor.
+        where (UserFilters): Filters on company_id and name_prefix, only
+            matching users are listed.
         skip (int, optional): The number of records to skip. Defaults to 0.
         limit (int, optional): The maximum number of records to return. Defaults to 10.
+        cursor (str | None, optional): The cursor from the previous page.
+            When given, skip is ignored. Defaults to None.
+        sort (SortField, optional): The field to sort and page by, prefixed with
+            ``-`` to sort descending. Defaults to "id".
+        include (str | None, optional): Comma separated related data to embed
+            in each user, any of teams, company. Defaults to None.
+        if_none_match (str | None, optional): The ETag of the page the client
+            has, answered with 304 when unchanged. Skipped with includes.
+            Defaults to None.
     """
     try:
+        related = includes.parse(include, includes.USER_INCLUDES)
         async with session.begin():
             result = await session.execute(
-                select(database.User).offset(skip).limit(limit)
+                pagination.paginate(
+                    where.apply(
+                        select(database.User).options(
+                            *includes.load_options(database.User, related)
+                        ),
+                        database.User,
+                    ),
+                    database.User,
+                    skip=skip,
+                    limit=limit,
+                    cursor=cursor,
+                    sort=sort,
+                )
             )
-            response: Sequence[database.User] = result.scalars().all()
+            users: Sequence[database.User] = result.scalars().all()
+            pagination.set_next_cursor(response, users, limit, sort)
+            if not related:
+                not_modified = etag.check_page(response, users, if_none_match)
+                if not_modified:
+                    return not_modified
+                return serialization.json_response(users, list[database.User], response)
+            return serialization.json_response(
+                [includes.embed(user, api.UserDetail, related) for user in users],
+                list[api.UserDetail],
+                response,
+                exclude_none=True,
+            )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error: {e}")
 
-            return response
+
+@router.get("/users/search", response_model=Sequence[database.User])
+async def search_users(
+    session: SessionDep,
+    response: Response,
+    q: str,
+    limit: int = 10,
+    cursor: str | None = None,
+) -> Sequence[database.User]:
+    """This endpoint searches users by the words in their name and email.
+
+    Every word must match, a trailing ``*`` matches words starting with it.
+    Results are ordered by relevance and paged with the X-Next-Cursor header.
+
+    Args:
+        session (SessionDep): The database session.
+        response (Response): The response, used to return the next page cursor.
+        q (str): The words to search for.
+        limit (int, optional): The maximum number of records to return. Defaults to 10.
+        cursor (str | None, optional): The cursor from the previous page.
+            Defaults to None.
+    """
+    try:
+        async with session.begin():
+            result = await session.execute(
+                search.search_statement(database.User, q, limit=limit, cursor=cursor)
+            )
+            rows = result.all()
+            search.set_next_cursor(response, rows, limit)
+
+            return serialization.json_response(
+                [user for user, _ in rows], list[database.User], response
+            )
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error: {e}")
 
 
-@router.get("/users/{id}", response_model=database.User | None)
-async def get_user(session: SessionDep, id: int) -> database.User | None:
+@router.get(
+    "/users/{id}",
+    response_model=api.UserDetail,
+    response_model_exclude_none=True,
+)
+async def get_user(
+    session: SessionDep,
+    response: Response,
+    id: uuid.UUID,
+    include: str | None = None,
+    if_none_match: str | None = Header(default=None),
+) -> api.UserDetail:
     """This endpoint gets user metadata.
 
     Args:
         session (SessionDep): The database session.
-        id (int): The ID of the user to retrieve.
+        response (Response): The response, used to return the ETag.
+        id (UUID): The ID of the user to retrieve.
+        include (str | None, optional): Comma separated related data to embed,
+            any of teams, company. Defaults to None.
+        if_none_match (str | None, optional): The ETag of the user the client
+            has, answered with 304 when unchanged. Skipped with includes.
+            Defaults to None.
     """
     try:
+        related = includes.parse(include, includes.USER_INCLUDES)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error: {e}")
+    if not related:
+        cached: database.User | None = cache.entities.get(database.User, id)
+        if cached:
+            not_modified = etag.check_entity(response, cached, if_none_match)
+            return not_modified or includes.embed(cached, api.UserDetail, related)
+    try:
+        token = cache.entities.token()
         async with session.begin():
             result = await session.execute(
-                select(database.User).where(database.User.id == id)
+                select(database.User)
+                .where(database.User.id == id)
+                .options(*includes.load_options(database.User, related))
             )
             user: database.User | None = result.scalars().one_or_none()
 
             if user:
-                return user
+                if not related:
+                    cache.entities.put(database.User, id, user, token)
+                    not_modified = etag.check_entity(response, user, if_none_match)
+                    if not_modified:
+                        return not_modified
+                return includes.embed(user, api.UserDetail, related)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error: {e}")
     raise HTTPException(status_code=404, detail="Item not found")
@@ -66,65 +194,214 @@ async def create_user(session: SessionDep, user: database.User) -> database.User
         user (User): The user to create.
     """
     try:
-        async with session.begin():
+
+        async def write(session: AsyncSession) -> database.User:
             session.add(user)
             await session.flush()
             await session.refresh(user)
             return user
+
+        return await writes.coordinator.run(session, write)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error: {e}")
+
+
+@router.post("/users:batch", response_model=api.BatchCreateResult)
+async def create_users_batch(
+    session: SessionDep,
+    users: list[dict[str, Any]],
+    mode: batch.BatchMode = "atomic",
+) -> api.BatchCreateResult:
+    """This endpoint creates many users in a single transaction.
+
+    Args:
+        session (SessionDep): The database session.
+        users (list[dict]): The users to create.
+        mode (BatchMode, optional): "atomic" creates every user or none,
+            "partial" creates the valid users and reports the rest.
+            Defaults to "atomic".
+    """
+    try:
+        async with session.begin():
+            return await batch.create_many(session, database.User, users, mode)
+    except batch.BatchRejected as e:
+        raise HTTPException(
+            status_code=400, detail=[error.model_dump() for error in e.errors]
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error: {e}")
+
+
+@router.get("/users:lookup", response_model=api.LookupResult[database.User])
+async def lookup_users(
+    session: SessionDep, ids: str
+) -> api.LookupResult[database.User]:
+    """This endpoint gets many users by ID in one request.
+
+    Args:
+        session (SessionDep): The database session.
+        ids (str): Comma separated IDs of the users to get.
+    """
+    try:
+        async with session.begin():
+            result = await lookup.get_many(
+                session, database.User, lookup.parse_ids(ids)
+            )
+            return serialization.json_response(result, api.LookupResult[database.User])
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error: {e}")
+
+
+@router.post("/users:lookup", response_model=api.LookupResult[database.User])
+async def lookup_users_by_body(
+    session: SessionDep, request: put.RequestLookup
+) -> api.LookupResult[database.User]:
+    """This endpoint gets many users by ID, for lists too long for a URL.
+
+    Args:
+        session (SessionDep): The database session.
+        request (RequestLookup): The IDs of the users to get.
+    """
+    try:
+        async with session.begin():
+            result = await lookup.get_many(session, database.User, request.ids)
+            return serialization.json_response(result, api.LookupResult[database.User])
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error: {e}")
 
 
 @router.put("/user/{id}", response_model=database.User | None)
 async def update_user(
-    id: int, user: put.RequestUser, session: SessionDep
+    id: uuid.UUID,
+    user: put.RequestUser,
+    session: SessionDep,
+    response: Response,
+    if_match: str | None = Header(default=None),
 ) -> database.User | None:
     """This endpoint updates user metadata.
 
+    The update is a single UPDATE ... RETURNING statement, empty fields keep
+    their current value. Every update increments the row's version, and an
+    If-Match header makes the update conditional on the version it names,
+    answering 412 when another write got there first.
+
     Args:
-        id (int): The ID of the user to update.
+        id (UUID): The ID of the user to update.
         user (User): The user to update.
         session (SessionDep): The database session.
+        response (Response): The response, used to set the ETag header.
+        if_match (str | None, optional): The ETag the client last read, the
+            update only applies to that version. Defaults to None.
     """
+    values = {
+        name: value for name, value in user.model_dump(exclude={"id"}).items() if value
+    }
     try:
-        async with session.begin():
-            result = await session.execute(
-                select(database.User).where(database.User.id == id)
-            )
-            user_to_update: database.User | None = result.scalars().one_or_none()
-            if user_to_update:
-                user_to_update.name = user.name or user_to_update.name
-                user_to_update.email = user.email or user_to_update.email
-                user_to_update.company_id = user.company_id or user_to_update.company_id
-
-                session.add(user_to_update)
-                await session.flush()
-                await session.refresh(user_to_update)
-                return user_to_update
+        expected = etag.expected_version(if_match)
+        conditions = [database.User.id == id]
+        if expected is not None:
+            conditions.append(database.User.version == expected)
+        statement = (
+            update(database.User)
+            .where(*conditions)
+            .values({**values, "version": database.User.version + 1})
+            .returning(database.User)
+            .execution_options(synchronize_session=False)
+            if values
+            else select(database.User).where(*conditions)
+        )
+
+        async def write(session: AsyncSession) -> database.User | None:
+            result = await session.execute(statement)
+            user_updated: database.User | None = result.scalars().one_or_none()
+            if user_updated:
+                cache.entities.invalidate_on_commit(session, database.User, id)
+                return user_updated
+            await etag.check_version(session, database.User, id, expected)
+            return None
+
+        user_updated = await writes.coordinator.run(session, write)
+        if user_updated:
+            response.headers[etag.ETAG_HEADER] = etag.entity_etag(user_updated)
+            return user_updated
+    except etag.PreconditionFailed as e:
+        raise HTTPException(status_code=412, detail=f"Error: {e}")
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error: {e}")
     raise HTTPException(status_code=404, detail="Item not found")
 
 
-@router.delete("/user/{id}", response_model=dict[str, int | str])
-async def delete_user(id: int, session: SessionDep) -> dict[str, int | str]:
+@router.delete("/user/{id}", response_model=dict[str, uuid.UUID | str])
+async def delete_user(id: uuid.UUID, session: SessionDep) -> dict[str, uuid.UUID | str]:
     """This endpoint deletes user metadata.
 
     Args:
-        id (int): The ID of the user to delete.
+        id (UUID): The ID of the user to delete.
         session (SessionDep): The database session.
     """
     try:
         async with session.begin():
             result = await session.execute(
-                select(database.User).where(database.User.id == id)
+                delete(database.User)
+                .where(database.User.id == id)
+                .returning(database.User)
+                .execution_options(synchronize_session=False)
             )
             user: database.User | None = result.scalars().one_or_none()
 
             if user:
-                await session.delete(user)
-                await session.flush()
+                await session.execute(
+                    delete(database.Team_Members).where(
+                        database.Team_Members.user_id == id
+                    )
+                )
+                cache.entities.invalidate_on_commit(session, database.User, id)
                 return {"id": id, "name": user.name, "status": "deleted"}
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error: {e}")
     raise HTTPException(status_code=404, detail="Item not found")
+
+
+@router.get("/users/{id}/teams", response_model=Sequence[database.Team | None])
+async def get_user_teams(
+    session: SessionDep,
+    response: Response,
+    id: uuid.UUID,
+    limit: int = 10,
+    cursor: str | None = None,
+) -> Sequence[database.Team | None]:
+    """This endpoint gets the teams a user is a member of, ordered by team ID.
+
+    Pages are read from the ix_team_members_user_id (user_id, team_id) index, so
+    a page costs the same however many teams the user is in.
+
+    Args:
+        session (SessionDep): The database session.
+        response (Response): The response, used to return the next page cursor.
+        id (UUID): The ID of the user.
+        limit (int, optional): The maximum number of records to return. Defaults to 10.
+        cursor (str | None, optional): The cursor from the previous page.
+            Defaults to None.
+    """
+    try:
+        async with session.begin():
+            result = await session.execute(
+                pagination.paginate(
+                    select(database.Team)
+                    .join(
+                        database.Team_Members,
+                        database.Team_Members.team_id == database.Team.id,
+                    )
+                    .where(database.Team_Members.user_id == id),
+                    database.Team,
+                    limit=limit,
+                    cursor=cursor,
+                    id_column=database.Team_Members.team_id,
+                )
+            )
+            teams: Sequence[database.Team] = result.scalars().all()
+            pagination.set_next_cursor(response, teams, limit, "id")
+
+            return serialization.json_response(teams, list[database.Team], response)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error: {e}")
@@ -0,0 +1,106 @@
+"""Full-text search support shared by the entity routers.
+
+Each searchable table has an FTS5 index, ``<table>_search``, declared next to
+the models and kept current by triggers. A search joins the matching index
+rows back to the table by rowid and orders them by BM25 relevance, with name
+matches weighted above the other columns. Pages are cut with a keyset cursor
+on ``(score, id)`` like the list endpoints rather than an offset. Every page
+still scores and sorts every match, so a word most rows contain costs about
+1.9 s on 1M resources for any page, the first included.
+"""
+
+from collections.abc import Sequence
+from typing import Any
+
+from fastapi import Response
+from sqlalchemy import Row, Select, column, func, literal_column, table, tuple_
+from sqlmodel import SQLModel, select
+
+from metadata_service import pagination
+from metadata_service.models.database import SEARCH_COLUMNS
+
+SEARCH_SORT = "score"
+"""The ordering name search cursors are issued for."""
+
+NAME_WEIGHT = 5.0
+"""How much more a match in the name counts than one in another column."""
+
+MAX_QUERY_TERMS = 16
+"""The most words a search query may contain."""
+
+
+def match_expression(q: str) -> str:
+    """Turn a user's query into an FTS5 query that matches every word.
+
+    Words are quoted so FTS5 operators and punctuation are searched for
+    rather than interpreted, and a trailing ``*`` keeps its prefix meaning.
+
+    Args:
+        q (str): The words to search for.
+
+    Raises:
+        ValueError: If the query has no words or too many.
+    """
+    terms = []
+    for word in q.split():
+        prefix = word.endswith("*")
+        word = word.rstrip("*")
+        if word:
+            terms.append('"' + word.replace('"', '""') + '"' + ("*" if prefix else ""))
+    if not terms:
+        raise ValueError("Search query must contain a word")
+    if len(terms) > MAX_QUERY_TERMS:
+        raise ValueError(f"Search query can contain at most {MAX_QUERY_TERMS} words")
+    return " ".join(terms)
+
+
+def search_statement(
+    model: type[SQLModel], q: str, *, limit: int = 10, cursor: str | None = None
+) -> Select[Any]:
+    """Build the select of a page of entities matching a query, best first.
+
+    Each row of the result is the entity and its score, lower is better.
+
+    Args:
+        model (type[SQLModel]): The database model to search.
+        q (str): The words to search for.
+        limit (int, optional): The maximum number of rows. Defaults to 10.
+        cursor (str | None, optional): The previous page cursor. Defaults to None.
+
+    Raises:
+        ValueError: If the model has no search index or the query is invalid.
+    """
+    name = model.__tablename__
+    if name not in SEARCH_COLUMNS:
+        raise ValueError(f"{name} has no search index")
+    index = table(f"{name}_search", column("rowid"))
+    index_name = literal_column(index.name)
+    weights = [NAME_WEIGHT if c == "name" else 1.0 for c in SEARCH_COLUMNS[name]]
+    score = func.bm25(index_name, *weights)
+
+    statement = (
+        select(model, score.label(SEARCH_SORT))
+        .join(index, index.c.rowid == literal_column(f"{name}.rowid"))
+        .where(index_name.op("MATCH")(match_expression(q)))
+    )
+    if cursor is not None:
+        key = pagination.decode_key(cursor, SEARCH_SORT, 2)
+        statement = statement.where(
+            tuple_(score, model.id) > pagination.typed_key([score, model.id], key)
+        )
+    return statement.order_by(score, model.id).limit(limit)
+
+
+def set_next_cursor(response: Response, rows: Sequence[Row[Any]], limit: int):
+    """Set the next page cursor header when a page of search results is full.
+
+    Args:
+        response (Response): The response to add the header to.
+        rows (Sequence[Row]): The entity and score rows of the current page.
+        limit (int): The page size that was requested.
+    """
+    if rows and len(rows) >= limit:
+        entity, score = rows[-1]
+        response.headers[pagination.NEXT_CURSOR_HEADER] = pagination.encode_key(
+            SEARCH_SORT, [score, str(entity.id)]
+        )
@@ -0,0 +1,70 @@
+"""Lean JSON responses for the endpoints that return many rows.
+
+Returning rows to FastAPI validates every one of them against the route's
+``response_model`` and then encodes the copies with ``jsonable_encoder``,
+which costs more than reading the rows did on a large page. The rows are
+already instances of the response models, so the collection endpoints
+serialize them straight to JSON bytes with pydantic-core's serializer and
+return the bytes. The ``response_model`` stays on the route for the OpenAPI
+schema, and the output is the same JSON the default path produces.
+"""
+
+import functools
+from collections.abc import Sequence
+from typing import Any
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from sqlmodel import SQLModel
+
+JSON_MEDIA_TYPE = "application/json"
+
+_SKIPPED_HEADERS = (b"content-length", b"content-type")
+
+
+@functools.cache
+def adapter(type_: Any) -> TypeAdapter[Any]:
+    """Get the cached type adapter serializing values of a type.
+
+    Args:
+        type_ (Any): The type of the values, such as ``list[database.Team]``.
+    """
+    return TypeAdapter(type_)
+
+
+def json_response(
+    value: Any,
+    type_: Any,
+    response: Response | None = None,
+    *,
+    exclude_none: bool = False,
+) -> Response:
+    """Serialize a value to a JSON response without validating it.
+
+    Args:
+        value (Any): The value to return, an instance of ``type_``.
+        type_ (Any): The type to serialize the value as.
+        response (Response | None, optional): The route's response, whose
+            headers such as the next page cursor are carried over. Defaults to
+            None.
+        exclude_none (bool, optional): Leave out fields that are None, like
+            ``response_model_exclude_none``. Defaults to False.
+    """
+    content = adapter(type_).dump_json(value, exclude_none=exclude_none)
+    lean = Response(content, media_type=JSON_MEDIA_TYPE)
+    if response is not None:
+        lean.raw_headers.extend(
+            (name, header)
+            for name, header in response.raw_headers
+            if name not in _SKIPPED_HEADERS
+        )
+    return lean
+
+
+def ndjson(rows: Sequence[SQLModel]) -> bytes:
+    """Serialize rows as newline delimited JSON.
+
+    Args:
+        rows (Sequence[SQLModel]): The rows to serialize, one per line.
+    """
+    return b"".join(row.__pydantic_serializer__.to_json(row) + b"\n" for row in rows)
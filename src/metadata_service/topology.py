@@ -0,0 +1,372 @@
+"""An in-memory graph of each company's teams, members, users and resources.
+
+Answering "what does this company look like" from the tables takes a list call
+per team for members and resources. The graph holds every company, team,
+user and resource, and who belongs to which, in process, so the topology
+endpoint answers from memory in one request.
+
+The graph is built when a topology is first asked for, remembering the change
+log's sequence number before reading the tables. It then catches up from the
+change log, re-reading the rows that changed since, which picks up writes from
+every endpoint, import or tool. A topology is never served from a graph that caught
+up longer than the configured staleness bound ago; a request finding it older
+catches it up first. Nodes are slotted dataclasses holding only the public
+fields, a fifth of the memory of model instances.
+"""
+
+import asyncio
+import dataclasses
+import logging
+import time
+import uuid
+from collections import defaultdict
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlmodel import SQLModel, select
+
+from metadata_service import changes
+from metadata_service.lookup import LOOKUP_CHUNK_SIZE
+from metadata_service.models import database
+from metadata_service.models import response as api
+
+logger = logging.getLogger(__name__)
+
+LOAD_CHUNK_ROWS = 10_000
+"""Rows fetched from the cursor at a time while building the graph."""
+
+CATCH_UP_PAGE = 10_000
+"""Change log entries read at a time while catching up."""
+
+REFRESH_MIN_SECONDS = 0.1
+"""The shortest interval the background refresh catches the graph up on."""
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class CompanyNode:
+    """A company in the graph."""
+
+    id: uuid.UUID
+    name: str
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class TeamNode:
+    """A team in the graph."""
+
+    id: uuid.UUID
+    name: str
+    company_id: uuid.UUID
+    description: str
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class UserNode:
+    """A user in the graph."""
+
+    id: uuid.UUID
+    name: str
+    email: str
+    company_id: uuid.UUID
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class ResourceNode:
+    """A resource in the graph."""
+
+    id: uuid.UUID
+    name: str
+    type: str
+    lifecycle_status: str
+    description: str
+    owner: uuid.UUID
+
+
+@dataclasses.dataclass(slots=True)
+class TeamTopology:
+    """A team with its members and the resources it owns."""
+
+    id: uuid.UUID
+    name: str
+    company_id: uuid.UUID
+    description: str
+    members: list[UserNode]
+    resources: list[ResourceNode]
+
+
+@dataclasses.dataclass(slots=True)
+class Topology:
+    """A company's teams and users, serialized as ``api.Topology``."""
+
+    company: CompanyNode
+    teams: list[TeamTopology]
+    users: list[UserNode]
+    seq: int
+
+
+NODES: dict[str, tuple[type[SQLModel], type]] = {
+    "company": (database.Company, CompanyNode),
+    "team": (database.Team, TeamNode),
+    "user": (database.User, UserNode),
+    "resource": (database.Resource, ResourceNode),
+}
+"""The database model and node type of each entity, by change log entity name."""
+
+
+def node_columns(entity: str) -> list[Any]:
+    """Get the columns to select to build an entity's nodes.
+
+    Args:
+        entity (str): The change log name of the entity.
+    """
+    model, node = NODES[entity]
+    return [getattr(model, field.name) for field in dataclasses.fields(node)]
+
+
+class TopologyGraph:
+    """Companies, teams, users and resources with the links between them."""
+
+    def __init__(self):
+        """Create an empty graph, built on first use."""
+        self._locks: tuple[asyncio.AbstractEventLoop, asyncio.Lock] | None = None
+        self.clear()
+
+    def clear(self):
+        """Forget every node, so the graph is built again on next use."""
+        self.seq: int | None = None
+        self.synced_at = 0.0
+        self.nodes: dict[str, dict[uuid.UUID, Any]] = {entity: {} for entity in NODES}
+        self.company_teams: defaultdict[uuid.UUID, set[uuid.UUID]] = defaultdict(set)
+        self.company_users: defaultdict[uuid.UUID, set[uuid.UUID]] = defaultdict(set)
+        self.team_members: defaultdict[uuid.UUID, set[uuid.UUID]] = defaultdict(set)
+        self.team_resources: defaultdict[uuid.UUID, set[uuid.UUID]] = defaultdict(set)
+
+    def _lock(self) -> asyncio.Lock:
+        """Get the lock serializing builds and catch-ups on the running loop."""
+        loop = asyncio.get_running_loop()
+        if self._locks is None or self._locks[0] is not loop:
+            self._locks = (loop, asyncio.Lock())
+        return self._locks[1]
+
+    def age(self) -> float:
+        """Get the seconds since the graph last caught up with the change log."""
+        return time.monotonic() - self.synced_at
+
+    def stats(self) -> api.TopologyStats:
+        """Get the graph's size and how far it has caught up."""
+        return api.TopologyStats(
+            seq=self.seq or 0,
+            age_seconds=self.age() if self.seq is not None else 0.0,
+            **{f"{entity}_count": len(nodes) for entity, nodes in self.nodes.items()},
+        )
+
+    async def refresh(
+        self, sessionmaker: async_sessionmaker[AsyncSession], max_staleness: float
+    ):
+        """Build the graph, or catch it up if it is older than the bound.
+
+        Args:
+            sessionmaker (async_sessionmaker): The factory for the reads' sessions.
+            max_staleness (float): The oldest, in seconds, the graph may be.
+        """
+        async with self._lock():
+            if self.seq is None:
+                await self._build(sessionmaker)
+            elif self.age() > max_staleness:
+                await self._catch_up(sessionmaker)
+
+    async def rebuild(self, sessionmaker: async_sessionmaker[AsyncSession]):
+        """Build the graph again from the tables.
+
+        Args:
+            sessionmaker (async_sessionmaker): The factory for the reads' sessions.
+        """
+        async with self._lock():
+            await self._build(sessionmaker)
+
+    async def keep_fresh(
+        self, sessionmaker: async_sessionmaker[AsyncSession], max_staleness: float
+    ):
+        """Keep catching the graph up once it is built, until cancelled.
+
+        Requests then rarely find the graph too old to serve. A worker that
+        never serves a topology never builds the graph, and only checks
+        whether it has.
+
+        Args:
+            sessionmaker (async_sessionmaker): The factory for the reads' sessions.
+            max_staleness (float): The oldest, in seconds, the graph may be.
+        """
+        while True:
+            try:
+                if self.seq is not None:
+                    await self.refresh(sessionmaker, max_staleness / 2)
+            except Exception:
+                logger.exception("Topology refresh failed")
+            await asyncio.sleep(max(max_staleness / 2, REFRESH_MIN_SECONDS))
+
+    def topology(self, company_id: uuid.UUID) -> Topology | None:
+        """Get a company's teams, with members and resources, and its users.
+
+        Args:
+            company_id (UUID): The ID of the company.
+        """
+        company = self.nodes["company"].get(company_id)
+        if company is None:
+            return None
+        teams, users, resources = (
+            self.nodes["team"],
+            self.nodes["user"],
+            self.nodes["resource"],
+        )
+        return Topology(
+            company=company,
+            teams=[
+                TeamTopology(
+                    id=team.id,
+                    name=team.name,
+                    company_id=team.company_id,
+                    description=team.description,
+                    members=[
+                        users[id]
+                        for id in sorted(self.team_members.get(team.id, ()))
+                        if id in users
+                    ],
+                    resources=[
+                        resources[id]
+                        for id in sorted(self.team_resources.get(team.id, ()))
+                    ],
+                )
+                for team in (
+                    teams[id] for id in sorted(self.company_teams.get(company_id, ()))
+                )
+            ],
+            users=[users[id] for id in sorted(self.company_users.get(company_id, ()))],
+            seq=self.seq or 0,
+        )
+
+    async def _build(self, sessionmaker: async_sessionmaker[AsyncSession]):
+        """Load every node and link from the tables.
+
+        The tables are read one after another rather than from one snapshot.
+        The change log's position is read first, so a row written while they
+        are read is logged after it and re-read by the next catch-up.
+        """
+        self.clear()
+        async with sessionmaker() as session, session.begin():
+            seq = await changes.last_seq(session)
+            for entity in NODES:
+                result = await session.stream(
+                    select(*node_columns(entity)).execution_options(
+                        yield_per=LOAD_CHUNK_ROWS
+                    )
+                )
+                _, node = NODES[entity]
+                async for rows in result.partitions():
+                    for row in rows:
+                        self._put(entity, node(*row))
+            result = await session.stream(
+                select(
+                    database.Team_Members.team_id, database.Team_Members.user_id
+                ).execution_options(yield_per=LOAD_CHUNK_ROWS)
+            )
+            async for rows in result.partitions():
+                for team_id, user_id in rows:
+                    self.team_members[team_id].add(user_id)
+        self.seq = seq
+        self.synced_at = time.monotonic()
+
+    async def _catch_up(self, sessionmaker: async_sessionmaker[AsyncSession]):
+        """Re-read the rows named by the change log since the graph's position.
+
+        Rows are read in the transaction that read the log, so the graph ends
+        up at least as new as the last entry applied. Changes that were
+        compacted away make the graph build again.
+        """
+        start = time.monotonic()
+        touched: defaultdict[str, set[uuid.UUID]] = defaultdict(set)
+        seq = self.seq or 0
+        try:
+            async with sessionmaker() as session, session.begin():
+                while True:
+                    page = await changes.read(session, seq, CATCH_UP_PAGE)
+                    for change in page:
+                        touched[change.entity].add(change.entity_id)
+                    if page:
+                        seq = page[-1].seq
+                    if len(page) < CATCH_UP_PAGE:
+                        break
+                for entity, ids in touched.items():
+                    await self._reload(session, entity, ids)
+        except changes.ChangesExpired:
+            await self._build(sessionmaker)
+            return
+        self.seq = seq
+        self.synced_at = start
+
+    async def _reload(
+        self, session: AsyncSession, entity: str, ids: Iterable[uuid.UUID]
+    ):
+        """Replace the nodes of changed rows, removing rows that were deleted."""
+        model, node = NODES[entity]
+        ids = list(ids)
+        for chunk in (
+            ids[start : start + LOOKUP_CHUNK_SIZE]
+            for start in range(0, len(ids), LOOKUP_CHUNK_SIZE)
+        ):
+            result = await session.execute(
+                select(*node_columns(entity)).where(model.id.in_(chunk))
+            )
+            found = {row[0]: node(*row) for row in result}
+            for id in chunk:
+                if id in found:
+                    self._put(entity, found[id])
+                else:
+                    self._remove(entity, id)
+            if entity == "team":
+                # Membership changes are logged as updates of the team.
+                for id in chunk:
+                    self.team_members.pop(id, None)
+                result = await session.execute(
+                    select(
+                        database.Team_Members.team_id, database.Team_Members.user_id
+                    ).where(database.Team_Members.team_id.in_(chunk))
+                )
+                for team_id, user_id in result:
+                    self.team_members[team_id].add(user_id)
+
+    def _parents(
+        self, entity: str
+    ) -> tuple[defaultdict[uuid.UUID, set[uuid.UUID]], str] | None:
+        """Get the links from an entity's parent to it, and the parent field."""
+        return {
+            "team": (self.company_teams, "company_id"),
+            "user": (self.company_users, "company_id"),
+            "resource": (self.team_resources, "owner"),
+        }.get(entity)
+
+    def _put(self, entity: str, node: Any):
+        """Add or replace a node, moving it if its parent changed."""
+        parents = self._parents(entity)
+        previous = self.nodes[entity].get(node.id)
+        self.nodes[entity][node.id] = node
+        if parents is not None:
+            links, field = parents
+            if previous is not None:
+                links[getattr(previous, field)].discard(node.id)
+            links[getattr(node, field)].add(node.id)
+
+    def _remove(self, entity: str, id: uuid.UUID):
+        """Remove a node and its link to its parent."""
+        previous = self.nodes[entity].pop(id, None)
+        parents = self._parents(entity)
+        if previous is not None and parents is not None:
+            links, field = parents
+            links[getattr(previous, field)].discard(id)
+        if entity == "team":
+            self.team_members.pop(id, None)
+
+
+graph = TopologyGraph()
+"""The process-wide topology graph."""
@@ -0,0 +1,179 @@
+"""Group commit for concurrent single-row writes.
+
+SQLite has one writer, so concurrent create and update requests each wait for
+the write lock and then pay for their own transaction and commit. With write
+batching enabled, the handlers hand their write to the coordinator instead.
+The first write to arrive opens a batch, writes arriving within the batch
+window (or until the batch is full) join it, and the whole batch is applied in
+one transaction. Each write runs in its own SAVEPOINT, so a write that fails
+only rolls back itself and its caller gets its own error, while the others
+commit together and get their own results. A write's result is taken out of
+the shared session once its savepoint is released, so a later write of the
+same row loads its own copy rather than the instance the earlier caller holds.
+
+Batching is off by default. A caller that disconnects after its write was
+queued does not withdraw the write.
+"""
+
+import asyncio
+import contextlib
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from metadata_service.config import get_settings
+
+type WriteOperation[T] = Callable[[AsyncSession], Awaitable[T]]
+"""A write to apply with the session it is given, returning its result."""
+
+
+@dataclass
+class _Batch:
+    """Writes waiting to be applied together on one engine."""
+
+    engine: AsyncEngine
+    loop: asyncio.AbstractEventLoop
+    writes: list[tuple[WriteOperation[Any], asyncio.Future[Any]]] = field(
+        default_factory=list
+    )
+    full: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+def _detach(session: AsyncSession, result: Any):
+    """Take a write's resulting entity out of the session, if it returned one.
+
+    The identity map holds one instance per row, and an ``UPDATE ... RETURNING``
+    of a row already in it returns that instance without refreshing it.
+    """
+    if inspect(result, raiseerr=False) is not None and result in session:
+        session.expunge(result)
+
+
+class WriteCoordinator:
+    """Collects concurrent writes into shared transactions."""
+
+    def __init__(
+        self, enabled: bool = False, window_seconds: float = 0.0, max_size: int = 100
+    ):
+        """Create a coordinator with no writes pending.
+
+        Args:
+            enabled (bool, optional): Whether to batch writes at all. Defaults
+                to False.
+            window_seconds (float, optional): How long a batch waits for more
+                writes after its first. Defaults to 0.0, which still gathers
+                the writes that arrive while the previous batch commits.
+            max_size (int, optional): The most writes in a batch, a full batch
+                is applied without waiting out the window. Defaults to 100.
+        """
+        self.enabled = enabled
+        self.window_seconds = window_seconds
+        self.max_size = max_size
+        self.batches = 0
+        self.writes = 0
+        self._pending: dict[AsyncEngine, _Batch] = {}
+        self._locks: dict[
+            AsyncEngine, tuple[asyncio.AbstractEventLoop, asyncio.Lock]
+        ] = {}
+        self._sessionmakers: dict[AsyncEngine, async_sessionmaker[AsyncSession]] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def run[T](self, session: AsyncSession, operation: WriteOperation[T]) -> T:
+        """Apply a write, in a shared batch when batching is enabled.
+
+        Without batching the write runs in its own transaction on the given
+        session. With batching it joins a batch on the session's engine.
+
+        Args:
+            session (AsyncSession): The request's session.
+            operation (WriteOperation): The write, which must use the session it
+                is passed rather than the request's.
+
+        Raises:
+            Exception: Whatever the write raised, or the batch's commit error.
+        """
+        if not self.enabled:
+            async with session.begin():
+                return await operation(session)
+        return await self.submit(session.bind, operation)
+
+    async def submit[T](self, engine: AsyncEngine, operation: WriteOperation[T]) -> T:
+        """Add a write to the engine's open batch and wait for its result.
+
+        Args:
+            engine (AsyncEngine): The engine to write with.
+            operation (WriteOperation): The write to apply.
+        """
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[T] = loop.create_future()
+        batch = self._pending.get(engine)
+        if batch is None or batch.loop is not loop or batch.full.is_set():
+            batch = self._pending[engine] = _Batch(engine, loop)
+            task = loop.create_task(self._flush(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        batch.writes.append((operation, future))
+        if len(batch.writes) >= self.max_size:
+            batch.full.set()
+        return await future
+
+    def _lock(self, engine: AsyncEngine) -> asyncio.Lock:
+        """Get the lock serializing an engine's batches on the running loop."""
+        loop = asyncio.get_running_loop()
+        entry = self._locks.get(engine)
+        if entry is None or entry[0] is not loop:
+            entry = self._locks[engine] = (loop, asyncio.Lock())
+        return entry[1]
+
+    async def _flush(self, batch: _Batch):
+        """Wait out a batch's window, then apply it once the last batch is done.
+
+        The batch keeps accepting writes while it waits for the previous one.
+        """
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(batch.full.wait(), self.window_seconds)
+        async with self._lock(batch.engine):
+            if self._pending.get(batch.engine) is batch:
+                del self._pending[batch.engine]
+            await self._apply(batch)
+
+    async def _apply(self, batch: _Batch):
+        """Apply every write of a batch in one transaction and settle its futures."""
+        sessionmaker = self._sessionmakers.get(batch.engine)
+        if sessionmaker is None:
+            sessionmaker = async_sessionmaker(batch.engine, expire_on_commit=False)
+            self._sessionmakers[batch.engine] = sessionmaker
+        outcomes: list[tuple[asyncio.Future[Any], Any, BaseException | None]] = []
+        try:
+            async with sessionmaker() as session, session.begin():
+                for operation, future in batch.writes:
+                    try:
+                        async with session.begin_nested():
+                            result = await operation(session)
+                        _detach(session, result)
+                        outcomes.append((future, result, None))
+                    except Exception as e:
+                        outcomes.append((future, None, e))
+        except Exception as e:
+            outcomes = [(future, None, e) for _, future in batch.writes]
+        self.batches += 1
+        self.writes += len(batch.writes)
+        for future, result, error in outcomes:
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+
+_settings = get_settings()
+coordinator = WriteCoordinator(
+    enabled=_settings.write_batching_enabled,
+    window_seconds=_settings.write_batch_window_ms / 1000,
+    max_size=_settings.write_batch_max_size,
+)
+"""The coordinator the create and update handlers write through."""
@@ -2,6 +2,14 @@
 
 import pytest
 from fastapi import testclient
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.pool import Pool
+from sqlmodel import SQLModel
+
+from metadata_service import cache, topology
+from metadata_service.config import Settings
+from metadata_service.db import build_engine, get_session, get_sessionmaker
 from metadata_service.main import app
 
 
@@ -9,3 +17,72 @@ from metadata_service.main import app
 def client():
     """Create a fixture for the FastAPI test client."""
     return testclient.TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def clear_entity_cache():
+    """Stop entities cached or graphed by one test leaking into the next."""
+    cache.entities.clear()
+    topology.graph.clear()
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    """Create a real SQLite database and point the app's sessions at it.
+
+    Yields a synchronous engine on the same file that tests can use to seed data.
+    """
+    db_path = tmp_path / "metadata.db"
+    sync_engine: Engine = create_engine(f"sqlite:///{db_path}")
+    SQLModel.metadata.create_all(sync_engine)
+
+    # A null pool stops aiosqlite connections leaking between the test client's
+    # loops. The engine is otherwise built as the service builds its own.
+    async_engine = build_engine(
+        Settings(database_url=f"sqlite+aiosqlite:///{db_path}", db_pool_class="null")
+    )
+    sessionmaker = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def session_override():
+        async with sessionmaker() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = session_override
+    app.dependency_overrides[get_sessionmaker] = lambda: sessionmaker
+    yield sync_engine
+    app.dependency_overrides.pop(get_session, None)
+    app.dependency_overrides.pop(get_sessionmaker, None)
+    sync_engine.dispose()
+
+
+@pytest.fixture
+def sql_statements():
+    """Record the SQL statements every engine executes during a test."""
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(Engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def sqlite_trace():
+    """Record the statements SQLite itself runs on the app's connections.
+
+    Unlike ``sql_statements`` this sees the transactions the driver opens and
+    commits, not only the statements SQLAlchemy executes.
+    """
+    statements: list[str] = []
+
+    def trace(dbapi_connection, connection_record):
+        if hasattr(dbapi_connection, "run_async"):
+            dbapi_connection.run_async(
+                lambda connection: connection.set_trace_callback(statements.append)
+            )
+
+    event.listen(Pool, "connect", trace)
+    yield statements
+    event.remove(Pool, "connect", trace)
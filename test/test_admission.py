@@ -0,0 +1,170 @@
+"""Test admission control and load shedding on the write routes."""
+
+import asyncio
+import uuid
+
+import httpx
+import pytest
+from fastapi import testclient
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from metadata_service import admission
+from metadata_service.main import app
+from metadata_service.models import database
+
+COMPANY_ID = str(uuid.UUID(int=1))
+
+
+def seed(engine: Engine):
+    """Seed a company to add teams to."""
+    with Session(engine) as session:
+        session.add(database.Company(id=uuid.UUID(int=1), name="company"))
+        session.commit()
+
+
+def team(i: int) -> dict:
+    """Build the body of a team to create."""
+    return {"name": f"team{i}", "company_id": COMPANY_ID, "description": "x"}
+
+
+async def send(requests: list[tuple[str, str, dict | None]]) -> list[httpx.Response]:
+    """Send requests to the app concurrently."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+        return await asyncio.gather(
+            *(client.request(method, url, json=body) for method, url, body in requests)
+        )
+
+
+def use_controller(monkeypatch, **kwargs) -> admission.AdmissionController:
+    """Admit write requests through a controller configured for the test."""
+    controller = admission.AdmissionController(**kwargs)
+    monkeypatch.setattr(admission, "controller", controller)
+    return controller
+
+
+def test_saturated_route_rejects_with_retry_after(sqlite_db: Engine, monkeypatch):
+    """Test writes beyond the limit and the queue are rejected at once."""
+    seed(sqlite_db)
+    controller = use_controller(
+        monkeypatch, limit=1, max_queue=0, retry_after_seconds=2
+    )
+
+    responses = asyncio.run(send([("POST", "/team", team(i)) for i in range(5)]))
+
+    assert [response.status_code for response in responses] == [200] + [503] * 4
+    rejected = responses[1]
+    assert rejected.headers["Retry-After"] == "2"
+    assert rejected.json() == {"detail": "Service overloaded, retry later"}
+    [stats] = controller.stats()
+    assert (stats.method, stats.route) == ("POST", "/team")
+    assert stats.admitted == 1
+    assert stats.rejected == {"queue_full": 4}
+    assert stats.active == 0
+
+
+def test_queued_writes_are_admitted_in_turn(sqlite_db: Engine, monkeypatch):
+    """Test writes within the queue wait for their turn instead of failing."""
+    seed(sqlite_db)
+    controller = use_controller(monkeypatch, limit=1, max_queue=10)
+
+    responses = asyncio.run(send([("POST", "/team", team(i)) for i in range(5)]))
+
+    assert [response.status_code for response in responses] == [200] * 5
+    [stats] = controller.stats()
+    assert stats.admitted == 5
+    assert stats.queued == 0
+
+
+def test_queued_writes_time_out(sqlite_db: Engine, monkeypatch):
+    """Test writes waiting in line longer than the timeout are rejected."""
+    seed(sqlite_db)
+    controller = use_controller(
+        monkeypatch, limit=1, max_queue=10, queue_timeout_seconds=0.000001
+    )
+
+    responses = asyncio.run(send([("POST", "/team", team(i)) for i in range(3)]))
+
+    assert [response.status_code for response in responses] == [200, 503, 503]
+    assert controller.stats()[0].rejected == {"timeout": 2}
+
+
+def test_reads_and_other_routes_are_not_limited(sqlite_db: Engine, monkeypatch):
+    """Test reads skip the gates and each write route has its own."""
+    seed(sqlite_db)
+    controller = use_controller(monkeypatch, limit=1, max_queue=0)
+
+    responses = asyncio.run(
+        send(
+            [
+                ("GET", "/teams", None),
+                ("GET", "/teams", None),
+                ("POST", "/team", team(1)),
+                (
+                    "POST",
+                    "/user",
+                    {"name": "u", "email": "u@x", "company_id": COMPANY_ID},
+                ),
+            ]
+        )
+    )
+
+    assert [response.status_code for response in responses] == [200] * 4
+    assert sorted(route for _, route in controller.gates) == ["/team", "/user"]
+
+
+def test_lookups_are_not_limited(sqlite_db: Engine, monkeypatch):
+    """Test the read-only POST lookups skip the gates."""
+    seed(sqlite_db)
+    controller = use_controller(monkeypatch, limit=1, max_queue=0)
+
+    responses = asyncio.run(
+        send([("POST", "/companies:lookup", {"ids": [COMPANY_ID]})] * 3)
+    )
+
+    assert [response.status_code for response in responses] == [200] * 3
+    assert controller.gates == {}
+
+
+def test_disabled_controller_admits_everything(sqlite_db: Engine, monkeypatch):
+    """Test writes are not limited when admission control is disabled."""
+    seed(sqlite_db)
+    controller = use_controller(monkeypatch, enabled=False, limit=1, max_queue=0)
+
+    responses = asyncio.run(send([("POST", "/team", team(i)) for i in range(3)]))
+
+    assert [response.status_code for response in responses] == [200] * 3
+    assert controller.gates == {}
+
+
+def test_rejections_in_metrics(
+    client: testclient.TestClient, sqlite_db: Engine, monkeypatch
+):
+    """Test queue depth and rejections are exported per route."""
+    seed(sqlite_db)
+    use_controller(monkeypatch, limit=1, max_queue=0)
+    asyncio.run(send([("POST", "/team", team(i)) for i in range(3)]))
+
+    body = client.get("/metrics").text
+
+    assert 'metadata_admission_queued{method="POST",route="/team"} 0' in body
+    assert 'metadata_admission_admitted_total{method="POST",route="/team"} 1' in body
+    assert (
+        'metadata_admission_rejected_total{method="POST",route="/team",'
+        'reason="queue_full"} 2' in body
+    )
+    assert (
+        'metadata_http_requests_total{method="POST",route="/team",status="503"}' in body
+    )
+    assert client.get("/health/admission").json()[0]["rejected"] == {"queue_full": 2}
+
+
+@pytest.mark.parametrize("method", ["PUT", "DELETE"])
+def test_write_methods_are_gated(method: str, sqlite_db: Engine, monkeypatch):
+    """Test every write method of a route is admitted through a gate."""
+    controller = use_controller(monkeypatch)
+
+    asyncio.run(send([(method, f"/team/{uuid.UUID(int=9)}", None)]))
+
+    assert list(controller.gates) == [(method, "/team/{id}")]
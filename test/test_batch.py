@@ -0,0 +1,162 @@
+"""Test the batch create endpoints."""
+
+import asyncio
+import uuid
+
+from fastapi import testclient
+from sqlalchemy import Engine, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import Session, select
+
+from metadata_service import batch
+from metadata_service.config import Settings
+from metadata_service.db import build_engine
+from metadata_service.models import database, response
+
+COMPANY_ID = uuid.UUID(int=1)
+
+
+def seed_company(engine: Engine):
+    """Seed the company the batch items belong to."""
+    with Session(engine) as session:
+        session.add(database.Company(id=COMPANY_ID, name="company"))
+        session.commit()
+
+
+def count_users(engine: Engine) -> int:
+    """Count the users in the database."""
+    with Session(engine) as session:
+        return session.exec(select(func.count()).select_from(database.User)).one()
+
+
+def test_create_users_batch(client: testclient.TestClient, sqlite_db: Engine):
+    """Test creating a batch of users returns their IDs in order."""
+    seed_company(sqlite_db)
+
+    response = client.post(
+        "/users:batch",
+        json=[
+            {
+                "name": f"user{i}",
+                "email": f"user{i}@fake.com",
+                "company_id": str(COMPANY_ID),
+            }
+            for i in range(5)
+        ],
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["errors"] == []
+    assert len(body["ids"]) == 5
+    assert body["ids"] == sorted(body["ids"])
+    with Session(sqlite_db) as session:
+        assert session.get(database.User, uuid.UUID(body["ids"][2])).name == "user2"
+
+
+def test_create_users_batch_atomic_rejects(
+    client: testclient.TestClient, sqlite_db: Engine
+):
+    """Test an atomic batch with an invalid item creates nothing."""
+    seed_company(sqlite_db)
+
+    response = client.post(
+        "/users:batch",
+        json=[
+            {"name": "user", "email": "user@fake.com", "company_id": str(COMPANY_ID)},
+            {"name": "no email", "company_id": str(COMPANY_ID)},
+        ],
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"][0]["index"] == 1
+    assert count_users(sqlite_db) == 0
+
+
+def test_create_teams_batch_partial(client: testclient.TestClient, sqlite_db: Engine):
+    """Test a partial batch creates the valid items and reports the rest."""
+    seed_company(sqlite_db)
+
+    response = client.post(
+        "/teams:batch",
+        params={"mode": "partial"},
+        json=[
+            {"name": "team1", "company_id": str(COMPANY_ID), "description": "first"},
+            {
+                "name": "team2",
+                "company_id": "not-a-uuid",
+                "description": "invalid company",
+            },
+            {"name": "team3", "company_id": str(COMPANY_ID), "description": "third"},
+        ],
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["ids"][1] is None
+    assert body["ids"][0] < body["ids"][2]
+    assert [error["index"] for error in body["errors"]] == [1]
+
+
+def test_create_resources_batch_partial_database_error(
+    client: testclient.TestClient, sqlite_db: Engine
+):
+    """Test rows rejected by the database are isolated in partial mode."""
+    with sqlite_db.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TRIGGER reject_bad BEFORE INSERT ON resource "
+            "WHEN NEW.name = 'bad' BEGIN SELECT RAISE(ABORT, 'rejected'); END"
+        )
+    resource = {
+        "type": "postgres",
+        "lifecycle_status": "active",
+        "description": "db",
+        "owner": str(COMPANY_ID),
+    }
+
+    response = client.post(
+        "/resources:batch",
+        params={"mode": "partial"},
+        json=[
+            {**resource, "name": "good"},
+            {**resource, "name": "bad"},
+            {**resource, "name": "also good"},
+        ],
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["ids"][1] is None
+    assert body["ids"][0] < body["ids"][2]
+    assert body["errors"] == [{"index": 1, "detail": "rejected"}]
+
+
+def test_partial_batch_rolls_back_with_its_transaction(sqlite_db: Engine):
+    """Test the savepoint of a partial batch does not commit on its own."""
+    seed_company(sqlite_db)
+    engine = build_engine(
+        Settings(
+            database_url=f"sqlite+aiosqlite:///{sqlite_db.url.database}",
+            db_pool_class="null",
+        )
+    )
+    users = [
+        {
+            "name": f"user{i}",
+            "email": f"user{i}@fake.com",
+            "company_id": str(COMPANY_ID),
+        }
+        for i in range(3)
+    ]
+
+    async def create_and_roll_back() -> response.BatchCreateResult:
+        async with AsyncSession(engine) as session, session.begin() as transaction:
+            result = await batch.create_many(session, database.User, users, "partial")
+            await transaction.rollback()
+        await engine.dispose()
+        return result
+
+    result = asyncio.run(create_and_roll_back())
+
+    assert None not in result.ids
+    assert count_users(sqlite_db) == 0
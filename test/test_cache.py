@@ -0,0 +1,185 @@
+"""Test the entity cache and its invalidation by the write endpoints."""
+
+import asyncio
+import uuid
+
+from fastapi import testclient
+from sqlalchemy import Engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import Session
+
+from metadata_service import cache
+from metadata_service.cache import EntityCache
+from metadata_service.models import database
+
+COMPANY_ID = uuid.UUID(int=1)
+TEAM_ID = uuid.UUID(int=2)
+
+
+class FakeClock:
+    """A clock that only moves when told to."""
+
+    def __init__(self):
+        """Start the clock at zero."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Get the current time."""
+        return self.now
+
+
+def test_cache_hit_and_miss():
+    """Test a cached entity is returned and counted as a hit."""
+    cache = EntityCache(max_entries=10, ttl_seconds=30)
+    user = database.User(id=1, name="test", email="test@test.com", company_id=1)
+
+    assert cache.get(database.User, 1) is None
+    cache.put(database.User, 1, user, cache.token())
+
+    assert cache.get(database.User, 1) is user
+    assert cache.get(database.Team, 1) is None
+    stats = cache.stats()
+    assert (stats.hits, stats.misses) == (1, 2)
+
+
+def test_cache_evicts_least_recently_used():
+    """Test the least recently used entity is evicted when the cache is full."""
+    cache = EntityCache(max_entries=2, ttl_seconds=30)
+    for id in (1, 2):
+        cache.put(database.User, id, id, cache.token())
+    cache.get(database.User, 1)
+    cache.put(database.User, 3, 3, cache.token())
+
+    assert cache.get(database.User, 2) is None
+    assert cache.get(database.User, 1) == 1
+    assert cache.stats().evictions == 1
+
+
+def test_cache_expires_entries():
+    """Test entities expire after the TTL."""
+    clock = FakeClock()
+    cache = EntityCache(max_entries=10, ttl_seconds=5, clock=clock)
+    cache.put(database.User, 1, "user", cache.token())
+
+    clock.now = 4.9
+    assert cache.get(database.User, 1) == "user"
+    clock.now = 5.0
+    assert cache.get(database.User, 1) is None
+    assert cache.stats().expirations == 1
+
+
+def test_cache_rejects_reads_older_than_invalidation():
+    """Test a read that started before an invalidation is not cached."""
+    cache = EntityCache(max_entries=10, ttl_seconds=30)
+    token = cache.token()
+    cache.invalidate(database.User, 1)
+
+    cache.put(database.User, 1, "stale", token)
+    cache.put(database.User, 2, "other", token)
+
+    assert cache.get(database.User, 1) is None
+    assert cache.get(database.User, 2) == "other"
+
+
+def test_cache_disabled():
+    """Test a disabled cache never stores entities."""
+    cache = EntityCache(max_entries=10, ttl_seconds=30, enabled=False)
+    cache.put(database.User, 1, "user", cache.token())
+
+    assert cache.get(database.User, 1) is None
+
+
+def test_update_invalidates_cached_team(
+    client: testclient.TestClient, sqlite_db: Engine
+):
+    """Test updating a team stops the cached copy being served."""
+    with Session(sqlite_db) as session:
+        session.add(database.Company(id=COMPANY_ID, name="company"))
+        session.add(
+            database.Team(
+                id=TEAM_ID, name="old", company_id=COMPANY_ID, description="x"
+            )
+        )
+        session.commit()
+
+    assert client.get(f"/teams/{TEAM_ID}").json()["name"] == "old"
+    assert client.put(f"/team/{TEAM_ID}", json={"name": "new"}).status_code == 200
+
+    assert client.get(f"/teams/{TEAM_ID}").json()["name"] == "new"
+
+
+def test_delete_invalidates_cached_team(
+    client: testclient.TestClient, sqlite_db: Engine
+):
+    """Test deleting a team stops the cached copy being served."""
+    with Session(sqlite_db) as session:
+        session.add(database.Company(id=COMPANY_ID, name="company"))
+        session.add(
+            database.Team(
+                id=TEAM_ID, name="old", company_id=COMPANY_ID, description="x"
+            )
+        )
+        session.commit()
+
+    assert client.get(f"/teams/{TEAM_ID}").status_code == 200
+    assert client.delete(f"/team/{TEAM_ID}").status_code == 200
+
+    assert client.get(f"/teams/{TEAM_ID}").status_code == 404
+
+
+def sync(engine: Engine):
+    """Sync the app's entity cache with the change log of a database."""
+
+    async def run():
+        async_engine = create_async_engine(
+            engine.url.set(drivername="sqlite+aiosqlite")
+        )
+        await cache.entities.sync(async_sessionmaker(async_engine))
+        await async_engine.dispose()
+
+    asyncio.run(run())
+
+
+def test_sync_invalidates_writes_from_other_processes(
+    client: testclient.TestClient, sqlite_db: Engine
+):
+    """Test a write that bypassed this process is no longer served after a sync."""
+    with Session(sqlite_db) as session:
+        session.add(database.Company(id=COMPANY_ID, name="company"))
+        session.add(
+            database.Team(
+                id=TEAM_ID, name="old", company_id=COMPANY_ID, description="x"
+            )
+        )
+        session.commit()
+    assert client.get(f"/teams/{TEAM_ID}").json()["name"] == "old"
+    sync(sqlite_db)
+
+    with Session(sqlite_db) as session:
+        session.get(database.Team, TEAM_ID).name = "new"
+        session.commit()
+    assert client.get(f"/teams/{TEAM_ID}").json()["name"] == "old"
+    sync(sqlite_db)
+
+    assert client.get(f"/teams/{TEAM_ID}").json()["name"] == "new"
+
+
+def test_sync_clears_the_cache_when_far_behind(
+    client: testclient.TestClient, sqlite_db: Engine, monkeypatch
+):
+    """Test more changes than a sync page clear the whole cache."""
+    monkeypatch.setattr(cache, "SYNC_PAGE", 2)
+    with Session(sqlite_db) as session:
+        session.add(database.Company(id=COMPANY_ID, name="company"))
+        session.commit()
+    client.get(f"/companies/{COMPANY_ID}")
+    sync(sqlite_db)
+    assert cache.entities.get(database.Company, COMPANY_ID) is not None
+
+    with Session(sqlite_db) as session:
+        for n in (2, 3):
+            session.add(database.Company(id=uuid.UUID(int=n), name=f"company{n}"))
+        session.commit()
+    sync(sqlite_db)
+
+    assert cache.entities.get(database.Company, COMPANY_ID) is None
@@ -0,0 +1,169 @@
+"""Test the change feed records writes and serves them incrementally."""
+
+import asyncio
+import json
+import time
+import uuid
+
+import httpx
+from fastapi import testclient
+from sqlalchemy import Engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import Session
+
+from metadata_service import changes
+from metadata_service.main import app
+from metadata_service.models import database
+
+COMPANY_ID = uuid.UUID(int=1)
+TEAM_ID = uuid.UUID(int=2)
+USER_ID = uuid.UUID(int=3)
+RESOURCE = {
+    "name": "orders",
+    "type": "postgres",
+    "lifecycle_status": "active",
+    "description": "x",
+    "owner": str(TEAM_ID),
+}
+
+
+def seed(engine: Engine):
+    """Seed a company, a team and a user, the first three changes."""
+    with Session(engine) as session:
+        session.add(database.Company(id=COMPANY_ID, name="company"))
+        session.add(
+            database.Team(
+                id=TEAM_ID, name="team", company_id=COMPANY_ID, description="x"
+            )
+        )
+        session.add(
+            database.User(
+                id=USER_ID, name="user", email="u@fake.com", company_id=COMPANY_ID
+            )
+        )
+        session.commit()
+
+
+def summary(page: dict) -> list[tuple]:
+    """Reduce a page of changes to (entity, id, operation, version) tuples."""
+    return [
+        (change["entity"], change["entity_id"], change["operation"], change["version"])
+        for change in page["changes"]
+    ]
+
+
+def test_writes_are_recorded_in_order(client: testclient.TestClient, sqlite_db: Engine):
+    """Test creates, updates, deletes and membership changes are all logged."""
+    seed(sqlite_db)
+    since = client.get("/changes").json()["next_since"]
+
+    created = client.post("/resource", json=RESOURCE).json()
+    client.put(f"/resource/{created['id']}", json={"description": "updated"})
+    client.post(f"/teams/{TEAM_ID}/members", json={"user_ids": [str(USER_ID)]})
+    [batched] = client.post("/resources:batch", json=[RESOURCE]).json()["ids"]
+    client.delete(f"/resource/{created['id']}")
+    page = client.get("/changes", params={"since": since}).json()
+
+    assert since == 3
+    assert summary(page) == [
+        ("resource", created["id"], "create", 1),
+        ("resource", created["id"], "update", 2),
+        ("team", str(TEAM_ID), "update", 1),
+        ("resource", batched, "create", 1),
+        ("resource", created["id"], "delete", 2),
+    ]
+    assert [change["seq"] for change in page["changes"]] == list(range(4, 9))
+    assert page["next_since"] == 8
+
+
+def test_changes_are_paged(client: testclient.TestClient, sqlite_db: Engine):
+    """Test following next_since reads every change exactly once."""
+    seed(sqlite_db)
+
+    seen: list[int] = []
+    page = {"changes": [None], "next_since": 0}
+    while page["changes"]:
+        params = {"since": page["next_since"], "limit": 2}
+        page = client.get("/changes", params=params).json()
+        seen.extend(change["seq"] for change in page["changes"])
+
+    assert seen == [1, 2, 3]
+    assert client.get("/changes", params={"since": 3}).json() == {
+        "changes": [],
+        "next_since": 3,
+    }
+
+
+def test_long_poll_returns_when_a_change_commits(sqlite_db: Engine):
+    """Test a waiting request answers as soon as a write commits."""
+    seed(sqlite_db)
+
+    async def run() -> tuple[httpx.Response, float]:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            start = time.perf_counter()
+            waiting = asyncio.create_task(
+                c.get("/changes", params={"since": 3, "wait": 10})
+            )
+            await asyncio.sleep(0.3)
+            await c.post("/company", json={"name": "new"})
+            return await waiting, time.perf_counter() - start
+
+    response, elapsed = asyncio.run(run())
+
+    assert response.status_code == 200
+    [(entity, _, operation, version)] = summary(response.json())
+    assert (entity, operation, version) == ("company", "create", 1)
+    assert elapsed < 5
+
+
+def test_event_stream_resumes_from_last_event_id(
+    client: testclient.TestClient, sqlite_db: Engine, monkeypatch
+):
+    """Test changes stream as Server-Sent Events after the last event ID."""
+    monkeypatch.setattr(changes, "STREAM_SECONDS", 0.3)
+    seed(sqlite_db)
+
+    response = client.get(
+        "/changes",
+        headers={"Accept": changes.EVENT_STREAM_MEDIA_TYPE, "Last-Event-ID": "1"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [event for event in response.text.split("\n\n") if event]
+    ids = [event.splitlines()[0] for event in events]
+    assert ids == ["id: 2", "id: 3"]
+    data = json.loads(events[0].splitlines()[2].removeprefix("data: "))
+    assert (data["entity"], data["operation"]) == ("team", "create")
+
+
+def test_compaction_bounds_the_log(client: testclient.TestClient, sqlite_db: Engine):
+    """Test compaction drops old and excess entries and stale cursors get 410."""
+    seed(sqlite_db)
+    for i in range(6):
+        client.post("/company", json={"name": f"company{i}"})
+    with sqlite_db.begin() as conn:
+        conn.execute(
+            text(
+                "UPDATE change_log SET changed_at = datetime('now', '-2 days') "
+                "WHERE seq <= 2"
+            )
+        )
+
+    async def compact(retention_seconds: float, max_rows: int) -> int:
+        engine = create_async_engine(sqlite_db.url.set(drivername="sqlite+aiosqlite"))
+        sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+        deleted = await changes.compact(sessionmaker, retention_seconds, max_rows)
+        await engine.dispose()
+        return deleted
+
+    assert asyncio.run(compact(retention_seconds=3600, max_rows=100)) == 2
+    assert client.get("/changes", params={"since": 0}).status_code == 410
+    assert client.get("/changes", params={"since": 2}).status_code == 200
+    assert asyncio.run(compact(retention_seconds=3600, max_rows=3)) == 4
+    page = client.get("/changes", params={"since": 6}).json()
+    assert [change["seq"] for change in page["changes"]] == [7, 8, 9]
+    assert asyncio.run(compact(retention_seconds=1, max_rows=1)) == 2
+    assert client.get("/changes").json()["next_since"] == 9
+    assert client.get("/changes", params={"since": 8}).json()["next_since"] == 9
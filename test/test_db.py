@@ -0,0 +1,149 @@
+"""Test the settings driven database engine."""
+
+import asyncio
+
+import pytest
+from fastapi import testclient
+from pydantic import ValidationError
+from sqlalchemy import create_engine, exc, text
+from sqlmodel import SQLModel
+
+from metadata_service import db
+from metadata_service.config import Settings, get_settings
+from metadata_service.db import build_engine
+from metadata_service.main import app
+
+
+def test_settings_from_env():
+    """Test settings are read from prefixed environment variables."""
+    settings = Settings.from_env(
+        {
+            "METADATA_DATABASE_URL": "sqlite+aiosqlite:///other.db",
+            "METADATA_SQLITE_JOURNAL_MODE": "WAL",
+            "METADATA_CACHE_ENABLED": "false",
+            "UNRELATED": "ignored",
+        }
+    )
+
+    assert settings.database_url == "sqlite+aiosqlite:///other.db"
+    assert settings.sqlite_journal_mode == "wal"
+    assert settings.cache_enabled is False
+    assert settings.sqlite_synchronous == "normal"
+
+
+def test_settings_reject_unknown_pragma_value():
+    """Test PRAGMA values are validated before they reach SQL."""
+    with pytest.raises(ValidationError):
+        Settings.from_env({"METADATA_SQLITE_SYNCHRONOUS": "normal; DROP TABLE user"})
+
+
+def test_engine_applies_pragmas(tmp_path):
+    """Test each new SQLite connection gets the configured PRAGMAs."""
+    settings = Settings(
+        database_url=f"sqlite+aiosqlite:///{tmp_path / 'pragmas.db'}",
+        sqlite_journal_mode="wal",
+        sqlite_synchronous="full",
+        sqlite_cache_size=-2_000,
+        sqlite_temp_store="memory",
+        sqlite_busy_timeout_ms=1_234,
+    )
+
+    async def read_pragmas() -> dict[str, object]:
+        engine = build_engine(settings)
+        async with engine.connect() as conn:
+            values = {
+                name: (await conn.execute(text(f"PRAGMA {name}"))).scalar()
+                for name in (
+                    "journal_mode",
+                    "synchronous",
+                    "cache_size",
+                    "temp_store",
+                    "busy_timeout",
+                )
+            }
+        await engine.dispose()
+        return values
+
+    assert asyncio.run(read_pragmas()) == {
+        "journal_mode": "wal",
+        "synchronous": 2,
+        "cache_size": -2_000,
+        "temp_store": 2,
+        "busy_timeout": 1_234,
+    }
+
+
+def test_pool_sized_and_timed_from_settings(tmp_path):
+    """Test the pool honours its size, overflow and timeout, and counts waits."""
+    settings = Settings(
+        database_url=f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        db_pool_size=1,
+        db_max_overflow=1,
+        db_pool_timeout_seconds=0.05,
+    )
+
+    async def exhaust() -> db.PoolStats:
+        db.start_engine(settings)
+        try:
+            async with db.engine.connect(), db.engine.connect():
+                stats = db.pool_stats()
+                assert (stats.checked_out, stats.overflow) == (2, 1)
+                with pytest.raises(exc.TimeoutError):
+                    async with db.engine.connect():
+                        pass
+            return db.pool_stats()
+        finally:
+            await db.dispose_engine()
+
+    stats = asyncio.run(exhaust())
+
+    assert stats.pool_class == "TimedQueuePool"
+    assert (stats.size, stats.max_overflow) == (1, 1)
+    assert (stats.checked_out, stats.checkouts, stats.timeouts) == (0, 2, 1)
+    assert sum(stats.wait_counts) == 2
+    assert db.engine is None and db.pool_stats() is None
+
+
+def test_null_pool_from_settings(tmp_path):
+    """Test a null pool is built without queue sizing and still counted."""
+    settings = Settings(
+        database_url=f"sqlite+aiosqlite:///{tmp_path / 'null.db'}",
+        db_pool_class="NULL",
+        db_pool_pre_ping=True,
+    )
+
+    async def connect() -> db.PoolStats:
+        engine = db.start_engine(settings)
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            return db.pool_stats()
+        finally:
+            await db.dispose_engine()
+
+    stats = asyncio.run(connect())
+
+    assert (stats.pool_class, stats.size, stats.overflow) == ("TimedNullPool", 0, 0)
+    assert (stats.checked_out, stats.checkouts) == (0, 1)
+
+
+def test_lifespan_starts_and_disposes_the_engine(tmp_path, monkeypatch):
+    """Test the engine exists only while the app runs and reports its pool."""
+    db_path = tmp_path / "lifespan.db"
+    sync_engine = create_engine(f"sqlite:///{db_path}")
+    SQLModel.metadata.create_all(sync_engine)
+    sync_engine.dispose()
+    monkeypatch.setattr(
+        get_settings(), "database_url", f"sqlite+aiosqlite:///{db_path}"
+    )
+
+    with testclient.TestClient(app) as client:
+        assert client.get("/users").status_code == 200
+        stats = client.get("/health/pool").json()
+        body = client.get("/metrics").text
+
+    assert stats["pool_class"] == "TimedQueuePool"
+    assert stats["checkouts"] >= 1
+    assert "metadata_db_pool_checked_out" in body
+    assert "metadata_db_pool_wait_seconds_count" in body
+    assert db.engine is None
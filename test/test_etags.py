@@ -0,0 +1,149 @@
+"""Test entity tags, conditional GETs and conditional updates."""
+
+import uuid
+
+from fastapi import testclient
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from metadata_service import etag
+from metadata_service.models import database
+
+COMPANY_ID = uuid.UUID(int=1)
+TEAM_ID = uuid.UUID(int=2)
+
+
+def seed(engine: Engine, count: int):
+    """Seed a company, a team and resources owned by the team."""
+    with Session(engine) as session:
+        session.add(database.Company(id=COMPANY_ID, name="company"))
+        session.add(
+            database.Team(
+                id=TEAM_ID, name="team", company_id=COMPANY_ID, description="x"
+            )
+        )
+        for i in range(1, count + 1):
+            session.add(
+                database.Resource(
+                    id=uuid.UUID(int=i),
+                    name=f"resource{i}",
+                    type="postgres",
+                    lifecycle_status="active",
+                    description="x",
+                    owner=TEAM_ID,
+                )
+            )
+        session.commit()
+
+
+def test_get_by_id_is_tagged_with_the_version(
+    client: testclient.TestClient, sqlite_db: Engine
+):
+    """Test a by-id response carries its version and honours If-None-Match."""
+    seed(sqlite_db, 1)
+
+    response = client.get(f"/resources/{uuid.UUID(int=1)}")
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == '"1"'
+    assert "version" not in response.json()
+    for header in ('"1"', 'W/"1"', '"7", "1"', "*"):
+        cached = client.get(
+            f"/resources/{uuid.UUID(int=1)}", headers={"If-None-Match": header}
+        )
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["etag"] == '"1"'
+    assert (
+        client.get(
+            f"/resources/{uuid.UUID(int=1)}", headers={"If-None-Match": '"2"'}
+        ).status_code
+        == 200
+    )
+
+
+def test_update_bumps_the_version(client: testclient.TestClient, sqlite_db: Engine):
+    """Test an update changes the entity tag so stale copies are refetched."""
+    seed(sqlite_db, 1)
+
+    response = client.put(
+        f"/resource/{uuid.UUID(int=1)}", json={"description": "changed"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == '"2"'
+    stale = client.get(
+        f"/resources/{uuid.UUID(int=1)}", headers={"If-None-Match": '"1"'}
+    )
+    assert stale.status_code == 200
+    assert stale.json()["description"] == "changed"
+    assert stale.headers["etag"] == '"2"'
+
+
+def test_if_match_guards_updates(client: testclient.TestClient, sqlite_db: Engine):
+    """Test an update only applies to the version named by If-Match."""
+    seed(sqlite_db, 1)
+
+    first = client.put(
+        f"/team/{TEAM_ID}", json={"description": "first"}, headers={"If-Match": '"1"'}
+    )
+    second = client.put(
+        f"/team/{TEAM_ID}", json={"description": "second"}, headers={"If-Match": '"1"'}
+    )
+
+    assert first.status_code == 200
+    assert first.headers["etag"] == '"2"'
+    assert second.status_code == 412
+    assert client.get(f"/teams/{TEAM_ID}").json()["description"] == "first"
+    malformed = client.put(
+        f"/team/{TEAM_ID}", json={"description": "x"}, headers={"If-Match": 'W/"2"'}
+    )
+    assert malformed.status_code == 412
+    missing = client.put(
+        f"/team/{uuid.UUID(int=9)}",
+        json={"description": "x"},
+        headers={"If-Match": '"1"'},
+    )
+    assert missing.status_code == 404
+
+
+def test_pages_are_tagged(client: testclient.TestClient, sqlite_db: Engine):
+    """Test list pages carry an ETag that changes when a row on them does."""
+    seed(sqlite_db, 5)
+
+    response = client.get("/resources", params={"limit": 2})
+    page_etag = response.headers["etag"]
+
+    assert response.status_code == 200
+    cached = client.get(
+        "/resources", params={"limit": 2}, headers={"If-None-Match": page_etag}
+    )
+    assert cached.status_code == 304
+    assert cached.headers["x-next-cursor"] == response.headers["x-next-cursor"]
+    client.put(f"/resource/{uuid.UUID(int=5)}", json={"description": "changed"})
+    assert (
+        client.get(
+            "/resources", params={"limit": 2}, headers={"If-None-Match": page_etag}
+        ).status_code
+        == 304
+    )
+    client.put(f"/resource/{uuid.UUID(int=2)}", json={"description": "changed"})
+    changed = client.get(
+        "/resources", params={"limit": 2}, headers={"If-None-Match": page_etag}
+    )
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != page_etag
+
+
+def test_includes_are_not_tagged(client: testclient.TestClient, sqlite_db: Engine):
+    """Test responses with embedded relations carry no ETag."""
+    seed(sqlite_db, 1)
+
+    response = client.get(
+        f"/teams/{TEAM_ID}",
+        params={"include": "resources"},
+        headers={"If-None-Match": "*"},
+    )
+
+    assert response.status_code == 200
+    assert etag.ETAG_HEADER.lower() not in response.headers
@@ -0,0 +1,110 @@
+"""Test the streaming NDJSON export."""
+
+import asyncio
+import json
+import uuid
+
+from fastapi import testclient
+from sqlalchemy import Engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import Session, select
+
+from metadata_service.models import database
+from metadata_service.routers import export
+
+COMPANY_ID = uuid.UUID(int=1)
+TEAM_IDS = [uuid.UUID(int=2), uuid.UUID(int=3)]
+
+
+def seed(engine: Engine, count: int):
+    """Seed a company, two teams and resources alternating between them."""
+    with Session(engine) as session:
+        session.add(database.Company(id=COMPANY_ID, name="company"))
+        for id, name in zip(TEAM_IDS, ("one", "two")):
+            session.add(
+                database.Team(
+                    id=id, name=name, company_id=COMPANY_ID, description="team"
+                )
+            )
+        for i in range(count):
+            session.add(
+                database.Resource(
+                    id=uuid.UUID(int=i + 1),
+                    name=f"resource-{i:03d}",
+                    type="postgres" if i % 3 else "s3",
+                    lifecycle_status="active",
+                    description="test resource",
+                    owner=TEAM_IDS[i % 2],
+                )
+            )
+        session.commit()
+
+
+def read_ndjson(response) -> list[dict]:
+    """Parse every line of an NDJSON response."""
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_export_streams_every_row(
+    client: testclient.TestClient, sqlite_db: Engine, monkeypatch
+):
+    """Test the export returns every row in id order across several chunks."""
+    monkeypatch.setattr(export, "EXPORT_CHUNK_ROWS", 7)
+    seed(sqlite_db, 50)
+
+    response = client.get("/export/resources")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == export.NDJSON_MEDIA_TYPE
+    rows = read_ndjson(response)
+    assert [uuid.UUID(row["id"]).int for row in rows] == list(range(1, 51))
+    assert rows[0]["name"] == "resource-000"
+
+
+def test_export_filters(client: testclient.TestClient, sqlite_db: Engine):
+    """Test query parameters named after fields filter the export."""
+    seed(sqlite_db, 30)
+
+    response = client.get(
+        "/export/resources", params={"owner": str(TEAM_IDS[1]), "type": "s3"}
+    )
+
+    assert response.status_code == 200
+    rows = read_ndjson(response)
+    assert rows
+    assert all(row["owner"] == str(TEAM_IDS[1]) and row["type"] == "s3" for row in rows)
+    assert len(rows) == 5
+
+
+def test_export_rejects_bad_filters(client: testclient.TestClient, sqlite_db: Engine):
+    """Test unknown filters and values of the wrong type are rejected."""
+    assert client.get("/export/resources", params={"colour": "red"}).status_code == 400
+    assert client.get("/export/resources", params={"owner": "x"}).status_code == 400
+    assert client.get("/export/widgets").status_code == 422
+
+
+def test_export_reads_a_snapshot(sqlite_db: Engine, monkeypatch):
+    """Test writes made while an export streams are not part of it."""
+    monkeypatch.setattr(export, "EXPORT_CHUNK_ROWS", 5)
+    seed(sqlite_db, 20)
+    with sqlite_db.connect() as conn:
+        conn.execute(text("PRAGMA journal_mode=WAL"))
+
+    async def run() -> list[dict]:
+        engine = create_async_engine(sqlite_db.url.set(drivername="sqlite+aiosqlite"))
+        sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+        chunks = export.stream_ndjson(
+            sessionmaker, select(database.Resource).order_by(database.Resource.id)
+        )
+        lines = (await anext(chunks)).splitlines()
+        with Session(sqlite_db) as session:
+            session.delete(session.get(database.Resource, uuid.UUID(int=20)))
+            session.commit()
+        async for chunk in chunks:
+            lines.extend(chunk.splitlines())
+        await engine.dispose()
+        return [json.loads(line) for line in lines]
+
+    rows = asyncio.run(run())
+
+    assert [uuid.UUID(row["id"]).int for row in rows] == list(range(1, 21))
@@ -0,0 +1,135 @@
+"""Test filtering and sorting the list endpoints."""
+
+import uuid
+
+from fastapi import testclient
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from metadata_service import filters
+from metadata_service.models import database
+from metadata_service.pagination import NEXT_CURSOR_HEADER
+
+
+def numbers(rows: list[dict], field: str = "id") -> list[int]:
+    """Read back the numbers the seeded IDs were made from."""
+    return [uuid.UUID(row[field]).int for row in rows]
+
+
+def seed(engine: Engine):
+    """Seed two companies with teams and users, and resources of every kind."""
+    with Session(engine) as session:
+        for c in (1, 2):
+            session.add(database.Company(id=uuid.UUID(int=c), name=f"company{c}"))
+        for t in range(1, 5):
+            session.add(
+                database.Team(
+                    id=uuid.UUID(int=t),
+                    name=f"team{t}",
+                    company_id=uuid.UUID(int=t % 2 + 1),
+                    description="x",
+                )
+            )
+            session.add(
+                database.User(
+                    id=uuid.UUID(int=t),
+                    name=f"user{t}",
+                    email="u@fake.com",
+                    company_id=uuid.UUID(int=t % 2 + 1),
+                )
+            )
+        for i in range(1, 25):
+            session.add(
+                database.Resource(
+                    id=uuid.UUID(int=i),
+                    name=f"{('orders', 'users')[i % 2]}-{i:02d}",
+                    type=("postgres", "s3", "redis")[i % 3],
+                    lifecycle_status=("active", "deprecated")[i % 4 == 0],
+                    description="x",
+                    owner=uuid.UUID(int=i % 4 + 1),
+                )
+            )
+        session.commit()
+
+
+def collect(client: testclient.TestClient, url: str, params: dict) -> list[dict]:
+    """Follow next page cursors and return every row."""
+    rows: list[dict] = []
+    params = {**params, "limit": 2}
+    while True:
+        response = client.get(url, params=params)
+        assert response.status_code == 200
+        rows.extend(response.json())
+        if NEXT_CURSOR_HEADER not in response.headers:
+            return rows
+        params["cursor"] = response.headers[NEXT_CURSOR_HEADER]
+
+
+def test_resource_filters_combine(client: testclient.TestClient, sqlite_db: Engine):
+    """Test every filter given must match, across every page."""
+    seed(sqlite_db)
+    params = {"type": "s3", "lifecycle_status": "active", "owner": uuid.UUID(int=2)}
+
+    rows = collect(client, "/resources", params)
+
+    assert numbers(rows) == [1, 13]
+    assert numbers(rows, "owner") == [2, 2]
+    assert all(
+        row["type"] == "s3" and row["lifecycle_status"] == "active" for row in rows
+    )
+
+
+def test_name_prefix_and_descending_sort(
+    client: testclient.TestClient, sqlite_db: Engine
+):
+    """Test a name prefix with a descending name sort pages in reverse order."""
+    seed(sqlite_db)
+
+    rows = collect(client, "/resources", {"name_prefix": "users-", "sort": "-name"})
+
+    assert [row["name"] for row in rows] == [f"users-{i:02d}" for i in range(23, 0, -2)]
+    by_id = collect(client, "/resources", {"name_prefix": "orders", "sort": "-id"})
+    assert numbers(by_id) == list(range(24, 0, -2))
+
+
+def test_company_filter(client: testclient.TestClient, sqlite_db: Engine):
+    """Test teams and users can be listed for one company."""
+    seed(sqlite_db)
+
+    teams = collect(client, "/teams", {"company_id": uuid.UUID(int=1), "sort": "name"})
+    users = collect(client, "/users", {"company_id": uuid.UUID(int=2)})
+
+    assert [team["name"] for team in teams] == ["team2", "team4"]
+    assert numbers(users) == [1, 3]
+    assert client.get("/companies", params={"name_prefix": "company2"}).json() == [
+        {"id": str(uuid.UUID(int=2)), "name": "company2"}
+    ]
+
+
+def test_filters_reject_bad_values(client: testclient.TestClient, sqlite_db: Engine):
+    """Test filter values of the wrong type and cursors for another sort fail."""
+    seed(sqlite_db)
+    page = client.get("/resources", params={"limit": 2, "sort": "-id"})
+
+    assert client.get("/resources", params={"owner": "x"}).status_code == 422
+    assert client.get("/resources", params={"sort": "type"}).status_code == 422
+    params = {"cursor": page.headers[NEXT_CURSOR_HEADER], "sort": "id"}
+    assert client.get("/resources", params=params).status_code == 400
+
+
+def test_export_takes_a_name_prefix(client: testclient.TestClient, sqlite_db: Engine):
+    """Test the export accepts the same name prefix filter as the lists."""
+    seed(sqlite_db)
+
+    response = client.get("/export/resources", params={"name_prefix": "orders-1"})
+
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == 5
+
+
+def test_name_prefix_bounds():
+    """Test the prefix range excludes names that only sort after the prefix."""
+    conditions = filters.name_prefix(database.Resource.name, "ab")
+
+    assert [str(condition.right.value) for condition in conditions] == ["ab", "ac"]
+    assert filters.name_prefix(database.Resource.name, "") == []
@@ -0,0 +1,176 @@
+"""Test the streaming NDJSON import."""
+
+import json
+import uuid
+
+from fastapi import testclient
+from sqlalchemy import Engine, func
+from sqlmodel import Session, delete, select
+
+from metadata_service.models import database
+from metadata_service.routers import imports
+
+COMPANY_ID = uuid.UUID(int=1)
+TEAM_ID = uuid.UUID(int=2)
+
+
+def seed_team(engine: Engine):
+    """Seed a company and a team to own imported resources."""
+    with Session(engine) as session:
+        session.add(database.Company(id=COMPANY_ID, name="company"))
+        session.add(
+            database.Team(
+                id=TEAM_ID, name="team", company_id=COMPANY_ID, description="team"
+            )
+        )
+        session.commit()
+
+
+def resource_line(i: int, owner: str = str(TEAM_ID)) -> str:
+    """Build the NDJSON line of a resource."""
+    return json.dumps(
+        {
+            "name": f"resource-{i:03d}",
+            "type": "postgres",
+            "lifecycle_status": "active",
+            "description": "imported",
+            "owner": owner,
+        }
+    )
+
+
+def count_resources(engine: Engine) -> int:
+    """Count the resources in the database."""
+    with Session(engine) as session:
+        return session.exec(select(func.count()).select_from(database.Resource)).one()
+
+
+def test_import_creates_every_line_in_chunks(
+    client: testclient.TestClient, sqlite_db: Engine
+):
+    """Test every valid line is created across several chunks."""
+    seed_team(sqlite_db)
+    body = "\n".join(resource_line(i) for i in range(25)) + "\n"
+
+    response = client.post(
+        "/import/resources", params={"chunk_size": 10}, content=body.encode()
+    )
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["accepted"] == 25
+    assert result["rejected"] == 0
+    assert count_resources(sqlite_db) == 25
+
+
+def test_import_rejects_bad_lines(client: testclient.TestClient, sqlite_db: Engine):
+    """Test invalid lines are reported by line index and the rest are created."""
+    seed_team(sqlite_db)
+    lines = [
+        resource_line(0),
+        "{not json",
+        resource_line(2),
+        "",
+        json.dumps({"name": "missing fields"}),
+        "[1, 2]",
+        resource_line(6, owner="team"),
+        resource_line(7),
+    ]
+
+    response = client.post(
+        "/import/resources", params={"chunk_size": 2}, content="\n".join(lines)
+    )
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["accepted"] == 3
+    assert result["rejected"] == 4
+    assert [error["index"] for error in result["errors"]] == [1, 4, 5, 6]
+    assert count_resources(sqlite_db) == 3
+
+
+def test_import_caps_reported_errors(
+    client: testclient.TestClient, sqlite_db: Engine, monkeypatch
+):
+    """Test rejected lines past the limit are counted but not listed."""
+    monkeypatch.setattr(imports, "MAX_REPORTED_ERRORS", 2)
+
+    response = client.post("/import/companies", content="1\n2\n3\n")
+
+    result = response.json()
+    assert result["rejected"] == 3
+    assert len(result["errors"]) == 2
+
+
+def test_import_rejects_overlong_lines(
+    client: testclient.TestClient, sqlite_db: Engine, monkeypatch
+):
+    """Test a line longer than the limit stops the import."""
+    monkeypatch.setattr(imports, "MAX_LINE_BYTES", 16)
+
+    response = client.post("/import/companies", content=json.dumps({"name": "x" * 32}))
+
+    assert response.status_code == 400
+
+
+def test_export_imports_with_its_references(
+    client: testclient.TestClient, sqlite_db: Engine
+):
+    """Test an exported database imported again keeps the IDs rows refer to."""
+    seed_team(sqlite_db)
+    user_id = uuid.UUID(int=3)
+    with Session(sqlite_db) as session:
+        session.add(
+            database.User(
+                id=user_id, name="user", email="user@fake.com", company_id=COMPANY_ID
+            )
+        )
+        session.add(database.Team_Members(team_id=TEAM_ID, user_id=user_id))
+        session.commit()
+    client.post("/import/resources", content=resource_line(0))
+    entities = ["companies", "teams", "users", "resources"]
+    exports = {entity: client.get(f"/export/{entity}").content for entity in entities}
+    with Session(sqlite_db) as session:
+        for entity in reversed(entities):
+            session.exec(delete(database.ENTITIES[entity]))
+        session.commit()
+
+    results = [
+        client.post(f"/import/{entity}", content=exports[entity]).json()
+        for entity in entities
+    ]
+
+    assert [result["accepted"] for result in results] == [1, 1, 1, 1]
+    with Session(sqlite_db) as session:
+        resource = session.exec(select(database.Resource)).one()
+        assert resource.owner == TEAM_ID
+        assert session.get(database.Team, TEAM_ID).company_id == COMPANY_ID
+        assert session.get(database.User, user_id).company_id == COMPANY_ID
+    team = client.get(f"/teams/{TEAM_ID}", params={"include": "members"}).json()
+    assert [member["id"] for member in team["members"]] == [str(user_id)]
+
+
+def test_import_rejects_taken_ids(client: testclient.TestClient, sqlite_db: Engine):
+    """Test a line whose ID is already taken is rejected and the rest created."""
+    seed_team(sqlite_db)
+    taken = json.dumps(
+        {
+            "id": str(TEAM_ID),
+            "name": "again",
+            "company_id": str(COMPANY_ID),
+            "description": "taken",
+        }
+    )
+    fresh = json.dumps(
+        {"name": "new", "company_id": str(COMPANY_ID), "description": "new"}
+    )
+
+    response = client.post("/import/teams", content=f"{taken}\n{fresh}\n")
+
+    result = response.json()
+    assert result["accepted"] == 1
+    assert result["errors"] == [
+        {"index": 0, "detail": "UNIQUE constraint failed: team.id"}
+    ]
+    with Session(sqlite_db) as session:
+        assert session.get(database.Team, TEAM_ID).name == "team"
@@ -0,0 +1,168 @@
+"""Test embedding related data with ?include= without a query per row."""
+
+import uuid
+
+import pytest
+from fastapi import testclient
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from metadata_service.models import database
+
+COMPANY_ID = uuid.UUID(int=1)
+
+
+def uid(n: int) -> str:
+    """Get the text form of the nth seeded ID."""
+    return str(uuid.UUID(int=n))
+
+
+def seed(engine: Engine, teams: int):
+    """Seed teams that each have two members, two resources and a company."""
+    with Session(engine) as session:
+        session.add(database.Company(id=COMPANY_ID, name="company"))
+        for i in range(1, teams + 1):
+            session.add(
+                database.Team(
+                    id=uuid.UUID(int=i),
+                    name=f"team{i}",
+                    company_id=COMPANY_ID,
+                    description="x",
+                )
+            )
+            for j in (2 * i - 1, 2 * i):
+                session.add(
+                    database.User(
+                        id=uuid.UUID(int=j),
+                        name=f"user{j}",
+                        email="u@fake.com",
+                        company_id=COMPANY_ID,
+                    )
+                )
+                session.add(
+                    database.Team_Members(
+                        team_id=uuid.UUID(int=i), user_id=uuid.UUID(int=j)
+                    )
+                )
+                session.add(
+                    database.Resource(
+                        id=uuid.UUID(int=j),
+                        name=f"resource{j}",
+                        type="postgres",
+                        lifecycle_status="active",
+                        description="x",
+                        owner=uuid.UUID(int=i),
+                    )
+                )
+        session.commit()
+
+
+def selects(statements: list[str]) -> int:
+    """Count the SELECT statements recorded."""
+    return sum(1 for statement in statements if statement.startswith("SELECT"))
+
+
+@pytest.mark.parametrize("limit", [2, 20])
+def test_team_includes_use_one_query_per_relationship(
+    client: testclient.TestClient,
+    sqlite_db: Engine,
+    sql_statements: list[str],
+    limit: int,
+):
+    """Test the statement count does not grow with the page size."""
+    seed(sqlite_db, 20)
+    sql_statements.clear()
+
+    response = client.get(
+        "/teams", params={"limit": limit, "include": "members,resources,company"}
+    )
+
+    assert response.status_code == 200
+    teams = response.json()
+    assert len(teams) == limit
+    assert selects(sql_statements) == 4
+    assert [user["id"] for user in teams[1]["members"]] == [uid(3), uid(4)]
+    assert [resource["id"] for resource in teams[1]["resources"]] == [uid(3), uid(4)]
+    assert teams[1]["company"] == {"id": uid(1), "name": "company"}
+
+
+def test_users_include_teams_and_company(
+    client: testclient.TestClient, sqlite_db: Engine, sql_statements: list[str]
+):
+    """Test users embed their teams and company."""
+    seed(sqlite_db, 3)
+    sql_statements.clear()
+
+    response = client.get("/users", params={"limit": 6, "include": "teams,company"})
+
+    assert response.status_code == 200
+    assert selects(sql_statements) == 3
+    users = response.json()
+    assert [[team["id"] for team in user["teams"]] for user in users] == [
+        [uid(1)],
+        [uid(1)],
+        [uid(2)],
+        [uid(2)],
+        [uid(3)],
+        [uid(3)],
+    ]
+    assert all(user["company"]["id"] == uid(1) for user in users)
+
+
+def test_get_by_id_includes(client: testclient.TestClient, sqlite_db: Engine):
+    """Test a single team and user embed only what was asked for."""
+    seed(sqlite_db, 2)
+
+    team = client.get(f"/teams/{uid(2)}", params={"include": "members"}).json()
+    user = client.get(f"/users/{uid(3)}", params={"include": "company"}).json()
+
+    assert team == {
+        "id": uid(2),
+        "name": "team2",
+        "company_id": uid(1),
+        "description": "x",
+        "members": [
+            {
+                "id": uid(3),
+                "name": "user3",
+                "email": "u@fake.com",
+                "company_id": uid(1),
+            },
+            {
+                "id": uid(4),
+                "name": "user4",
+                "email": "u@fake.com",
+                "company_id": uid(1),
+            },
+        ],
+    }
+    assert user["company"] == {"id": uid(1), "name": "company"}
+    assert "teams" not in user
+
+
+def test_without_includes_responses_are_unchanged(
+    client: testclient.TestClient, sqlite_db: Engine
+):
+    """Test responses without includes only have the entity's own fields."""
+    seed(sqlite_db, 1)
+
+    assert client.get(f"/teams/{uid(1)}").json() == {
+        "id": uid(1),
+        "name": "team1",
+        "company_id": uid(1),
+        "description": "x",
+    }
+    assert client.get("/users").json()[0] == {
+        "id": uid(1),
+        "name": "user1",
+        "email": "u@fake.com",
+        "company_id": uid(1),
+    }
+
+
+def test_unknown_include_is_rejected(client: testclient.TestClient, sqlite_db: Engine):
+    """Test an include the entity does not have is a bad request."""
+    assert client.get("/teams", params={"include": "teams"}).status_code == 400
+    assert (
+        client.get(f"/users/{uid(1)}", params={"include": "members"}).status_code == 400
+    )
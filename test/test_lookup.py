@@ -0,0 +1,142 @@
+"""Test getting many entities by ID in one request."""
+
+import uuid
+
+from fastapi import testclient
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from metadata_service import cache, lookup
+from metadata_service.models import database
+
+
+def uid(n: int) -> str:
+    """Get the text form of the nth seeded ID."""
+    return str(uuid.UUID(int=n))
+
+
+def uids(*numbers: int) -> str:
+    """Join the IDs of some seeded rows into a lookup list."""
+    return ",".join(uid(n) for n in numbers)
+
+
+def seed(engine: Engine, count: int):
+    """Seed a company, a team and resources owned by the team."""
+    with Session(engine) as session:
+        session.add(database.Company(id=uuid.UUID(int=1), name="company"))
+        session.add(
+            database.Team(
+                id=uuid.UUID(int=1),
+                name="team",
+                company_id=uuid.UUID(int=1),
+                description="x",
+            )
+        )
+        for i in range(1, count + 1):
+            session.add(
+                database.Resource(
+                    id=uuid.UUID(int=i),
+                    name=f"resource{i}",
+                    type="postgres",
+                    lifecycle_status="active",
+                    description="x",
+                    owner=uuid.UUID(int=1),
+                )
+            )
+        session.commit()
+
+
+def selects(statements: list[str]) -> list[str]:
+    """Get the SELECT statements recorded."""
+    return [statement for statement in statements if statement.startswith("SELECT")]
+
+
+def test_lookup_returns_found_and_missing(
+    client: testclient.TestClient, sqlite_db: Engine, sql_statements: list[str]
+):
+    """Test IDs are returned in the order asked for in one query."""
+    seed(sqlite_db, 10)
+    sql_statements.clear()
+
+    response = client.get("/resources:lookup", params={"ids": uids(7, 99, 3, 7, 1, 42)})
+
+    assert response.status_code == 200
+    result = response.json()
+    assert [resource["id"] for resource in result["found"]] == [uid(7), uid(3), uid(1)]
+    assert result["missing"] == [uid(99), uid(42)]
+    assert len(selects(sql_statements)) == 1
+
+
+def test_lookup_chunks_long_lists(
+    client: testclient.TestClient,
+    sqlite_db: Engine,
+    sql_statements: list[str],
+    monkeypatch,
+):
+    """Test long lists are split into IN queries of at most the chunk size."""
+    monkeypatch.setattr(lookup, "LOOKUP_CHUNK_SIZE", 4)
+    seed(sqlite_db, 10)
+    sql_statements.clear()
+
+    response = client.post(
+        "/resources:lookup", json={"ids": [uid(n) for n in range(1, 13)]}
+    )
+
+    assert response.status_code == 200
+    result = response.json()
+    assert [resource["id"] for resource in result["found"]] == [
+        uid(n) for n in range(1, 11)
+    ]
+    assert result["missing"] == [uid(11), uid(12)]
+    assert len(selects(sql_statements)) == 3
+
+
+def test_lookup_serves_cached_entities(
+    client: testclient.TestClient, sqlite_db: Engine, sql_statements: list[str]
+):
+    """Test cached entities are not queried again."""
+    seed(sqlite_db, 3)
+    client.get("/resources:lookup", params={"ids": uids(1, 2, 3)})
+    sql_statements.clear()
+    hits = cache.entities.stats().hits
+
+    response = client.get("/resources:lookup", params={"ids": uids(3, 1)})
+
+    assert [resource["id"] for resource in response.json()["found"]] == [uid(3), uid(1)]
+    assert selects(sql_statements) == []
+    assert cache.entities.stats().hits - hits == 2
+
+
+def test_lookup_every_entity(client: testclient.TestClient, sqlite_db: Engine):
+    """Test the lookup endpoints of the other entities."""
+    seed(sqlite_db, 1)
+    with Session(sqlite_db) as session:
+        session.add(
+            database.User(
+                id=uuid.UUID(int=1),
+                name="user",
+                email="u@fake.com",
+                company_id=uuid.UUID(int=1),
+            )
+        )
+        session.commit()
+
+    for plural in ("companies", "teams", "users"):
+        result = client.get(f"/{plural}:lookup", params={"ids": uids(1, 2)}).json()
+        assert [entity["id"] for entity in result["found"]] == [uid(1)]
+        assert result["missing"] == [uid(2)]
+
+
+def test_lookup_rejects_bad_ids(
+    client: testclient.TestClient, sqlite_db: Engine, monkeypatch
+):
+    """Test malformed or too many IDs are rejected."""
+    monkeypatch.setattr(lookup, "MAX_LOOKUP_IDS", 3)
+    assert (
+        client.get("/resources:lookup", params={"ids": f"{uid(1)},x"}).status_code
+        == 400
+    )
+    assert (
+        client.get("/teams:lookup", params={"ids": uids(1, 2, 3, 4)}).status_code == 400
+    )
+    assert client.post("/users:lookup", json={"ids": []}).status_code == 422
@@ -0,0 +1,72 @@
+"""Test the metrics middleware and the /metrics endpoint."""
+
+import uuid
+
+import pytest
+from fastapi import testclient
+from sqlalchemy import Engine
+
+from metadata_service import metrics
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    """Start every test with no recorded requests."""
+    metrics.registry.reset()
+
+
+def test_histogram_is_cumulative():
+    """Test histogram buckets count every value at or below their bound."""
+    histogram = metrics.Histogram((1, 5))
+    for value in (0.5, 1, 3, 10):
+        histogram.observe((), value)
+
+    lines = list(histogram.render("test"))
+
+    assert lines == [
+        'test_bucket{le="1"} 2',
+        'test_bucket{le="5"} 3',
+        'test_bucket{le="+Inf"} 4',
+        "test_sum 14.5",
+        "test_count 4",
+    ]
+
+
+def test_requests_counted_by_route_template(
+    client: testclient.TestClient, sqlite_db: Engine
+):
+    """Test requests are labelled by route template and status."""
+    client.get(f"/users/{uuid.UUID(int=1)}")
+    client.get(f"/users/{uuid.UUID(int=2)}")
+    client.get("/no/such/route")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert (
+        'metadata_http_requests_total{method="GET",route="/users/{id}",status="404"} 2'
+        in body
+    )
+    assert (
+        'metadata_http_requests_total{method="GET",route="unmatched",status="404"} 1'
+        in body
+    )
+    assert (
+        'metadata_http_request_duration_seconds_count{method="GET",route="/users/{id}"} 2'
+        in body
+    )
+
+
+def test_database_statements_recorded(client: testclient.TestClient, sqlite_db: Engine):
+    """Test the statements a request executes are attributed to its route."""
+    client.get("/users")
+
+    body = client.get("/metrics").text
+
+    assert (
+        'metadata_db_statements_per_request_sum{method="GET",route="/users"} 1' in body
+    )
+    assert 'metadata_db_statement_seconds_total{method="GET",route="/users"}' in body
+    assert "metadata_cache_hits_total" in body
@@ -0,0 +1,103 @@
+"""Test keyset (cursor) pagination on the list endpoints."""
+
+import uuid
+
+from fastapi import testclient
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from metadata_service.models import database
+from metadata_service.pagination import NEXT_CURSOR_HEADER
+
+COMPANY_ID = uuid.UUID(int=1)
+TEAM_ID = uuid.UUID(int=2)
+
+
+def seed_resources(engine: Engine, count: int):
+    """Seed a company, a team and resources owned by the team.
+
+    The resources are created in reverse name order, so their time-ordered
+    IDs sort the other way round to their names.
+    """
+    with Session(engine) as session:
+        session.add(database.Company(id=COMPANY_ID, name="company"))
+        session.add(
+            database.Team(
+                id=TEAM_ID, name="team", company_id=COMPANY_ID, description="team"
+            )
+        )
+        for i in range(count):
+            session.add(
+                database.Resource(
+                    name=f"resource-{count - i:03d}",
+                    type="postgres",
+                    lifecycle_status="active",
+                    description="test resource",
+                    owner=TEAM_ID,
+                )
+            )
+        session.commit()
+
+
+def collect_pages(
+    client: testclient.TestClient, url: str, sort: str = "id"
+) -> list[dict]:
+    """Follow next page cursors until the last page and return every row."""
+    rows: list[dict] = []
+    params = {"limit": 4, "sort": sort}
+    while True:
+        response = client.get(url, params=params)
+        assert response.status_code == 200
+        rows.extend(response.json())
+        if NEXT_CURSOR_HEADER not in response.headers:
+            return rows
+        params["cursor"] = response.headers[NEXT_CURSOR_HEADER]
+
+
+def test_cursor_pages_by_id(client: testclient.TestClient, sqlite_db: Engine):
+    """Test following cursors returns every row once in id order."""
+    seed_resources(sqlite_db, 10)
+
+    rows = collect_pages(client, "/resources")
+
+    assert [row["id"] for row in rows] == sorted(row["id"] for row in rows)
+    assert [row["name"] for row in rows] == [
+        f"resource-{i:03d}" for i in range(10, 0, -1)
+    ]
+
+
+def test_cursor_pages_by_name(client: testclient.TestClient, sqlite_db: Engine):
+    """Test following cursors sorted by name returns every row in name order."""
+    seed_resources(sqlite_db, 10)
+
+    rows = collect_pages(client, "/resources", sort="name")
+
+    assert [row["name"] for row in rows] == [f"resource-{i:03d}" for i in range(1, 11)]
+
+
+def test_skip_still_supported(client: testclient.TestClient, sqlite_db: Engine):
+    """Test offset pagination with skip keeps working alongside cursors."""
+    seed_resources(sqlite_db, 10)
+
+    response = client.get("/resources", params={"skip": 8, "limit": 4})
+
+    assert response.status_code == 200
+    assert [row["name"] for row in response.json()] == ["resource-002", "resource-001"]
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+def test_cursor_sort_mismatch(client: testclient.TestClient, sqlite_db: Engine):
+    """Test a cursor issued for one sort is rejected for another."""
+    seed_resources(sqlite_db, 10)
+    cursor = client.get("/resources", params={"limit": 4}).headers[NEXT_CURSOR_HEADER]
+
+    response = client.get("/resources", params={"cursor": cursor, "sort": "name"})
+
+    assert response.status_code == 400
+
+
+def test_invalid_cursor(client: testclient.TestClient, sqlite_db: Engine):
+    """Test a malformed cursor returns a bad request."""
+    response = client.get("/resources", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
@@ -0,0 +1,115 @@
+"""Test per-request SQL profiles and the slow query log."""
+
+import json
+import logging
+import uuid
+
+import pytest
+from fastapi import testclient
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from metadata_service import profiling
+from metadata_service.models import database
+
+COMPANY_ID = uuid.UUID(int=1)
+
+
+@pytest.fixture(autouse=True)
+def profiler(monkeypatch) -> profiling.Profiler:
+    """Profile on request only, and log no statement as slow."""
+    profiler = profiling.Profiler(header_enabled=True, slow_query_seconds=60)
+    monkeypatch.setattr(profiling, "profiler", profiler)
+    return profiler
+
+
+def seed(engine: Engine):
+    """Seed a company."""
+    with Session(engine) as session:
+        session.add(database.Company(id=COMPANY_ID, name="company"))
+        session.commit()
+
+
+def test_profile_returned_when_asked(client: testclient.TestClient, sqlite_db: Engine):
+    """Test a request asking for a profile gets its statements and their plans."""
+    seed(sqlite_db)
+
+    response = client.get(
+        "/users", params={"company_id": str(COMPANY_ID)}, headers={"X-Profile-SQL": "1"}
+    )
+
+    assert response.status_code == 200
+    profile = json.loads(response.headers["X-SQL-Profile"])
+    assert profile["method"] == "GET"
+    assert profile["path"] == "/users"
+    assert profile["truncated"] == 0
+    [statement] = profile["statements"]
+    assert statement["statement"].startswith("SELECT")
+    assert str(COMPANY_ID) in statement["parameters"]
+    assert statement["executions"] == 1
+    assert statement["milliseconds"] >= 0
+    assert any("ix_user_company_id_name" in step for step in statement["plan"])
+
+
+def test_profile_not_returned_unless_asked(
+    client: testclient.TestClient, sqlite_db: Engine, profiler: profiling.Profiler
+):
+    """Test profiles are only returned when asked for and enabled."""
+    assert "X-SQL-Profile" not in client.get("/users").headers
+
+    profiler.header_enabled = False
+    response = client.get("/users", headers={"X-Profile-SQL": "1"})
+
+    assert "X-SQL-Profile" not in response.headers
+
+
+def test_sampled_profile_logged(
+    client: testclient.TestClient,
+    sqlite_db: Engine,
+    profiler: profiling.Profiler,
+    caplog: pytest.LogCaptureFixture,
+):
+    """Test sampled requests log their profile without returning it."""
+    seed(sqlite_db)
+    profiler.sample_rate = 1.0
+
+    with caplog.at_level(logging.INFO, logger="metadata_service.profiling"):
+        response = client.get(f"/companies/{COMPANY_ID}")
+
+    assert "X-SQL-Profile" not in response.headers
+    [record] = [r for r in caplog.records if r.getMessage().startswith("SQL profile")]
+    assert record.sql_profile.path == f"/companies/{COMPANY_ID}"
+    [statement] = record.sql_profile.statements
+    assert any("USING INDEX sqlite_autoindex_company_1" in s for s in statement.plan)
+
+
+def test_slow_queries_logged(
+    client: testclient.TestClient,
+    sqlite_db: Engine,
+    profiler: profiling.Profiler,
+    caplog: pytest.LogCaptureFixture,
+):
+    """Test statements over the threshold are logged without profiling."""
+    profiler.slow_query_seconds = 0
+
+    with caplog.at_level(logging.WARNING, logger="metadata_service.profiling"):
+        client.get("/teams")
+
+    [record] = caplog.records
+    assert record.levelno == logging.WARNING
+    assert record.getMessage().startswith("Slow query took")
+    assert "FROM team" in record.getMessage()
+
+
+def test_header_value_drops_statements_to_fit():
+    """Test a profile too long for a header keeps the statements that fit."""
+    profile = profiling.RequestProfile("GET", "/teams")
+    for i in range(10):
+        profile.statements.append(
+            profiling.StatementProfile(f"SELECT {i}", [], 1, 0.1, [])
+        )
+
+    value = json.loads(profile.header_value(max_bytes=400))
+
+    assert 0 < len(value["statements"]) < 10
+    assert value["truncated"] == 10 - len(value["statements"])
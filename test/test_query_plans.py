@@ -0,0 +1,400 @@
+"""Test every query the routers issue is served by an index.
+
+Each endpoint is called against a real SQLite database while the statements
+it executes are recorded, then ``EXPLAIN QUERY PLAN`` is run on each of them.
+A plan that scans a whole table fails the test. An ordered scan that stops
+after ``LIMIT`` rows, as the first page of a list does, is allowed as long as
+SQLite does not have to sort the rows first. A full-text index read with
+``MATCH`` is a lookup, not a scan.
+"""
+
+import asyncio
+import contextlib
+import sqlite3
+import uuid
+from pathlib import Path
+from typing import Any
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from fastapi import testclient
+from sqlalchemy import Engine, create_engine, event, inspect
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import Session
+
+from metadata_service import changes
+from metadata_service.models import database
+from metadata_service.pagination import NEXT_CURSOR_HEADER
+
+ROOT = Path(__file__).parent.parent
+
+
+def uid(n: int) -> str:
+    """Get the text form of the nth seeded ID."""
+    return str(uuid.UUID(int=n))
+
+
+ENTITIES = {
+    "users": ("user", {"name": "new", "email": "new@fake.com", "company_id": uid(1)}),
+    "teams": ("team", {"name": "new", "company_id": uid(1), "description": "new"}),
+    "companies": ("company", {"name": "new"}),
+    "resources": (
+        "resource",
+        {
+            "name": "new",
+            "type": "postgres",
+            "lifecycle_status": "active",
+            "description": "new",
+            "owner": uid(1),
+        },
+    ),
+}
+
+
+@pytest.fixture
+def recorded(sqlite_db: Engine):
+    """Record the statements and parameters the app executes."""
+    statements: list[tuple[str, Any]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            statements.append((statement, parameters))
+
+    event.listen(Engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(Engine, "before_cursor_execute", record)
+
+
+def seed(engine: Engine):
+    """Seed a few rows of every entity."""
+    first = uuid.UUID(int=1)
+    with Session(engine) as session:
+        for i in range(1, 6):
+            id = uuid.UUID(int=i)
+            session.add(database.Company(id=id, name=f"company{i}"))
+            session.add(
+                database.Team(id=id, name=f"team{i}", company_id=first, description="x")
+            )
+            session.add(
+                database.User(
+                    id=id, name=f"user{i}", email="u@fake.com", company_id=first
+                )
+            )
+            session.add(database.Team_Members(team_id=first, user_id=id))
+            if i > 1:
+                session.add(database.Team_Members(team_id=id, user_id=first))
+            session.add(
+                database.Resource(
+                    id=id,
+                    name=f"resource{i}",
+                    type="postgres",
+                    lifecycle_status="active",
+                    description="x",
+                    owner=first,
+                )
+            )
+        session.commit()
+
+
+def full_scans(engine: Engine, statement: str, parameters: Any) -> list[str]:
+    """Get the plan steps of a statement that read a whole table."""
+    # A plain sqlite3 connection keeps the EXPLAIN out of the recorded statements.
+    with contextlib.closing(sqlite3.connect(engine.url.database)) as conn:
+        plan = [
+            row[3]
+            for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        ]
+    bounded = " LIMIT " in statement and not any("TEMP B-TREE" in p for p in plan)
+    return [
+        step
+        for step in plan
+        if step.startswith("SCAN") and not bounded and not is_match(step)
+    ]
+
+
+def is_match(step: str) -> bool:
+    """Check whether a plan step reads a full-text index with MATCH."""
+    return "VIRTUAL TABLE INDEX" in step and ":M" in step
+
+
+def exercise(client: testclient.TestClient, plural: str, single: str, body: dict):
+    """Call every endpoint of an entity."""
+    for sort in ("id", "name"):
+        page = client.get(f"/{plural}", params={"limit": 2, "sort": sort})
+        assert page.status_code == 200
+        cursor = page.headers[NEXT_CURSOR_HEADER]
+        next_page = client.get(
+            f"/{plural}", params={"limit": 2, "sort": sort, "cursor": cursor}
+        )
+        assert next_page.status_code == 200
+    assert client.get(f"/{plural}", params={"skip": 2, "limit": 2}).status_code == 200
+    assert client.get(f"/{plural}/{uid(2)}").status_code == 200
+    lookup = {"ids": ",".join(uid(n) for n in (1, 5, 9))}
+    assert client.get(f"/{plural}:lookup", params=lookup).status_code == 200
+    if single in database.SEARCH_COLUMNS:
+        params = {"q": f"{single}*", "limit": 1}
+        found = client.get(f"/{plural}/search", params=params)
+        assert found.status_code == 200
+        params["cursor"] = found.headers[NEXT_CURSOR_HEADER]
+        assert client.get(f"/{plural}/search", params=params).status_code == 200
+    assert client.post(f"/{single}", json=body).status_code == 200
+    assert client.post(f"/{plural}:batch", json=[body, body]).status_code == 200
+    assert (
+        client.put(f"/{single}/{uid(3)}", json={"name": "renamed"}).status_code == 200
+    )
+    assert client.put(f"/{single}/{uid(3)}", json={}).status_code == 200
+    assert client.delete(f"/{single}/{uid(4)}").status_code == 200
+
+
+@pytest.mark.parametrize("plural", ENTITIES)
+def test_queries_use_indexes(
+    client: testclient.TestClient,
+    sqlite_db: Engine,
+    recorded: list[tuple[str, Any]],
+    plural: str,
+):
+    """Test no statement issued by an entity's endpoints scans a table."""
+    seed(sqlite_db)
+    recorded.clear()
+    single, body = ENTITIES[plural]
+
+    exercise(client, plural, single, body)
+
+    assert recorded
+    scans = {
+        statement: steps
+        for statement, parameters in recorded
+        if (steps := full_scans(sqlite_db, statement, parameters))
+    }
+    assert scans == {}
+
+
+def test_membership_queries_use_indexes(
+    client: testclient.TestClient,
+    sqlite_db: Engine,
+    recorded: list[tuple[str, Any]],
+):
+    """Test no statement issued by the membership endpoints scans a table."""
+    seed(sqlite_db)
+    recorded.clear()
+
+    for url in (f"/teams/{uid(1)}/members", f"/users/{uid(1)}/teams"):
+        page = client.get(url, params={"limit": 1})
+        assert page.status_code == 200
+        cursor = page.headers[NEXT_CURSOR_HEADER]
+        assert client.get(url, params={"limit": 1, "cursor": cursor}).status_code == 200
+    assert client.get(f"/teams/{uid(1)}/members/{uid(2)}").status_code == 200
+    members = {"user_ids": [uid(2), uid(3), uid(4)]}
+    assert client.post(f"/teams/{uid(2)}/members", json=members).status_code == 200
+    assert (
+        client.post(f"/teams/{uid(2)}/members:remove", json=members).status_code == 200
+    )
+    assert client.delete(f"/team/{uid(3)}").status_code == 200
+    assert client.delete(f"/user/{uid(3)}").status_code == 200
+
+    assert recorded
+    scans = {
+        statement: steps
+        for statement, parameters in recorded
+        if (steps := full_scans(sqlite_db, statement, parameters))
+    }
+    assert scans == {}
+
+
+def test_include_queries_use_indexes(
+    client: testclient.TestClient,
+    sqlite_db: Engine,
+    recorded: list[tuple[str, Any]],
+):
+    """Test no statement loading embedded related data scans a table."""
+    seed(sqlite_db)
+    recorded.clear()
+
+    teams = {"limit": 3, "include": "members,resources,company"}
+    assert client.get("/teams", params=teams).status_code == 200
+    assert client.get(f"/teams/{uid(1)}", params=teams).status_code == 200
+    users = {"limit": 3, "include": "teams,company"}
+    assert client.get("/users", params=users).status_code == 200
+    assert client.get(f"/users/{uid(1)}", params=users).status_code == 200
+
+    assert recorded
+    scans = {
+        statement: steps
+        for statement, parameters in recorded
+        if (steps := full_scans(sqlite_db, statement, parameters))
+    }
+    assert scans == {}
+
+
+def test_change_feed_queries_use_indexes(
+    client: testclient.TestClient,
+    sqlite_db: Engine,
+    recorded: list[tuple[str, Any]],
+):
+    """Test reading and compacting the change log seeks by sequence number."""
+    seed(sqlite_db)
+    recorded.clear()
+
+    assert client.get("/changes").status_code == 200
+    page = client.get("/changes", params={"since": 0, "limit": 2})
+    assert page.status_code == 200
+    params = {"since": page.json()["next_since"], "limit": 2}
+    assert client.get("/changes", params=params).status_code == 200
+    assert client.get("/changes", params={"since": 10_000}).status_code == 200
+
+    async def compact():
+        engine = create_async_engine(sqlite_db.url.set(drivername="sqlite+aiosqlite"))
+        sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+        await changes.compact(sessionmaker, retention_seconds=60, max_rows=5)
+        await engine.dispose()
+
+    asyncio.run(compact())
+
+    assert recorded
+    scans = {
+        statement: steps
+        for statement, parameters in recorded
+        if (steps := full_scans(sqlite_db, statement, parameters))
+    }
+    assert scans == {}
+
+
+@pytest.mark.parametrize(
+    ("url", "params", "index"),
+    [
+        (
+            "/resources",
+            {"owner": uid(1), "type": "postgres", "lifecycle_status": "active"},
+            "ix_resource_owner_type_status",
+        ),
+        (
+            "/resources",
+            {"type": "postgres", "lifecycle_status": "active", "sort": "-id"},
+            "ix_resource_type_status",
+        ),
+        ("/resources", {"name_prefix": "resource", "sort": "name"}, "ix_resource_name"),
+        ("/users", {"company_id": uid(1), "sort": "-name"}, "ix_user_company_id_name"),
+        (
+            "/teams",
+            {"company_id": uid(1), "name_prefix": "team"},
+            "ix_team_company_id_name",
+        ),
+    ],
+)
+def test_filter_queries_use_indexes(
+    client: testclient.TestClient,
+    sqlite_db: Engine,
+    recorded: list[tuple[str, Any]],
+    url: str,
+    params: dict,
+    index: str,
+):
+    """Test filtered lists read the matching rows through an index."""
+    seed(sqlite_db)
+    recorded.clear()
+
+    assert client.get(url, params={**params, "limit": 2}).status_code == 200
+
+    [(statement, parameters)] = [
+        (statement, parameters)
+        for statement, parameters in recorded
+        if statement.startswith("SELECT")
+    ]
+    with contextlib.closing(sqlite3.connect(sqlite_db.url.database)) as conn:
+        plan = [
+            row[3]
+            for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        ]
+    assert any(step.startswith("SEARCH") and index in step for step in plan), plan
+
+
+def test_migrations_match_model_indexes(tmp_path: Path, monkeypatch):
+    """Test the migrations create the same indexes as the models declare.
+
+    That includes the full-text search tables, the change log and the triggers
+    filling them.
+    """
+    migrated_path = tmp_path / "migrated.db"
+    monkeypatch.setenv("METADATA_DATABASE_URL", f"sqlite:///{migrated_path}")
+    config = Config(ROOT / "alembic.ini")
+    config.set_main_option("script_location", str(ROOT / "alembic"))
+    command.upgrade(config, "head")
+
+    model_engine = create_engine(f"sqlite:///{tmp_path / 'models.db'}")
+    database.SQLModel.metadata.create_all(model_engine)
+    migrated_engine = create_engine(f"sqlite:///{migrated_path}")
+
+    def indexes(engine: Engine) -> dict[str, set[tuple[str, tuple[str, ...]]]]:
+        inspector = inspect(engine)
+        return {
+            table: {
+                (index["name"], tuple(index["column_names"]))
+                for index in inspector.get_indexes(table)
+            }
+            for table in database.SQLModel.metadata.tables
+        }
+
+    assert indexes(migrated_engine) == indexes(model_engine)
+
+    def trigger_objects(engine: Engine) -> set[tuple[str, str, str]]:
+        with engine.connect() as conn:
+            return set(
+                conn.exec_driver_sql(
+                    "SELECT type, name, sql FROM sqlite_master "
+                    "WHERE (name LIKE '%search%' OR type = 'trigger') "
+                    "AND sql IS NOT NULL"
+                )
+            )
+
+    assert trigger_objects(model_engine)
+    assert trigger_objects(migrated_engine) == trigger_objects(model_engine)
+
+    def columns(engine: Engine, table: str) -> list[tuple[str, str, bool]]:
+        return [
+            (column["name"], str(column["type"]), column["nullable"])
+            for column in inspect(engine).get_columns(table)
+        ]
+
+    for table in database.SQLModel.metadata.tables:
+        assert columns(migrated_engine, table) == columns(model_engine, table), table
+
+
+def test_uuid_migration_keeps_references(tmp_path: Path, monkeypatch):
+    """Test converting integer IDs to UUIDs keeps every row's references."""
+    path = tmp_path / "migrated.db"
+    monkeypatch.setenv("METADATA_DATABASE_URL", f"sqlite:///{path}")
+    config = Config(ROOT / "alembic.ini")
+    config.set_main_option("script_location", str(ROOT / "alembic"))
+    command.upgrade(config, "e4a7c3d91b52")
+    with contextlib.closing(sqlite3.connect(path)) as conn:
+        conn.executescript(
+            "INSERT INTO company(id, name) VALUES (1, 'acme'), (2, 'globex');"
+            "INSERT INTO team(id, name, company_id, description) "
+            "VALUES (1, 'payments', 2, 'x'), (2, 'platform', 1, 'x');"
+            "INSERT INTO user(id, name, email, company_id) "
+            "VALUES (1, 'ada', 'ada@fake.com', 2);"
+            "INSERT INTO team_members(team_id, user_id) VALUES (2, 1);"
+            "INSERT INTO resource(id, name, type, lifecycle_status, description, "
+            "owner) VALUES (1, 'orders', 'postgres', 'active', 'x', 2);"
+        )
+        since = conn.execute("SELECT max(seq) FROM change_log").fetchone()[0]
+
+    command.upgrade(config, "head")
+
+    with contextlib.closing(sqlite3.connect(path)) as conn:
+        rows = conn.execute(
+            "SELECT r.name, t.name, c.name, u.name FROM resource r "
+            "JOIN team t ON t.id = r.owner JOIN company c ON c.id = t.company_id "
+            "JOIN team_members m ON m.team_id = t.id JOIN user u ON u.id = m.user_id"
+        ).fetchall()
+        company_ids = [row[0] for row in conn.execute("SELECT id FROM company")]
+        oldest = conn.execute("SELECT min(seq) FROM change_log").fetchone()[0]
+        found = conn.execute(
+            "SELECT count(*) FROM resource_search WHERE resource_search MATCH 'orders'"
+        ).fetchone()[0]
+    assert rows == [("orders", "platform", "acme", "ada")]
+    assert [uuid.UUID(bytes=id).version for id in company_ids] == [7, 7]
+    assert company_ids == sorted(company_ids)
+    assert oldest > since + 1
+    assert found == 1
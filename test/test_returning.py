@@ -0,0 +1,97 @@
+"""Test updates and deletes run as a single RETURNING statement."""
+
+import uuid
+
+from fastapi import testclient
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from metadata_service.models import database
+
+COMPANY_ID = uuid.UUID(int=1)
+TEAM_ID = uuid.UUID(int=2)
+RESOURCE_ID = uuid.UUID(int=3)
+RESOURCE = {
+    "id": str(RESOURCE_ID),
+    "name": "chatbot-db",
+    "type": "postgres",
+    "lifecycle_status": "active",
+    "description": "chatbot database",
+    "owner": str(TEAM_ID),
+}
+
+
+def seed_resource(engine: Engine):
+    """Seed a resource with its team and company."""
+    with Session(engine) as session:
+        session.add(database.Company(id=COMPANY_ID, name="company"))
+        session.add(
+            database.Team(
+                id=TEAM_ID, name="team", company_id=COMPANY_ID, description="x"
+            )
+        )
+        session.add(
+            database.Resource(**{**RESOURCE, "id": RESOURCE_ID, "owner": TEAM_ID})
+        )
+        session.commit()
+
+
+def test_update_single_statement(
+    client: testclient.TestClient, sqlite_db: Engine, sql_statements: list[str]
+):
+    """Test an update is one UPDATE ... RETURNING that keeps empty fields."""
+    seed_resource(sqlite_db)
+    sql_statements.clear()
+
+    response = client.put(
+        f"/resource/{RESOURCE_ID}", json={"description": "new", "type": ""}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {**RESOURCE, "description": "new"}
+    assert len(sql_statements) == 1
+    assert sql_statements[0].startswith("UPDATE resource SET description=")
+    assert "RETURNING" in sql_statements[0]
+
+
+def test_update_without_changes(client: testclient.TestClient, sqlite_db: Engine):
+    """Test an update with no fields returns the resource unchanged."""
+    seed_resource(sqlite_db)
+
+    response = client.put(f"/resource/{RESOURCE_ID}", json={})
+
+    assert response.status_code == 200
+    assert response.json() == RESOURCE
+
+
+def test_update_not_found(
+    client: testclient.TestClient, sqlite_db: Engine, sql_statements: list[str]
+):
+    """Test updating a missing resource is a 404 from the empty RETURNING."""
+    seed_resource(sqlite_db)
+    sql_statements.clear()
+
+    response = client.put(f"/resource/{uuid.UUID(int=9)}", json={"description": "new"})
+
+    assert response.status_code == 404
+    assert len(sql_statements) == 1
+
+
+def test_delete_single_statement(
+    client: testclient.TestClient, sqlite_db: Engine, sql_statements: list[str]
+):
+    """Test a delete is one DELETE ... RETURNING statement."""
+    seed_resource(sqlite_db)
+    sql_statements.clear()
+
+    response = client.delete(f"/resource/{RESOURCE_ID}")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "id": str(RESOURCE_ID),
+        "name": "chatbot-db",
+        "status": "deleted",
+    }
+    assert len(sql_statements) == 1
+    assert sql_statements[0].startswith("DELETE FROM resource")
+    assert client.delete(f"/resource/{RESOURCE_ID}").status_code == 404
@@ -0,0 +1,138 @@
+"""Test full-text search over resources, teams and users."""
+
+import uuid
+
+import pytest
+from fastapi import testclient
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from metadata_service import search
+from metadata_service.models import database
+from metadata_service.pagination import NEXT_CURSOR_HEADER
+
+COMPANY_ID = uuid.UUID(int=1)
+
+
+def seed(engine: Engine):
+    """Seed a company, two teams, two users and resources with varied text."""
+    with Session(engine) as session:
+        session.add(database.Company(id=COMPANY_ID, name="company"))
+        for id, name, description in (
+            (1, "payments", "billing"),
+            (2, "platform", "payments"),
+        ):
+            session.add(
+                database.Team(
+                    id=uuid.UUID(int=id),
+                    name=name,
+                    company_id=COMPANY_ID,
+                    description=description,
+                )
+            )
+        for id, name, email in ((1, "ada lovelace", "ada"), (2, "alan turing", "alan")):
+            session.add(
+                database.User(
+                    id=uuid.UUID(int=id),
+                    name=name,
+                    email=f"{email}@fake.com",
+                    company_id=COMPANY_ID,
+                )
+            )
+        descriptions = {
+            1: ("orders db", "primary store for orders"),
+            2: ("orders replica", "read replica"),
+            3: ("ledger", "payment orders ledger"),
+            4: ("avatars", "user avatars bucket"),
+        }
+        for id, (name, description) in descriptions.items():
+            session.add(
+                database.Resource(
+                    id=uuid.UUID(int=id),
+                    name=name,
+                    type="postgres",
+                    lifecycle_status="active",
+                    description=description,
+                    owner=uuid.UUID(int=1),
+                )
+            )
+        session.commit()
+
+
+def ids(response) -> list[int]:
+    """Get the numbers the IDs of the entities in a response were seeded from."""
+    assert response.status_code == 200
+    return [uuid.UUID(entity["id"]).int for entity in response.json()]
+
+
+def test_search_ranks_name_matches_first(
+    client: testclient.TestClient, sqlite_db: Engine
+):
+    """Test matches in the name rank above matches in the description."""
+    seed(sqlite_db)
+
+    response = client.get("/resources/search", params={"q": "orders"})
+
+    assert sorted(ids(response)[:2]) == [1, 2]
+    assert ids(response)[2] == 3
+    assert "version" not in response.json()[0]
+
+
+def test_search_matches_every_word_and_prefixes(
+    client: testclient.TestClient, sqlite_db: Engine
+):
+    """Test every word must match and a trailing star matches a prefix."""
+    seed(sqlite_db)
+
+    assert ids(client.get("/resources/search", params={"q": "orders replica"})) == [2]
+    assert ids(client.get("/resources/search", params={"q": "avat*"})) == [4]
+    assert ids(client.get("/resources/search", params={"q": "avat"})) == []
+    assert ids(client.get("/teams/search", params={"q": "payments"}))[0] == 1
+    assert ids(client.get("/users/search", params={"q": "alan@fake.com"})) == [2]
+
+
+def test_search_follows_writes(client: testclient.TestClient, sqlite_db: Engine):
+    """Test the triggers keep the index in step with updates and deletes."""
+    seed(sqlite_db)
+
+    client.put(
+        f"/resource/{uuid.UUID(int=4)}", json={"description": "profile pictures"}
+    )
+    client.delete(f"/resource/{uuid.UUID(int=2)}")
+
+    assert ids(client.get("/resources/search", params={"q": "avatars"})) == [4]
+    assert ids(client.get("/resources/search", params={"q": "pictures"})) == [4]
+    assert ids(client.get("/resources/search", params={"q": "bucket"})) == []
+    assert ids(client.get("/resources/search", params={"q": "replica"})) == []
+
+
+def test_search_pages_with_a_cursor(client: testclient.TestClient, sqlite_db: Engine):
+    """Test following the cursor returns every match once, in rank order."""
+    seed(sqlite_db)
+    everything = ids(client.get("/resources/search", params={"q": "orders"}))
+
+    paged: list[int] = []
+    params = {"q": "orders", "limit": 1}
+    while True:
+        response = client.get("/resources/search", params=params)
+        paged.extend(ids(response))
+        if NEXT_CURSOR_HEADER not in response.headers:
+            break
+        params["cursor"] = response.headers[NEXT_CURSOR_HEADER]
+
+    assert paged == everything
+
+
+@pytest.mark.parametrize(
+    "params", [{"q": " * "}, {"q": "x", "cursor": "bad"}, {"q": "a " * 17}]
+)
+def test_search_rejects_bad_queries(
+    client: testclient.TestClient, sqlite_db: Engine, params: dict
+):
+    """Test empty or oversized queries and invalid cursors are rejected."""
+    assert client.get("/resources/search", params=params).status_code == 400
+
+
+def test_match_expression_quotes_operators():
+    """Test FTS5 syntax in a query is searched for rather than interpreted."""
+    assert search.match_expression('NOT "a" b*') == '"NOT" """a""" "b"*'
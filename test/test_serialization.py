@@ -0,0 +1,80 @@
+"""Test the lean JSON responses match FastAPI's default serialization."""
+
+import json
+import uuid
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+
+from metadata_service import serialization
+from metadata_service.models import database
+from metadata_service.models import response as api
+
+COMPANY_ID = uuid.UUID(int=1)
+TEAM = database.Team(
+    id=uuid.UUID(int=2), name="team", company_id=COMPANY_ID, description="x", version=4
+)
+USER = database.User(
+    id=uuid.UUID(int=3), name="user", email="u@fake.com", company_id=COMPANY_ID
+)
+RESOURCE = database.Resource(
+    id=uuid.UUID(int=4),
+    name="orders",
+    type="postgres",
+    lifecycle_status="active",
+    description="x",
+    owner=TEAM.id,
+)
+
+
+def test_json_response_matches_jsonable_encoder():
+    """Test rows serialize to the same JSON as the response_model path."""
+    for rows, type_ in (
+        ([RESOURCE, RESOURCE], list[database.Resource]),
+        ([TEAM], list[database.Team]),
+        ([USER], list[database.User]),
+        ([], list[database.Company]),
+    ):
+        lean = serialization.json_response(rows, type_)
+
+        assert lean.media_type == serialization.JSON_MEDIA_TYPE
+        assert json.loads(lean.body) == jsonable_encoder(rows)
+    teams = serialization.json_response([TEAM], list[database.Team])
+    assert "version" not in json.loads(teams.body)[0]
+
+
+def test_json_response_excludes_none_and_nests():
+    """Test embedded details leave out related data that was not asked for."""
+    detail = api.TeamDetail(**TEAM.model_dump(), members=[USER])
+    result = api.LookupResult[database.Resource](
+        found=[RESOURCE], missing=[uuid.UUID(int=9)]
+    )
+
+    teams = serialization.json_response(
+        [detail], list[api.TeamDetail], exclude_none=True
+    )
+    lookup = serialization.json_response(result, api.LookupResult[database.Resource])
+
+    assert json.loads(teams.body) == jsonable_encoder([detail], exclude_none=True)
+    assert "resources" not in json.loads(teams.body)[0]
+    assert json.loads(lookup.body) == jsonable_encoder(result)
+
+
+def test_json_response_keeps_route_headers():
+    """Test headers set on the route's response are carried over."""
+    response = Response()
+    response.headers["X-Next-Cursor"] = "abc"
+    response.headers["ETag"] = '"1"'
+
+    lean = serialization.json_response([RESOURCE], list[database.Resource], response)
+
+    assert lean.headers["x-next-cursor"] == "abc"
+    assert lean.headers["etag"] == '"1"'
+    assert lean.headers["content-length"] == str(len(lean.body))
+
+
+def test_ndjson_writes_a_line_per_row():
+    """Test the export lines are the rows' JSON."""
+    lines = serialization.ndjson([RESOURCE, RESOURCE]).splitlines()
+
+    assert [json.loads(line) for line in lines] == jsonable_encoder([RESOURCE] * 2)
@@ -0,0 +1,157 @@
+"""Test the team membership endpoints."""
+
+import uuid
+
+from fastapi import testclient
+from sqlalchemy import Engine
+from sqlmodel import Session, select
+
+from metadata_service.models import database
+from metadata_service.pagination import NEXT_CURSOR_HEADER
+
+
+def uid(n: int) -> str:
+    """Get the text form of the nth seeded ID."""
+    return str(uuid.UUID(int=n))
+
+
+def uids(*numbers: int) -> list[str]:
+    """Get the text forms of some seeded IDs."""
+    return [uid(n) for n in numbers]
+
+
+def seed(engine: Engine):
+    """Seed a company with three teams and ten users."""
+    with Session(engine) as session:
+        company_id = uuid.UUID(int=1)
+        session.add(database.Company(id=company_id, name="company"))
+        for i in range(1, 4):
+            session.add(
+                database.Team(
+                    id=uuid.UUID(int=i),
+                    name=f"team{i}",
+                    company_id=company_id,
+                    description="x",
+                )
+            )
+        for i in range(1, 11):
+            session.add(
+                database.User(
+                    id=uuid.UUID(int=i),
+                    name=f"user{i}",
+                    email="u@fake.com",
+                    company_id=company_id,
+                )
+            )
+        session.commit()
+
+
+def memberships(engine: Engine) -> set[tuple[int, int]]:
+    """Get the seeded numbers of every (team_id, user_id) membership."""
+    with Session(engine) as session:
+        return {
+            (member.team_id.int, member.user_id.int)
+            for member in session.exec(select(database.Team_Members))
+        }
+
+
+def collect_pages(client: testclient.TestClient, url: str) -> list[dict]:
+    """Follow next page cursors until the last page and return every row."""
+    rows: list[dict] = []
+    params = {"limit": 3}
+    while True:
+        response = client.get(url, params=params)
+        assert response.status_code == 200
+        rows.extend(response.json())
+        if NEXT_CURSOR_HEADER not in response.headers:
+            return rows
+        params["cursor"] = response.headers[NEXT_CURSOR_HEADER]
+
+
+def test_add_members(client: testclient.TestClient, sqlite_db: Engine):
+    """Test adding users skips unknown users and existing members."""
+    seed(sqlite_db)
+    client.post(f"/teams/{uid(1)}/members", json={"user_ids": uids(2)})
+
+    response = client.post(
+        f"/teams/{uid(1)}/members", json={"user_ids": uids(3, 2, 1, 99)}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"team_id": uid(1), "user_ids": uids(1, 3)}
+    assert memberships(sqlite_db) == {(1, 1), (1, 2), (1, 3)}
+
+
+def test_add_members_to_missing_team(client: testclient.TestClient, sqlite_db: Engine):
+    """Test adding users to a team that does not exist."""
+    seed(sqlite_db)
+
+    response = client.post(f"/teams/{uid(99)}/members", json={"user_ids": uids(1)})
+
+    assert response.status_code == 404
+    assert memberships(sqlite_db) == set()
+
+
+def test_add_members_validates_body(client: testclient.TestClient, sqlite_db: Engine):
+    """Test an empty or oversized list of users is rejected."""
+    assert (
+        client.post(f"/teams/{uid(1)}/members", json={"user_ids": []}).status_code
+        == 422
+    )
+    too_many = {"user_ids": uids(*range(1, 1002))}
+    assert client.post(f"/teams/{uid(1)}/members", json=too_many).status_code == 422
+
+
+def test_remove_members(client: testclient.TestClient, sqlite_db: Engine):
+    """Test removing users reports the memberships that were removed."""
+    seed(sqlite_db)
+    client.post(f"/teams/{uid(1)}/members", json={"user_ids": uids(1, 2, 3)})
+    client.post(f"/teams/{uid(2)}/members", json={"user_ids": uids(1)})
+
+    response = client.post(
+        f"/teams/{uid(1)}/members:remove", json={"user_ids": uids(1, 3, 4)}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"team_id": uid(1), "user_ids": uids(1, 3)}
+    assert memberships(sqlite_db) == {(1, 2), (2, 1)}
+
+
+def test_get_member(client: testclient.TestClient, sqlite_db: Engine):
+    """Test checking a single membership."""
+    seed(sqlite_db)
+    client.post(f"/teams/{uid(1)}/members", json={"user_ids": uids(5)})
+
+    assert client.get(f"/teams/{uid(1)}/members/{uid(5)}").json() == {
+        "team_id": uid(1),
+        "user_id": uid(5),
+    }
+    assert client.get(f"/teams/{uid(1)}/members/{uid(6)}").status_code == 404
+
+
+def test_list_members_and_teams(client: testclient.TestClient, sqlite_db: Engine):
+    """Test listing a team's users and a user's teams across pages."""
+    seed(sqlite_db)
+    client.post(
+        f"/teams/{uid(2)}/members", json={"user_ids": uids(9, 1, 5, 7, 3, 10, 2)}
+    )
+    for team in uids(3, 1):
+        client.post(f"/teams/{team}/members", json={"user_ids": uids(5)})
+
+    members = collect_pages(client, f"/teams/{uid(2)}/members")
+    teams = collect_pages(client, f"/users/{uid(5)}/teams")
+
+    assert [user["id"] for user in members] == uids(1, 2, 3, 5, 7, 9, 10)
+    assert [team["id"] for team in teams] == uids(1, 2, 3)
+
+
+def test_deletes_remove_memberships(client: testclient.TestClient, sqlite_db: Engine):
+    """Test deleting a team or a user removes their memberships."""
+    seed(sqlite_db)
+    client.post(f"/teams/{uid(1)}/members", json={"user_ids": uids(1, 2)})
+    client.post(f"/teams/{uid(2)}/members", json={"user_ids": uids(1, 2)})
+
+    assert client.delete(f"/team/{uid(1)}").status_code == 200
+    assert client.delete(f"/user/{uid(2)}").status_code == 200
+
+    assert memberships(sqlite_db) == {(2, 1)}
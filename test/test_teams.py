@@ -1,5 +1,7 @@
 """Test the team endpoints."""
 
+import uuid
+
 import pytest
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -11,6 +13,11 @@ from metadata_service.db import get_session
 from metadata_service.models import database
 
 
+def uid(n: int) -> str:
+    """Get the text form of the nth test ID."""
+    return str(uuid.UUID(int=n))
+
+
 def test_get_teams(client: testclient.TestClient, mocker: MockerFixture):
     """Test the get_teams endpoint."""
 
@@ -19,16 +26,16 @@ def test_get_teams(client: testclient.TestClient, mocker: MockerFixture):
         mock_result = mocker.Mock()
         mock_result.scalars.return_value.all.return_value = [
             database.Team(
-                id=1,
+                id=uuid.UUID(int=1),
                 name="test team",
                 description="test description",
-                company_id=1,
+                company_id=uuid.UUID(int=1),
             ),
             database.Team(
-                id=2,
+                id=uuid.UUID(int=2),
                 name="test team 2",
                 description="test description",
-                company_id=1,
+                company_id=uuid.UUID(int=1),
             ),
         ]
         mock_context_manager.execute.return_value = mock_result
@@ -40,15 +47,15 @@ def test_get_teams(client: testclient.TestClient, mocker: MockerFixture):
     assert response.status_code == 200
     assert response.json() == [
         {
-            "id": 1,
+            "id": uid(1),
             "name": "test team",
-            "company_id": 1,
+            "company_id": uid(1),
             "description": "test description",
         },
         {
-            "id": 2,
+            "id": uid(2),
             "name": "test team 2",
-            "company_id": 1,
+            "company_id": uid(1),
             "description": "test description",
         },
     ]
@@ -63,10 +70,10 @@ def test_get_team_success(client: testclient.TestClient, mocker: MockerFixture):
 
         mock_result = mocker.Mock()
         mock_result.scalars.return_value.one_or_none.return_value = database.Team(
-            id=1,
+            id=uuid.UUID(int=1),
             name="test team",
             description="test description",
-            company_id=1,
+            company_id=uuid.UUID(int=1),
         )
         mock_context_manager.execute.return_value = mock_result
 
@@ -74,12 +81,12 @@ def test_get_team_success(client: testclient.TestClient, mocker: MockerFixture):
 
     app.dependency_overrides[get_session] = get_session_override
 
-    response = client.get("/teams/1")
+    response = client.get(f"/teams/{uid(1)}")
     assert response.status_code == 200
     assert response.json() == {
-        "id": 1,
+        "id": uid(1),
         "name": "test team",
-        "company_id": 1,
+        "company_id": uid(1),
         "description": "test description",
     }
 
@@ -99,7 +106,7 @@ def test_get_team_not_found(client: testclient.TestClient, mocker: MockerFixture
 
     app.dependency_overrides[get_session] = get_session_override
 
-    response = client.get("/teams/300")
+    response = client.get(f"/teams/{uid(300)}")
     assert response.status_code == 404
     assert response.json() == {"detail": "Item not found"}
 
@@ -112,7 +119,7 @@ def test_create_team_new(client: testclient.TestClient, mocker: MockerFixture):
         mock_context_manager = mocker.MagicMock(AsyncSession)
 
         def mock_refresh(team: database.Team):
-            team.id = 3
+            team.id = uuid.UUID(int=3)
 
         mock_context_manager.refresh.side_effect = mock_refresh
 
@@ -123,15 +130,15 @@ def test_create_team_new(client: testclient.TestClient, mocker: MockerFixture):
     response = client.post(
         "/team",
         json={
-            "company_id": 1,
+            "company_id": uid(1),
             "description": "bills team",
             "name": "new_team",
         },
     )
     assert response.status_code == 200
     assert response.json() == {
-        "id": 3,
-        "company_id": 1,
+        "id": uid(3),
+        "company_id": uid(1),
         "description": "bills team",
         "name": "new_team",
     }
@@ -144,12 +151,13 @@ def test_update_team(client: testclient.TestClient, mocker: MockerFixture):
         mocker = MockerFixture(pytest)
         mock_context_manager = mocker.MagicMock(AsyncSession)
 
+        # UPDATE ... RETURNING returns the row with the changes applied.
         mock_result = mocker.Mock()
         mock_result.scalars.return_value.one_or_none.return_value = database.Team(
-            id=1,
-            name="davids team",
-            description="test description",
-            company_id=1,
+            id=uuid.UUID(int=1),
+            name="david_updated",
+            description="super team",
+            company_id=uuid.UUID(int=1),
         )
         mock_context_manager.execute.return_value = mock_result
 
@@ -158,13 +166,17 @@ def test_update_team(client: testclient.TestClient, mocker: MockerFixture):
     app.dependency_overrides[get_session] = get_session_override
 
     response = client.put(
-        "/team/1",
-        json={"name": "david_updated", "description": "super team", "company_id": 1},
+        f"/team/{uid(1)}",
+        json={
+            "name": "david_updated",
+            "description": "super team",
+            "company_id": uid(1),
+        },
     )
     assert response.status_code == 200
     assert response.json() == {
-        "company_id": 1,
-        "id": 1,
+        "company_id": uid(1),
+        "id": uid(1),
         "name": "david_updated",
         "description": "super team",
     }
@@ -186,11 +198,11 @@ def test_update_team_not_found(client: testclient.TestClient, mocker: MockerFixt
     app.dependency_overrides[get_session] = get_session_override
 
     response = client.put(
-        "/team/10",
+        f"/team/{uid(10)}",
         json={
             "name": "team_not_found",
             "description": "new description",
-            "company_id": 1,
+            "company_id": uid(1),
         },
     )
     assert response.status_code == 404
@@ -206,10 +218,10 @@ def test_delete_team_success(client: testclient.TestClient, mocker: MockerFixtur
 
         mock_result = mocker.Mock()
         mock_result.scalars.return_value.one_or_none.return_value = database.Team(
-            id=1,
+            id=uuid.UUID(int=1),
             name="teamx",
             description="test description",
-            company_id=1,
+            company_id=uuid.UUID(int=1),
         )
         mock_context_manager.execute.return_value = mock_result
 
@@ -217,9 +229,9 @@ def test_delete_team_success(client: testclient.TestClient, mocker: MockerFixtur
 
     app.dependency_overrides[get_session] = get_session_override
 
-    response = client.delete("/team/1")
+    response = client.delete(f"/team/{uid(1)}")
     assert response.status_code == 200
-    assert response.json() == {"id": 1, "name": "teamx", "status": "deleted"}
+    assert response.json() == {"id": uid(1), "name": "teamx", "status": "deleted"}
 
 
 def test_delete_team_not_found(client: testclient.TestClient, mocker: MockerFixture):
@@ -236,6 +248,6 @@ def test_delete_team_not_found(client: testclient.TestClient, mocker: MockerFixt
 
     app.dependency_overrides[get_session] = get_session_override
 
-    response = client.delete("/team/100")
+    response = client.delete(f"/team/{uid(100)}")
     assert response.status_code == 404
     assert response.json() == {"detail": "Item not found"}
@@ -0,0 +1,187 @@
+"""Test the company topology served from the in-memory graph."""
+
+import asyncio
+import uuid
+
+import pytest
+from fastapi import testclient
+from sqlalchemy import Engine, text
+from sqlmodel import Session
+
+from metadata_service import topology
+from metadata_service.config import get_settings
+from metadata_service.models import database
+
+
+def uid(n: int) -> str:
+    """Get the text form of the nth seeded ID."""
+    return str(uuid.UUID(int=n))
+
+
+def uids(*numbers: int) -> list[str]:
+    """Get the text forms of some seeded IDs."""
+    return [uid(n) for n in numbers]
+
+
+@pytest.fixture
+def staleness(monkeypatch):
+    """Set the topology staleness bound, by default to always catch up."""
+
+    def set_bound(seconds: float):
+        monkeypatch.setattr(get_settings(), "topology_max_staleness_seconds", seconds)
+
+    set_bound(0.0)
+    return set_bound
+
+
+def seed(engine: Engine):
+    """Seed two companies, three teams with members and owned resources."""
+    with Session(engine) as session:
+        for c in (1, 2):
+            session.add(database.Company(id=uuid.UUID(int=c), name=f"company{c}"))
+        for t, company_id in ((1, 1), (2, 1), (3, 2)):
+            session.add(
+                database.Team(
+                    id=uuid.UUID(int=t),
+                    name=f"team{t}",
+                    company_id=uuid.UUID(int=company_id),
+                    description="x",
+                )
+            )
+        for u, company_id in ((1, 1), (2, 1), (3, 2)):
+            session.add(
+                database.User(
+                    id=uuid.UUID(int=u),
+                    name=f"user{u}",
+                    email="u@fake.com",
+                    company_id=uuid.UUID(int=company_id),
+                )
+            )
+        for team_id, user_id in ((1, 1), (1, 2), (2, 2), (3, 3), (1, 3)):
+            session.add(
+                database.Team_Members(
+                    team_id=uuid.UUID(int=team_id), user_id=uuid.UUID(int=user_id)
+                )
+            )
+        for r in range(1, 7):
+            session.add(
+                database.Resource(
+                    id=uuid.UUID(int=r),
+                    name=f"resource{r}",
+                    type="postgres",
+                    lifecycle_status="active",
+                    description="x",
+                    owner=uuid.UUID(int=r % 3 + 1),
+                )
+            )
+        session.commit()
+
+
+def expected(client: testclient.TestClient, company_id: str) -> dict:
+    """Build a company's topology from the list endpoints."""
+    params = {"company_id": company_id, "include": "members,resources"}
+    return {
+        "company": client.get(f"/companies/{company_id}").json(),
+        "teams": client.get("/teams", params=params).json(),
+        "users": client.get("/users", params={"company_id": company_id}).json(),
+    }
+
+
+def test_topology_matches_the_list_endpoints(
+    client: testclient.TestClient, sqlite_db: Engine, staleness
+):
+    """Test the topology holds the same teams, members and resources."""
+    seed(sqlite_db)
+
+    response = client.get(f"/companies/{uid(1)}/topology")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body.pop("seq") > 0
+    assert body == expected(client, uid(1))
+    assert [member["id"] for member in body["teams"][0]["members"]] == uids(1, 2, 3)
+    assert client.get(f"/companies/{uid(9)}/topology").status_code == 404
+
+
+def test_topology_follows_writes(
+    client: testclient.TestClient, sqlite_db: Engine, staleness
+):
+    """Test creates, moves, membership changes and deletes are caught up."""
+    seed(sqlite_db)
+    first = client.get(f"/companies/{uid(1)}/topology").json()
+
+    client.post(
+        "/resource",
+        json={
+            "name": "new",
+            "type": "s3",
+            "lifecycle_status": "active",
+            "description": "x",
+            "owner": uid(2),
+        },
+    )
+    client.put(f"/resource/{uid(1)}", json={"owner": uid(3)})
+    client.put(f"/user/{uid(3)}", json={"company_id": uid(1)})
+    client.post(f"/teams/{uid(2)}/members", json={"user_ids": uids(1)})
+    client.post(f"/teams/{uid(1)}/members:remove", json={"user_ids": uids(2)})
+    client.delete(f"/team/{uid(3)}")
+    body = client.get(f"/companies/{uid(1)}/topology").json()
+
+    assert body.pop("seq") > first["seq"]
+    assert body == expected(client, uid(1))
+    assert client.get(f"/companies/{uid(2)}/topology").json()["teams"] == []
+
+
+def test_staleness_bound_and_rebuild(
+    client: testclient.TestClient, sqlite_db: Engine, staleness
+):
+    """Test a fresh enough graph is served as is until it is rebuilt."""
+    seed(sqlite_db)
+    staleness(3600)
+    client.get(f"/companies/{uid(1)}/topology")
+
+    company_id = client.post("/company", json={"name": "company3"}).json()["id"]
+    assert client.get(f"/companies/{company_id}/topology").status_code == 404
+    stats = client.post("/topology:rebuild").json()
+
+    assert stats["company_count"] == 3
+    assert stats["resource_count"] == 6
+    assert client.get(f"/companies/{company_id}/topology").status_code == 200
+
+
+def test_compacted_changes_rebuild_the_graph(
+    client: testclient.TestClient, sqlite_db: Engine, staleness
+):
+    """Test a graph behind the compacted log builds again instead of catching up."""
+    seed(sqlite_db)
+    client.get(f"/companies/{uid(1)}/topology")
+    client.put(f"/team/{uid(1)}", json={"name": "renamed"})
+    client.put(f"/team/{uid(2)}", json={"name": "renamed2"})
+    with sqlite_db.begin() as conn:
+        last = conn.execute(text("SELECT max(seq) FROM change_log")).scalar()
+        conn.execute(text("DELETE FROM change_log WHERE seq < :last"), {"last": last})
+
+    body = client.get(f"/companies/{uid(1)}/topology").json()
+
+    assert [team["name"] for team in body["teams"]] == ["renamed", "renamed2"]
+    assert body["seq"] == last
+    assert topology.graph.stats().team_count == 3
+
+
+def test_background_refresh_waits_for_first_use():
+    """Test the background refresh never builds a graph no request asked for."""
+    sessions = []
+
+    def sessionmaker():
+        sessions.append(None)
+        raise AssertionError("The graph was read")
+
+    async def refresh_briefly():
+        task = asyncio.create_task(topology.graph.keep_fresh(sessionmaker, 0.0))
+        await asyncio.sleep(3 * topology.REFRESH_MIN_SECONDS)
+        task.cancel()
+
+    asyncio.run(refresh_briefly())
+
+    assert sessions == []
+    assert topology.graph.seq is None
@@ -1,5 +1,7 @@
 """Test the user endpoints."""
 
+import uuid
+
 import pytest
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -11,6 +13,11 @@ from metadata_service.db import get_session
 from metadata_service.models import database
 
 
+def uid(n: int) -> str:
+    """Get the text form of the nth test ID."""
+    return str(uuid.UUID(int=n))
+
+
 @pytest.fixture(autouse=True)
 def client():
     """Create a fixture for the FastAPI test client."""
@@ -25,16 +32,16 @@ def test_get_users(client: testclient.TestClient, mocker: MockerFixture):
         mock_result = mocker.Mock()
         mock_result.scalars.return_value.all.return_value = [
             database.User(
-                id=1,
+                id=uuid.UUID(int=1),
                 name="test",
                 email="test@test.com",
-                company_id=1,
+                company_id=uuid.UUID(int=1),
             ),
             database.User(
-                id=2,
+                id=uuid.UUID(int=2),
                 name="test2",
                 email="test2@test.com",
-                company_id=2,
+                company_id=uuid.UUID(int=2),
             ),
         ]
         mock_context_manager.execute.return_value = mock_result
@@ -46,16 +53,16 @@ def test_get_users(client: testclient.TestClient, mocker: MockerFixture):
     assert response.status_code == 200
     assert response.json() == [
         {
-            "id": 1,
+            "id": uid(1),
             "name": "test",
             "email": "test@test.com",
-            "company_id": 1,
+            "company_id": uid(1),
         },
         {
-            "id": 2,
+            "id": uid(2),
             "name": "test2",
             "email": "test2@test.com",
-            "company_id": 2,
+            "company_id": uid(2),
         },
     ]
 
@@ -69,10 +76,10 @@ def test_get_user_success(client: testclient.TestClient, mocker: MockerFixture):
 
         mock_result = mocker.Mock()
         mock_result.scalars.return_value.one_or_none.return_value = database.User(
-            id=1,
+            id=uuid.UUID(int=1),
             name="test",
             email="test@test.com",
-            company_id=1,
+            company_id=uuid.UUID(int=1),
         )
         mock_context_manager.execute.return_value = mock_result
 
@@ -80,13 +87,13 @@ def test_get_user_success(client: testclient.TestClient, mocker: MockerFixture):
 
     app.dependency_overrides[get_session] = get_session_override
 
-    response = client.get("/users/1")
+    response = client.get(f"/users/{uid(1)}")
     assert response.status_code == 200
     assert response.json() == {
-        "id": 1,
+        "id": uid(1),
         "name": "test",
         "email": "test@test.com",
-        "company_id": 1,
+        "company_id": uid(1),
     }
 
 
@@ -105,7 +112,7 @@ def test_get_user_not_found(client: testclient.TestClient, mocker: MockerFixture
 
     app.dependency_overrides[get_session] = get_session_override
 
-    response = client.get("/users/300")
+    response = client.get(f"/users/{uid(300)}")
     assert response.status_code == 404
     assert response.json() == {"detail": "Item not found"}
 
@@ -118,7 +125,7 @@ def test_create_user_new(client: testclient.TestClient, mocker: MockerFixture):
         mock_context_manager = mocker.MagicMock(AsyncSession)
 
         def mock_refresh(user: database.User):
-            user.id = 3
+            user.id = uuid.UUID(int=3)
 
         mock_context_manager.refresh.side_effect = mock_refresh
 
@@ -131,13 +138,13 @@ def test_create_user_new(client: testclient.TestClient, mocker: MockerFixture):
         json={
             "name": "new_user",
             "email": "new_user@fake.com",
-            "company_id": 1,
+            "company_id": uid(1),
         },
     )
     assert response.status_code == 200
     assert response.json() == {
-        "id": 3,
-        "company_id": 1,
+        "id": uid(3),
+        "company_id": uid(1),
         "email": "new_user@fake.com",
         "name": "new_user",
     }
@@ -150,12 +157,13 @@ def test_update_user(client: testclient.TestClient, mocker: MockerFixture):
         mocker = MockerFixture(pytest)
         mock_context_manager = mocker.MagicMock(AsyncSession)
 
+        # UPDATE ... RETURNING returns the row with the changes applied.
         mock_result = mocker.Mock()
         mock_result.scalars.return_value.one_or_none.return_value = database.User(
-            id=1,
-            name="david",
+            id=uuid.UUID(int=1),
+            name="david_updated",
             email="david@fake.com",
-            company_id=1,
+            company_id=uuid.UUID(int=1),
         )
         mock_context_manager.execute.return_value = mock_result
 
@@ -164,13 +172,13 @@ def test_update_user(client: testclient.TestClient, mocker: MockerFixture):
     app.dependency_overrides[get_session] = get_session_override
 
     response = client.put(
-        "/user/1",
-        json={"name": "david_updated", "email": "david@fake.com", "company_id": 1},
+        f"/user/{uid(1)}",
+        json={"name": "david_updated", "email": "david@fake.com", "company_id": uid(1)},
     )
     assert response.status_code == 200
     assert response.json() == {
-        "company_id": 1,
-        "id": 1,
+        "company_id": uid(1),
+        "id": uid(1),
         "name": "david_updated",
         "email": "david@fake.com",
     }
@@ -192,8 +200,8 @@ def test_update_user_not_found(client: testclient.TestClient, mocker: MockerFixt
     app.dependency_overrides[get_session] = get_session_override
 
     response = client.put(
-        "/user/10",
-        json={"name": "user_not_found", "email": "user@fake.com", "company_id": 1},
+        f"/user/{uid(10)}",
+        json={"name": "user_not_found", "email": "user@fake.com", "company_id": uid(1)},
     )
     assert response.status_code == 404
     assert response.json() == {"detail": "Item not found"}
@@ -208,10 +216,10 @@ def test_delete_user_success(client: testclient.TestClient, mocker: MockerFixtur
 
         mock_result = mocker.Mock()
         mock_result.scalars.return_value.one_or_none.return_value = database.User(
-            id=1,
+            id=uuid.UUID(int=1),
             name="david",
             email="test@fake.com",
-            company_id=1,
+            company_id=uuid.UUID(int=1),
         )
         mock_context_manager.execute.return_value = mock_result
 
@@ -219,9 +227,9 @@ def test_delete_user_success(client: testclient.TestClient, mocker: MockerFixtur
 
     app.dependency_overrides[get_session] = get_session_override
 
-    response = client.delete("/user/1")
+    response = client.delete(f"/user/{uid(1)}")
     assert response.status_code == 200
-    assert response.json() == {"id": 1, "name": "david", "status": "deleted"}
+    assert response.json() == {"id": uid(1), "name": "david", "status": "deleted"}
 
 
 def test_delete_user_not_found(client: testclient.TestClient, mocker: MockerFixture):
@@ -238,6 +246,6 @@ def test_delete_user_not_found(client: testclient.TestClient, mocker: MockerFixt
 
     app.dependency_overrides[get_session] = get_session_override
 
-    response = client.delete("/user/100")
+    response = client.delete(f"/user/{uid(100)}")
     assert response.status_code == 404
     assert response.json() == {"detail": "Item not found"}
@@ -0,0 +1,222 @@
+"""Test concurrent writes share transactions when write batching is enabled."""
+
+import asyncio
+import uuid
+
+import httpx
+import pytest
+from sqlalchemy import Engine
+from sqlmodel import Session, select
+
+from metadata_service import admission, writes
+from metadata_service.main import app
+from metadata_service.models import database
+
+
+def uid(n: int) -> str:
+    """Get the text form of the nth seeded ID."""
+    return str(uuid.UUID(int=n))
+
+
+@pytest.fixture
+def coordinator(monkeypatch) -> writes.WriteCoordinator:
+    """Enable write batching with a window long enough to gather every request.
+
+    Admission control is lifted to the batch size, so every request joins.
+    """
+    coordinator = writes.WriteCoordinator(
+        enabled=True, window_seconds=0.05, max_size=100
+    )
+    monkeypatch.setattr(writes, "coordinator", coordinator)
+    monkeypatch.setattr(
+        admission, "controller", admission.AdmissionController(limit=100)
+    )
+    return coordinator
+
+
+def seed(engine: Engine):
+    """Seed a company and a team to own resources."""
+    with Session(engine) as session:
+        session.add(database.Company(id=uuid.UUID(int=1), name="company"))
+        session.add(
+            database.Team(
+                id=uuid.UUID(int=1),
+                name="team",
+                company_id=uuid.UUID(int=1),
+                description="x",
+            )
+        )
+        session.commit()
+
+
+def resource(i: int) -> dict:
+    """Build the body of a resource to create."""
+    return {
+        "name": f"resource{i}",
+        "type": "postgres",
+        "lifecycle_status": "active",
+        "description": "x",
+        "owner": uid(1),
+    }
+
+
+async def send(requests: list[tuple[str, str, dict, dict]]) -> list[httpx.Response]:
+    """Send requests to the app concurrently."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+        return await asyncio.gather(
+            *(
+                client.request(method, url, json=body, headers=headers)
+                for method, url, body, headers in requests
+            )
+        )
+
+
+def test_concurrent_creates_share_a_transaction(
+    sqlite_db: Engine, coordinator: writes.WriteCoordinator, sqlite_trace: list[str]
+):
+    """Test concurrent creates commit together and each gets its own row."""
+    seed(sqlite_db)
+    requests = [("POST", "/resource", resource(i), {}) for i in range(10)]
+
+    responses = asyncio.run(send(requests))
+    transactions = [
+        statement.split()[0]
+        for statement in sqlite_trace
+        if statement.startswith(("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT"))
+    ]
+
+    assert [response.status_code for response in responses] == [200] * 10
+    assert sorted(response.json()["name"] for response in responses) == sorted(
+        f"resource{i}" for i in range(10)
+    )
+    assert len({response.json()["id"] for response in responses}) == 10
+    assert coordinator.writes == 10
+    assert coordinator.batches == 1
+    # One transaction, each write in a savepoint inside it.
+    assert transactions == ["BEGIN"] + ["SAVEPOINT"] * 10 + ["COMMIT"]
+    with Session(sqlite_db) as session:
+        assert len(session.exec(select(database.Resource)).all()) == 10
+
+
+def test_a_failed_write_does_not_fail_its_batch(
+    sqlite_db: Engine, coordinator: writes.WriteCoordinator
+):
+    """Test each caller gets its own error while the rest of the batch commits."""
+    seed(sqlite_db)
+    with Session(sqlite_db) as session:
+        session.add(
+            database.Resource(
+                **{**resource(0), "id": uuid.UUID(int=1), "owner": uuid.UUID(int=1)}
+            )
+        )
+        session.commit()
+    requests = [
+        ("POST", "/resource", resource(1), {}),
+        ("POST", "/resource", {**resource(2), "id": uid(1)}, {}),
+        ("POST", "/team", {"name": "t", "company_id": uid(1), "description": "x"}, {}),
+    ]
+
+    responses = asyncio.run(send(requests))
+
+    assert [response.status_code for response in responses] == [200, 400, 200]
+    assert "UNIQUE" in responses[1].text
+    assert coordinator.batches == 1
+    with Session(sqlite_db) as session:
+        names = session.exec(select(database.Resource.name)).all()
+        assert sorted(names) == ["resource0", "resource1"]
+        assert len(session.exec(select(database.Team)).all()) == 2
+
+
+def test_batched_updates_keep_conditional_semantics(
+    sqlite_db: Engine, coordinator: writes.WriteCoordinator
+):
+    """Test two updates of one version in a batch: one applies, one gets 412."""
+    seed(sqlite_db)
+    asyncio.run(send([("POST", "/resource", {**resource(0), "id": uid(1)}, {})]))
+    requests = [
+        (
+            "PUT",
+            f"/resource/{uid(1)}",
+            {"description": f"update{i}"},
+            {"If-Match": '"1"'},
+        )
+        for i in range(2)
+    ] + [("PUT", f"/resource/{uid(9)}", {"description": "missing"}, {})]
+
+    responses = asyncio.run(send(requests))
+
+    assert sorted(response.status_code for response in responses) == [200, 404, 412]
+    updated = next(r for r in responses if r.status_code == 200)
+    assert updated.headers["etag"] == '"2"'
+    with Session(sqlite_db) as session:
+        stored = session.get(database.Resource, uuid.UUID(int=1))
+        assert stored.description == updated.json()["description"]
+
+
+def assert_own_results(responses: list[httpx.Response], engine: Engine):
+    """Assert each applied update answered with the row as its own write left it.
+
+    Writes to one row take its versions in turn from 2, and the stored row is
+    the one the last of them answered with.
+    """
+    applied = {
+        response.headers["etag"]: response.json()
+        for response in responses
+        if response.status_code == 200
+    }
+    assert sorted(applied) == [f'"{version}"' for version in range(2, len(applied) + 2)]
+    with Session(engine) as session:
+        stored = session.get(database.Team, uuid.UUID(int=1))
+        assert applied[f'"{stored.version}"']["name"] == stored.name
+
+
+def test_batched_updates_of_one_row_get_their_own_results(
+    sqlite_db: Engine, coordinator: writes.WriteCoordinator
+):
+    """Test updates of one row in a batch each answer with their own version."""
+    seed(sqlite_db)
+    requests = [
+        ("PUT", f"/team/{uid(1)}", {"name": name}, {}) for name in ("first", "second")
+    ]
+
+    responses = asyncio.run(send(requests))
+
+    assert [response.status_code for response in responses] == [200, 200]
+    assert coordinator.batches == 1
+    assert {response.json()["name"] for response in responses} == {"first", "second"}
+    assert_own_results(responses, sqlite_db)
+
+
+def test_failed_update_between_updates_of_one_row(
+    sqlite_db: Engine, coordinator: writes.WriteCoordinator
+):
+    """Test a failed update of a row leaves its neighbours' results intact."""
+    seed(sqlite_db)
+    requests = [
+        ("PUT", f"/team/{uid(1)}", {"name": "first"}, {}),
+        ("PUT", f"/team/{uid(1)}", {"name": "stale"}, {"If-Match": '"9"'}),
+        ("PUT", f"/team/{uid(1)}", {"name": "third"}, {}),
+    ]
+
+    responses = asyncio.run(send(requests))
+
+    assert [response.status_code for response in responses] == [200, 412, 200]
+    assert coordinator.batches == 1
+    assert {responses[0].json()["name"], responses[2].json()["name"]} == {
+        "first",
+        "third",
+    }
+    assert_own_results(responses, sqlite_db)
+
+
+def test_disabled_coordinator_writes_in_the_request_transaction(sqlite_db: Engine):
+    """Test writes are not batched by default."""
+    seed(sqlite_db)
+    batches = writes.coordinator.batches
+
+    responses = asyncio.run(send([("POST", "/resource", resource(0), {})] * 2))
+
+    assert [response.status_code for response in responses] == [200, 200]
+    assert writes.coordinator.enabled is False
+    assert writes.coordinator.batches == batches